@@ -0,0 +1,278 @@
+# 'generate_data.py'의 빠른 버전입니다. (user_logs 더미데이터 생성)
+#
+# generate_data.py가 느린 이유:
+#   1. 한 행마다 fake.date_time_between()을 파이썬 루프로 호출 -> CPU 병목
+#   2. 1000건마다 commit -> commit(디스크 flush) 병목
+#   3. 프로세스 1개만 사용
+#
+# 여기서는:
+#   1. NumPy 난수 생성기로 user_id/action/created_at을 배열 단위로 한 번에 생성 (벡터화)
+#   2. 여러 프로세스(producer)가 나눠서 생성 + 적재
+#   3. LOAD DATA LOCAL INFILE(파일 통째로 적재) 또는 큰 multi-row INSERT로 적재, commit 간격은 옵션으로 조절
+#   4. --seed로 같은 데이터를 다시 만들 수 있음 (재현성)
+#
+# 사용법:
+#   python generate_data_fast.py                                  # 100만 건 (generate_data.py와 같은 양)
+#   python generate_data_fast.py --rows 10000000 --workers 8      # 1000만 건
+#   python generate_data_fast.py --method insert --commit-interval 50000
+#   python generate_data_fast.py --schema both                    # user_logs + 월 파티션 user_logs_part (파티션 비교용)
+#   python generate_data_fast.py --rollup                         # 생성 후 user_logs_daily 요약 테이블까지 구축
+#
+# ※ LOAD DATA LOCAL INFILE은 MySQL 서버에서 'local_infile' 설정이 켜져 있어야 한다.
+#    (set global local_infile = 1;) 안 되면 --method insert로 실행하면 됨.
+
+import argparse
+import os
+import tempfile
+import time
+from datetime import datetime
+from multiprocessing import Pool
+
+import numpy as np
+import pandas as pd
+import pymysql
+
+import rollup
+
+## 1. 설정
+DB_CONFIG = {
+    'host': '127.0.0.1',
+    'user': 'root',
+    'password': '1234',
+    'database': 'shop_db',
+    'local_infile': True, # LOAD DATA LOCAL INFILE 허용 (클라이언트 쪽)
+}
+
+ACTIONS = np.array(['login', 'logout', 'view', 'click', 'purchase', 'search', 'download', 'upload'])
+USER_ID_MAX = 10000 # 사용자 1~10000
+
+CREATE_TABLE_SQL = """
+create table user_logs (
+    log_id int primary key auto_increment,
+    user_id int not null,
+    action varchar(50),
+    created_at datetime
+) Engine = InnoDB
+"""
+
+PARTITIONED_TABLE = 'user_logs_part'
+
+
+def partitioned_table_sql(end_date, months=13):
+    """
+    created_at 월 단위 RANGE 파티션 버전의 user_logs (user_logs_part)
+
+    - 파티션 키(created_at)는 모든 UNIQUE 키에 들어가야 해서, PK를 (log_id, created_at)로 바꿨다.
+    - end_date가 속한 달부터 거꾸로 months개월 + 미래 데이터용 p_future 파티션.
+    - where created_at >= ... 처럼 시간 범위로 조회하면 해당 달 파티션만 읽는다. (partition pruning, EXPLAIN의 partitions 칼럼으로 확인)
+    """
+    end = datetime.strptime(end_date, '%Y-%m-%d')
+    year, month = end.year, end.month
+
+    bounds = []
+    for _ in range(months):
+        # (year, month)달 파티션의 상한 = 다음 달 1일
+        upper = f"{year + (month == 12)}-{month % 12 + 1:02d}-01"
+        bounds.append((f"p{year}{month:02d}", upper))
+        year, month = (year - 1, 12) if month == 1 else (year, month - 1)
+
+    partitions = ",\n".join(f"    partition {name} values less than ('{upper}')" for name, upper in reversed(bounds))
+
+    return f"""
+create table {PARTITIONED_TABLE} (
+    log_id int not null auto_increment,
+    user_id int not null,
+    action varchar(50),
+    created_at datetime not null,
+    primary key (log_id, created_at)
+) Engine = InnoDB
+partition by range columns(created_at) (
+{partitions},
+    partition p_future values less than (MAXVALUE)
+)
+"""
+
+
+## 2. 데이터 생성 (벡터화)
+def generate_chunk(rng, n, start_ts, end_ts):
+    """
+    n건의 user_logs 데이터를 NumPy 배열로 한 번에 생성
+
+    Args:
+        rng: np.random.Generator (producer마다 따로 가짐)
+        n: 생성할 행 수
+        start_ts, end_ts: created_at 범위 (유닉스 초)
+
+    Returns:
+        DataFrame: user_id, action, created_at(문자열 'YYYY-MM-DDTHH:MM:SS')
+    """
+    user_ids = rng.integers(1, USER_ID_MAX + 1, size=n)
+    actions = ACTIONS[rng.integers(0, len(ACTIONS), size=n)]
+    seconds = rng.integers(start_ts, end_ts, size=n)
+
+    # 유닉스 초 -> datetime 문자열 (파이썬 루프 없이 한 번에)
+    # 날짜와 시간 사이가 'T'인 ISO 형식인데, MySQL DATETIME은 'T' 구분자도 그대로 받아준다.
+    created_at = np.datetime_as_string(seconds.astype('datetime64[s]'))
+
+    return pd.DataFrame({'user_id': user_ids, 'action': actions, 'created_at': created_at})
+
+
+## 3. 적재 방식 2가지
+def load_infile(cursor, df, table):
+    """임시 TSV 파일로 쓰고 LOAD DATA LOCAL INFILE로 한 번에 적재 (가장 빠름)"""
+    fd, path = tempfile.mkstemp(suffix='.tsv')
+    os.close(fd)
+
+    try:
+        df.to_csv(path, sep='\t', header=False, index=False, lineterminator='\n')
+        cursor.execute(
+            f"load data local infile %s into table {table} "
+            "fields terminated by '\\t' lines terminated by '\\n' (user_id, action, created_at)",
+            (path.replace('\\', '/'),) # 윈도우 경로의 '\'는 MySQL에서 이스케이프 문자로 읽히므로 '/'로 바꿈
+        )
+    finally:
+        os.remove(path)
+
+
+def load_insert(cursor, df, table):
+    """multi-row INSERT로 적재 (pymysql executemany가 여러 행을 한 문장으로 묶어서 보냄)"""
+    rows = list(zip(df['user_id'].tolist(), df['action'].tolist(), df['created_at'].tolist()))
+    cursor.executemany(f"insert into {table} (user_id, action, created_at) values (%s, %s, %s)", rows)
+
+
+## 4. producer (프로세스 하나가 맡은 만큼 생성 + 적재)
+def producer(args):
+    worker_id, n_rows, seed_seq, method, chunk_rows, commit_interval, start_ts, end_ts, table = args
+
+    rng = np.random.default_rng(seed_seq) # producer마다 독립적인 난수 스트림 (같은 seed면 항상 같은 데이터)
+    conn = pymysql.connect(**DB_CONFIG)
+    cursor = conn.cursor()
+    load = load_infile if method == 'infile' else load_insert
+
+    done = 0
+    since_commit = 0
+    gen_time = 0.0
+    load_time = 0.0
+
+    try:
+        while done < n_rows:
+            n = min(chunk_rows, n_rows - done)
+
+            t = time.perf_counter()
+            df = generate_chunk(rng, n, start_ts, end_ts)
+            gen_time += time.perf_counter() - t
+
+            t = time.perf_counter()
+            load(cursor, df, table)
+            done += n
+            since_commit += n
+
+            if since_commit >= commit_interval:
+                conn.commit()
+                since_commit = 0
+            load_time += time.perf_counter() - t
+
+        conn.commit()
+
+    finally:
+        cursor.close()
+        conn.close()
+
+    return worker_id, done, gen_time, load_time
+
+
+def split_rows(total, workers):
+    """총 행 수를 producer 수만큼 최대한 고르게 나눔 (예: 10건, 3명 -> [4, 3, 3])"""
+    base, rest = divmod(total, workers)
+    return [base + (1 if i < rest else 0) for i in range(workers)]
+
+
+def generate(total_rows, workers, method, chunk_rows, commit_interval, seed, end_date, table='user_logs'):
+    """
+    여러 producer 프로세스로 total_rows건 생성 + 적재
+
+    - 같은 (seed, workers, rows, end_date)면 항상 같은 데이터가 만들어진다. (log_id 순서는 프로세스 실행 순서에 따라 다를 수 있음)
+    - created_at 범위: end_date 0시 기준 1년 전 ~ end_date 0시
+
+    Returns:
+        float: 걸린 시간(초)
+    """
+    # 범위 경계도 시간대 없이(UTC 기준) 초로 바꾼다. datetime.timestamp()는 이 컴퓨터의 시간대로 해석해서,
+    # UTC로 문자열을 만드는 generate_chunk()와 기준이 어긋남 (예: 한국(KST)이면 9시간 앞당겨진 범위가 됨)
+    end = np.datetime64(end_date, 's')
+    start = end - np.timedelta64(365, 'D')
+    start_ts, end_ts = int(start.astype(np.int64)), int(end.astype(np.int64))
+
+    # SeedSequence.spawn: seed 하나에서 서로 겹치지 않는 난수 스트림을 producer 수만큼 만든다.
+    seeds = np.random.SeedSequence(seed).spawn(workers)
+    jobs = [
+        (i, n, seeds[i], method, chunk_rows, commit_interval, start_ts, end_ts, table)
+        for i, n in enumerate(split_rows(total_rows, workers))
+    ]
+
+    start_time = time.perf_counter()
+
+    with Pool(processes=workers) as pool:
+        for worker_id, done, gen_time, load_time in pool.imap_unordered(producer, jobs):
+            print(f" producer {worker_id}: {done:,}건 (생성 {gen_time:.2f}초, 적재 {load_time:.2f}초)")
+
+    return time.perf_counter() - start_time
+
+
+def main():
+    parser = argparse.ArgumentParser(description="user_logs 더미데이터 빠른 생성기")
+    parser.add_argument('--rows', type=int, default=1000000, help="생성할 총 행 수")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 4, help="producer 프로세스 수")
+    parser.add_argument('--method', choices=['infile', 'insert'], default='infile', help="적재 방식")
+    parser.add_argument('--chunk-rows', type=int, default=100000, help="producer가 한 번에 생성/적재하는 행 수")
+    parser.add_argument('--commit-interval', type=int, default=500000, help="이 행 수마다 commit")
+    parser.add_argument('--seed', type=int, default=42, help="난수 seed (같은 seed면 같은 데이터)")
+    parser.add_argument('--end-date', default=datetime.now().strftime('%Y-%m-%d'), help="created_at 범위의 끝 날짜 (YYYY-MM-DD)")
+    parser.add_argument('--schema', choices=['flat', 'partitioned', 'both'], default='flat',
+                        help="flat: user_logs(기존), partitioned: 월 파티션 user_logs_part, both: 같은 데이터로 둘 다 (비교용)")
+    parser.add_argument('--rollup', action='store_true', help="생성 후 user_logs_daily 요약 테이블도 구축 (rollup.py)")
+    args = parser.parse_args()
+
+    print("=" * 50)
+    print("📦 user_logs 더미데이터 빠른 생성")
+    print("=" * 50)
+    print(f"📊 목표: {args.rows:,}건 / producer {args.workers}개 / 방식: {args.method}")
+    print(f"📦 chunk: {args.chunk_rows:,}건, commit 간격: {args.commit_interval:,}건, seed: {args.seed}\n")
+
+    tables = []
+    if args.schema in ('flat', 'both'):
+        tables.append(('user_logs', CREATE_TABLE_SQL)) # generate_data.py와 같은 구조
+    if args.schema in ('partitioned', 'both'):
+        tables.append((PARTITIONED_TABLE, partitioned_table_sql(args.end_date)))
+
+    conn = pymysql.connect(**DB_CONFIG)
+    cursor = conn.cursor()
+
+    for table, create_sql in tables:
+        # 테이블 새로 만들기
+        cursor.execute(f"drop table if exists {table}")
+        cursor.execute(create_sql)
+        conn.commit()
+        print(f"\n✅ {table} 테이블 생성 완료!")
+
+        # 같은 seed로 생성하므로 schema=both면 두 테이블에 똑같은 데이터가 들어간다.
+        elapsed = generate(args.rows, args.workers, args.method, args.chunk_rows, args.commit_interval, args.seed, args.end_date, table)
+
+        cursor.execute(f"select count(*) from {table}")
+        count = cursor.fetchone()[0]
+
+        print(f"\n✅ {table} 더미데이터 생성 완료!")
+        print(f"⏱️  소요 시간: {elapsed:.2f}초 ({count / elapsed:,.0f} rows/sec)")
+        print(f"📊 생성된 데이터: {count:,}건")
+
+    if args.rollup and args.schema in ('flat', 'both'):
+        start = time.perf_counter()
+        n_rows = rollup.build_rollup(conn)
+        print(f"\n✅ {rollup.ROLLUP_TABLE} 요약 테이블 구축: {n_rows:,}행 ({time.perf_counter() - start:.2f}초)")
+
+    cursor.close()
+    conn.close()
+
+
+if __name__ == "__main__":
+    main() # multiprocessing은 윈도우에서 자식 프로세스가 이 파일을 다시 import 하므로, 꼭 이 안에서 실행해야 한다.
@@ -0,0 +1,234 @@
+# 인덱스 추천기 (Index Advisor)
+#
+# test_index.py는 사람이 정한 인덱스 구성(none/single/composite/covering)만 비교한다.
+# 여기서는 쿼리 세트(queries/*.json)를 읽어서
+#   1. 각 쿼리의 WHERE 조건 칼럼(= / 범위), GROUP BY 칼럼, ORDER BY 칼럼을 뽑고
+#   2. 그걸로 후보 인덱스(단일 칼럼 / 복합 인덱스)를 만든 뒤
+#   3. 후보를 하나씩 실제로 만들어서 측정하고 (test_index.py의 측정 함수 재사용)
+#   4. '지금 인덱스 상태' 대비 속도 향상과 인덱스 크기를 같이 보여주는 순위표를 만든다.
+# 후보 인덱스는 idx_adv_ 이름으로 만들고, 측정이 끝나면 그것만 지운다(losers drop). --apply를 주면 1등 인덱스만 남긴다.
+# 테이블에 원래 있던 인덱스(DBA가 만든 것, 이전 단계의 idx_user_id 등)는 지우지 않는다. (시작 전에 SHOW INDEX로 찍어 두고, 끝나면 그 상태로 복구)
+#
+# 복합 인덱스 칼럼 순서 규칙 (일반적인 설계 규칙):
+#   동등 조건(=, in) 칼럼 -> 정렬(ORDER BY)/그룹(GROUP BY) 칼럼 -> 범위 조건(between, <, >) 칼럼
+#   예) where user_id = 1234 order by created_at desc  ->  (user_id, created_at)
+#
+# 사용법:
+#   python index_advisor.py
+#   python index_advisor.py --queries queries/user_logs.json --iterations 20 --apply
+
+import argparse
+import re
+import time
+
+from test_index import (DEFAULT_QUERY_FILE, apply_index_config, benchmark_queries, bind_end_date, connect,
+                        index_size_bytes, list_secondary_indexes, load_query_set, restore_indexes, snapshot_indexes)
+
+INDEX_PREFIX = 'idx_adv_' # 추천기가 만드는 후보 인덱스 이름 (이 이름의 인덱스만 만들고 지움)
+CLAUSE_END = r'(?=\bgroup\s+by\b|\border\s+by\b|\blimit\b|\bhaving\b|$)'
+
+
+## 1. 쿼리 분석
+def parse_query(sql):
+    """
+    단순 SELECT 쿼리에서 인덱스 설계에 필요한 칼럼 추출 (정규식 기반. 서브쿼리/조인은 고려하지 않음)
+
+    Returns:
+        dict: {'equality': [...], 'range': [...], 'group_by': [...], 'order_by': [...]}
+    """
+    sql = ' '.join(sql.lower().split()) # 공백/줄바꿈 정리
+
+    where = re.search(r'\bwhere\b(.*?)' + CLAUSE_END, sql)
+    group_by = re.search(r'\bgroup\s+by\b(.*?)' + CLAUSE_END, sql)
+    order_by = re.search(r'\border\s+by\b(.*?)' + CLAUSE_END, sql)
+
+    equality, range_cols = [], []
+    if where:
+        for col, op in re.findall(r'(\w+)\s*(<=|>=|<>|!=|=|<|>|\bin\b|\bbetween\b|\blike\b)', where.group(1)):
+            target = equality if op in ('=', 'in') else range_cols
+            if col not in equality and col not in range_cols:
+                target.append(col)
+
+    def columns(match):
+        if not match:
+            return []
+        return [re.sub(r'\s+(asc|desc)$', '', c.strip()) for c in match.group(1).split(',')]
+
+    return {
+        'equality': equality,
+        'range': range_cols,
+        'group_by': columns(group_by),
+        'order_by': columns(order_by),
+    }
+
+
+def candidate_indexes(queries, table_columns):
+    """
+    쿼리 목록 -> 후보 인덱스 칼럼 조합 목록 (중복 제거, 테이블에 없는 칼럼은 제외)
+
+    Returns:
+        list[tuple]: [('user_id',), ('user_id', 'created_at'), ...]
+    """
+    candidates = []
+
+    def add(cols):
+        cols = tuple(dict.fromkeys(c for c in cols if c in table_columns)) # 순서 유지 + 중복 제거
+        if cols and cols not in candidates:
+            candidates.append(cols)
+
+    for q in queries:
+        parsed = parse_query(q['sql'])
+
+        # 단일 칼럼 후보
+        for col in parsed['equality'] + parsed['range']:
+            add([col])
+
+        # 복합 인덱스 후보: 동등 -> 정렬/그룹 -> 범위
+        add(parsed['equality'] + parsed['order_by'] + parsed['group_by'] + parsed['range'])
+        add(parsed['equality'] + parsed['range'])
+
+    return candidates
+
+
+def get_table_columns(conn, table):
+    cursor = conn.cursor()
+    cursor.execute(
+        "select column_name from information_schema.columns where table_schema = database() and table_name = %s",
+        (table,)
+    )
+    columns = {row[0].lower() for row in cursor.fetchall()}
+    cursor.close()
+    return columns
+
+
+## 2. 측정
+def workload_p50(results):
+    """쿼리 세트 전체를 한 번씩 돌렸을 때의 대표 시간 = 쿼리별 p50 합계"""
+    return sum(r['p50'] for r in results)
+
+
+def evaluate(conn, query_set, table, warmup, iterations):
+    """
+    '지금 인덱스 상태'(기존 보조 인덱스 유지) + 후보 인덱스 하나씩 측정
+    끝나면(실패해도) 후보 인덱스(idx_adv_*)를 지우고 시작 전 인덱스 상태로 되돌린다.
+
+    Returns:
+        (dict, list[dict]): (baseline 결과, 후보별 결과 [{'columns', 'sql', 'speedup', 'index_bytes', ...}])
+    """
+    queries = query_set['queries']
+    candidates = candidate_indexes(queries, get_table_columns(conn, table))
+
+    cursor = conn.cursor()
+    snapshot = snapshot_indexes(cursor, table)
+    existing = {tuple(c.lower() for c in cols): name for name, cols in list_secondary_indexes(cursor, table).items()}
+    base_size = index_size_bytes(cursor, table)
+    cursor.close()
+
+    print("\n" + "=" * 60)
+    print(f"📊 기준: 지금 인덱스 상태 (기존 보조 인덱스: {', '.join(snapshot) or '없음'})")
+    print("=" * 60)
+    baseline = benchmark_queries(conn, queries, table, warmup, iterations, with_plan=False)
+    base_total = workload_p50(baseline)
+    base_by_query = {r['name']: r['p50'] for r in baseline}
+
+    evaluated = []
+    created = [] # 지금 테이블에 있는 후보 인덱스 (다음 후보 만들 때 / 끝날 때 지움)
+    try:
+        for i, cols in enumerate(candidates, 1):
+            name = f"{INDEX_PREFIX}{'_'.join(cols)}"[:64] # MySQL 인덱스 이름 최대 64자
+            sql = f"create index {name} on {table}({', '.join(cols)})"
+
+            print("\n" + "=" * 60)
+            print(f"🔧 후보 {i}/{len(candidates)}: ({', '.join(cols)})")
+            print("=" * 60)
+
+            if cols in existing:
+                print(f"  ℹ️ 이미 같은 인덱스가 있음: {existing[cols]} -> 건너뜀")
+                continue
+
+            start = time.perf_counter()
+            apply_index_config(conn, table, [sql], created)
+            build_sec = time.perf_counter() - start
+
+            cursor = conn.cursor()
+            size = index_size_bytes(cursor, table) - base_size # 기존 인덱스 크기는 빼고 후보 인덱스만
+            cursor.close()
+
+            results = benchmark_queries(conn, queries, table, warmup, iterations, with_plan=False)
+            total = workload_p50(results)
+
+            evaluated.append({
+                'columns': cols,
+                'sql': sql,
+                'build_sec': build_sec,
+                'index_bytes': size,
+                'workload_p50': total,
+                'speedup': base_total / total if total > 0 else 0,
+                'per_query_speedup': {r['name']: base_by_query[r['name']] / r['p50'] if r['p50'] > 0 else 0 for r in results},
+            })
+
+    finally:
+        restore_indexes(conn, table, snapshot, created) # 후보 인덱스(losers)만 지움. 기존 인덱스는 그대로
+
+    return {'workload_p50': base_total, 'queries': baseline}, evaluated
+
+
+def rank(evaluated):
+    """속도 향상 큰 순서, 같으면 인덱스 크기 작은 순서"""
+    return sorted(evaluated, key=lambda e: (-e['speedup'], e['index_bytes']))
+
+
+def print_ranking(baseline, ranked):
+    print("\n" + "=" * 60)
+    print(f"🏆 인덱스 추천 순위 (기준 workload p50: {baseline['workload_p50'] * 1000:.2f}ms)")
+    print("=" * 60)
+
+    for i, e in enumerate(ranked, 1):
+        print(f"\n{i}. ({', '.join(e['columns'])})")
+        print(f"   전체 {e['speedup']:.1f}배 빠름 | 인덱스 크기 {e['index_bytes'] / 1024 / 1024:.1f}MB | 생성 {e['build_sec']:.2f}초")
+        for name, speedup in e['per_query_speedup'].items():
+            print(f"   - {name:20s} {speedup:8.1f}배")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="쿼리 세트 기반 인덱스 추천")
+    parser.add_argument('--queries', default=DEFAULT_QUERY_FILE, help="쿼리 세트 JSON 파일")
+    parser.add_argument('--table', help="대상 테이블 (기본: 쿼리 파일의 table)")
+    parser.add_argument('--warmup', type=int, default=2)
+    parser.add_argument('--iterations', type=int, default=10)
+    parser.add_argument('--apply', action='store_true', help="1등 인덱스를 테이블에 남김 (기본: 후보 인덱스는 측정 후 전부 삭제)")
+    parser.add_argument('--end-date', help="쿼리의 {end_date} 기준 날짜 (YYYY-MM-DD, 기본: 테이블 created_at의 끝 날짜)")
+    args = parser.parse_args()
+
+    query_set = load_query_set(args.queries)
+    table = args.table or query_set['table']
+
+    print("=" * 60)
+    print("🧭 인덱스 추천기")
+    print("=" * 60)
+
+    conn = connect()
+    try:
+        bind_end_date(conn, query_set, table, args.end_date)
+        for q in query_set['queries']:
+            print(f" - {q['name']}: {parse_query(q['sql'])}")
+
+        baseline, evaluated = evaluate(conn, query_set, table, args.warmup, args.iterations)
+        ranked = rank(evaluated)
+        print_ranking(baseline, ranked)
+
+        # 후보 인덱스는 evaluate()가 이미 지웠고 기존 인덱스는 그대로 -> --apply면 1등만 다시 만듦
+        winner = ranked[0] if ranked and args.apply and ranked[0]['speedup'] > 1 else None
+        if winner:
+            cursor = conn.cursor()
+            cursor.execute(winner['sql'])
+            conn.commit()
+            cursor.close()
+        print(f"\n✅ {'적용: ' + winner['sql'] if winner else '후보 인덱스 모두 삭제 완료 (기존 인덱스는 그대로)'}")
+
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,338 @@
+# user_logs 요약(rollup) 테이블 관리
+#
+# test_index.py의 '사용자별 카운트' 쿼리(group by user_id + between)는 매번 원본 로그 100만~1000만 건을 다시 집계한다.
+# 대신 (사용자, 날짜, 액션)별 건수를 미리 집계해 둔 user_logs_daily 테이블을 만들어 두면,
+# 같은 질문에 훨씬 적은 행(최대 사용자 수 x 일수 x 액션 수)만 읽고 답할 수 있다.
+#
+#   1. build_rollup(): 원본 전체를 한 번에 집계해서 채움 (처음 한 번 / 재구축)
+#   2. refresh_rollup(): 워터마크(마지막으로 반영한 log_id) 이후에 들어온 로그만 더함 (증분)
+#   3. count_by_user(): 조건이 요약 테이블로 답할 수 있는 형태면 요약 테이블에서, 아니면 원본에서 조회 (쿼리 라우터)
+#
+# ※ action / created_at이 NULL인 로그도 NULL 칸(bucket)으로 같이 집계한다. -> 요약 테이블과 원본(count(*))의 합계가 항상 같음.
+#    UNIQUE KEY는 NULL끼리 중복으로 보지 않아서 (user_id, day, action)에 바로 걸면 NULL 칸이 refresh 때마다 한 행씩 늘어난다.
+#    -> NULL이 안 되는 생성 칼럼(day_key, action_key)에 UNIQUE KEY를 걸어서 NULL 칸도 항상 한 행으로 합친다.
+#       (조회는 원래 칼럼 day/action으로 하므로, 기간/action 조건이 있으면 NULL 칸이 원본처럼 빠짐)
+# ※ 워터마크는 auto_increment log_id 기준이다. 적재가 여러 연결에서 동시에 진행 중일 때 refresh 하면
+#    작은 log_id가 나중에 commit 되어 빠질 수 있으므로, 적재가 끝난 뒤에 refresh 하는 것을 전제로 한다.
+#
+# 사용법:
+#   python rollup.py build        # 요약 테이블 새로 만들기
+#   python rollup.py refresh      # 새 로그만 반영
+#   python rollup.py bench        # 원본 vs 요약 테이블 조회 시간 비교
+
+import argparse
+import time
+from datetime import date
+
+import pymysql
+
+from test_index import connect, summarize_samples, time_query
+
+SOURCE_TABLE = 'user_logs'
+ROLLUP_TABLE = 'user_logs_daily'
+ER_NO_SUCH_TABLE = 1146 # MySQL 에러 코드: 테이블 없음
+
+CREATE_ROLLUP_SQL = f"""
+create table if not exists {ROLLUP_TABLE} (
+    id bigint primary key auto_increment,
+    user_id int not null,
+    day date, -- NULL: created_at이 없는 로그
+    action varchar(50), -- NULL: action이 없는 로그
+    cnt int not null,
+    day_key int generated always as (coalesce(to_days(day), -1)) stored not null, -- NULL 날짜 = -1
+    action_key varchar(51) generated always as (if(action is null, '', concat('=', action))) stored not null, -- NULL = '', 값 = '=값' (빈 문자열 action과 안 겹침)
+    unique key uk_user_day_action (user_id, day_key, action_key)
+) Engine = InnoDB
+"""
+
+# 어떤 원본 테이블을 어디까지(log_id) 반영했는지 기록
+CREATE_WATERMARK_SQL = """
+create table if not exists rollup_watermark (
+    rollup_table varchar(64) primary key,
+    last_log_id int not null,
+    updated_at datetime not null
+) Engine = InnoDB
+"""
+
+
+def create_tables(cursor):
+    # 예전 스키마(day_key/action_key 없음)로 만든 요약 테이블이면 지우고 새로 만든다. (워터마크도 지워서 다음 refresh가 전체 구축)
+    # DDL(+ 암묵적 commit)이라 build_rollup/refresh_rollup(과 generate_data_fast.py --rollup)에서만 부르고, 조회(라우터)에서는 안 부른다.
+    cursor.execute(CREATE_WATERMARK_SQL)
+    cursor.execute(
+        """
+        select count(*) = 0,
+               sum(column_name = 'day_key') = 0
+        from information_schema.columns where table_schema = database() and table_name = %s
+        """,
+        (ROLLUP_TABLE,)
+    )
+    missing, old_schema = cursor.fetchone()
+    if not missing and old_schema:
+        cursor.execute("delete from rollup_watermark where rollup_table = %s", (ROLLUP_TABLE,))
+        cursor.execute(f"drop table if exists {ROLLUP_TABLE}") # DDL이라 위 delete도 같이 commit 됨
+    cursor.execute(CREATE_ROLLUP_SQL)
+
+
+def get_watermark(cursor):
+    cursor.execute("select last_log_id from rollup_watermark where rollup_table = %s", (ROLLUP_TABLE,))
+    row = cursor.fetchone()
+    return row[0] if row else None
+
+
+def set_watermark(cursor, log_id):
+    cursor.execute(
+        """
+        insert into rollup_watermark (rollup_table, last_log_id, updated_at) values (%s, %s, now())
+        on duplicate key update last_log_id = values(last_log_id), updated_at = values(updated_at)
+        """,
+        (ROLLUP_TABLE, log_id)
+    )
+
+
+def max_log_id(cursor):
+    cursor.execute(f"select coalesce(max(log_id), 0) from {SOURCE_TABLE}")
+    return cursor.fetchone()[0]
+
+
+## 1. 전체 구축
+def build_rollup(conn):
+    """
+    요약 테이블을 비우고 원본 전체를 한 번의 INSERT ... SELECT ... GROUP BY로 채운다. (서버 안에서 집계 -> 파이썬으로 행이 안 옴)
+
+    비우기(DELETE) + 채우기 + 워터마크 이동을 한 트랜잭션으로 처리한다.
+    (TRUNCATE는 바로 commit 되는 DDL이라, 채우다 실패하면 빈 요약 테이블이 남고 라우터가 그걸 읽게 됨)
+    다른 연결은 commit 전까지 예전 요약 테이블을 그대로 본다.
+
+    Returns:
+        int: 요약 테이블 행 수
+    """
+    cursor = conn.cursor()
+    create_tables(cursor) # DDL이라 트랜잭션 시작 전에
+
+    try:
+        conn.begin()
+        upto = max_log_id(cursor) # 이 시점까지의 로그만 집계 (집계 중 새로 들어오는 로그는 다음 refresh에서)
+
+        cursor.execute(f"delete from {ROLLUP_TABLE}")
+        cursor.execute(
+            f"""
+            insert into {ROLLUP_TABLE} (user_id, day, action, cnt)
+            select user_id, date(created_at), action, count(*)
+            from {SOURCE_TABLE}
+            where log_id <= %s
+            group by user_id, date(created_at), action
+            """,
+            (upto,)
+        )
+        n_rows = cursor.rowcount
+        set_watermark(cursor, upto)
+        conn.commit()
+
+    except Exception:
+        conn.rollback() # 예전 요약 테이블 + 예전 워터마크 그대로
+        raise
+
+    finally:
+        cursor.close()
+
+    return n_rows
+
+
+## 2. 증분 반영
+def refresh_rollup(conn):
+    """
+    워터마크 이후의 로그(log_id > last_log_id)만 집계해서 기존 건수에 더한다.
+    집계 반영 + 워터마크 이동을 한 트랜잭션으로 처리하므로, 중간에 실패해도 같은 로그가 두 번 더해지지 않는다.
+
+    Returns:
+        (int, int): (반영한 원본 로그 범위의 시작 log_id, 끝 log_id). 새 로그가 없으면 (wm, wm)
+    """
+    cursor = conn.cursor()
+    create_tables(cursor)
+
+    watermark = get_watermark(cursor)
+    if watermark is None:
+        # 한 번도 구축한 적 없으면 전체 구축
+        cursor.close()
+        build_rollup(conn)
+        return 0, build_upto(conn)
+
+    upto = max_log_id(cursor)
+    if upto <= watermark:
+        cursor.close()
+        return watermark, watermark
+
+    try:
+        conn.begin()
+        cursor.execute(
+            f"""
+            insert into {ROLLUP_TABLE} (user_id, day, action, cnt)
+            select user_id, date(created_at), action, count(*)
+            from {SOURCE_TABLE}
+            where log_id > %s and log_id <= %s
+            group by user_id, date(created_at), action
+            on duplicate key update cnt = cnt + values(cnt)
+            """,
+            (watermark, upto)
+        )
+        set_watermark(cursor, upto)
+        conn.commit()
+
+    except Exception:
+        conn.rollback()
+        raise
+
+    finally:
+        cursor.close()
+
+    return watermark, upto
+
+
+def build_upto(conn):
+    """방금 build_rollup()이 반영한 마지막 log_id (= 워터마크)"""
+    cursor = conn.cursor()
+    try:
+        return get_watermark(cursor)
+    finally:
+        cursor.close()
+
+
+def rollup_lag(conn):
+    """
+    (워터마크, 원본의 마지막 log_id) (조회 전용: 테이블 생성/변경 없음)
+
+    Returns:
+        (int, int) | None: 요약 테이블을 아직 구축한 적 없으면(워터마크 테이블/행 없음) None
+    """
+    cursor = conn.cursor()
+    try:
+        watermark = get_watermark(cursor)
+        return None if watermark is None else (watermark, max_log_id(cursor))
+
+    except pymysql.err.ProgrammingError as e:
+        if e.args[0] == ER_NO_SUCH_TABLE:
+            return None
+        raise
+
+    finally:
+        cursor.close()
+
+
+def is_fresh(conn):
+    """요약 테이블이 원본의 마지막 로그까지 반영했는지 (아직 없으면 False)"""
+    lag = rollup_lag(conn)
+    return lag is not None and lag[0] >= lag[1]
+
+
+## 3. 쿼리 라우터
+def count_by_user(conn, user_from, user_to, start_day=None, end_day=None, action=None, allow_stale=False):
+    """
+    사용자별 로그 수 (user_id between user_from and user_to)
+
+    요약 테이블로 답할 수 있는 조건:
+      - 기간 조건이 날짜(date) 단위 (시각 단위 범위는 원본에서만 정확히 셀 수 있음)
+      - 요약 테이블이 최신 상태 (allow_stale=True면 최신이 아니어도 요약 테이블 사용. 아직 구축 안 했으면 항상 원본)
+    요약 테이블에도 action/created_at이 NULL인 로그가 NULL 칸으로 들어 있어서, 어느 쪽으로 가도 건수가 같다.
+    (NULL 칸은 원본과 똑같이 기간/action 조건이 있으면 빠지고, 조건이 없으면 포함됨)
+
+    Returns:
+        (list[(user_id, count)], str): (결과, 'rollup' 또는 'raw')
+    """
+    day_aligned = all(d is None or type(d) is date for d in (start_day, end_day)) # datetime은 date의 하위 클래스라서 type으로 비교
+    lag = rollup_lag(conn) if day_aligned else None # 요약 테이블이 없으면 None -> 원본에서 조회
+    use_rollup = lag is not None and (allow_stale or lag[0] >= lag[1])
+
+    conditions, params = ["user_id between %s and %s"], [user_from, user_to]
+
+    if use_rollup:
+        table, day_col, agg = ROLLUP_TABLE, "day", "sum(cnt)"
+    else:
+        table, day_col, agg = SOURCE_TABLE, "created_at", "count(*)"
+
+    if start_day is not None:
+        conditions.append(f"{day_col} >= %s")
+        params.append(start_day)
+    if end_day is not None:
+        if use_rollup:
+            conditions.append("day <= %s")
+        elif type(end_day) is date:
+            conditions.append("created_at < %s + interval 1 day") # 날짜 단위면 end_day 당일 포함 = 다음 날 0시 미만
+        else:
+            conditions.append("created_at <= %s")
+        params.append(end_day)
+    if action is not None:
+        conditions.append("action = %s")
+        params.append(action)
+
+    sql = f"select user_id, {agg} from {table} where {' and '.join(conditions)} group by user_id order by user_id"
+
+    cursor = conn.cursor()
+    cursor.execute(sql, params)
+    rows = [(user_id, int(cnt)) for user_id, cnt in cursor.fetchall()]
+    cursor.close()
+
+    return rows, 'rollup' if use_rollup else 'raw'
+
+
+## 4. 벤치마크 (원본 vs 요약)
+BENCH_QUERIES = [
+    ("사용자별 카운트",
+     f"select user_id, count(*) from {SOURCE_TABLE} where user_id between 1000 and 2000 group by user_id",
+     f"select user_id, sum(cnt) from {ROLLUP_TABLE} where user_id between 1000 and 2000 group by user_id"),
+    ("사용자별 최근 30일 카운트",
+     f"select user_id, count(*) from {SOURCE_TABLE} where user_id between 1000 and 2000 and created_at >= current_date - interval 30 day group by user_id",
+     f"select user_id, sum(cnt) from {ROLLUP_TABLE} where user_id between 1000 and 2000 and day >= current_date - interval 30 day group by user_id"),
+    ("액션별 일일 카운트",
+     f"select date(created_at), action, count(*) from {SOURCE_TABLE} group by date(created_at), action",
+     f"select day, action, sum(cnt) from {ROLLUP_TABLE} group by day, action"),
+]
+
+
+def benchmark(conn, warmup=2, iterations=10):
+    cursor = conn.cursor()
+
+    print("\n┌──────────────────────────────┬──────────────┬──────────────┬───────────┐")
+    print("│ 쿼리                         │ 원본 p50     │ 요약 p50     │ 속도 향상 │")
+    print("├──────────────────────────────┼──────────────┼──────────────┼───────────┤")
+
+    for name, raw_sql, rollup_sql in BENCH_QUERIES:
+        raw = summarize_samples(time_query(cursor, raw_sql, warmup, iterations)[0])
+        rolled = summarize_samples(time_query(cursor, rollup_sql, warmup, iterations)[0])
+        speedup = raw['p50'] / rolled['p50'] if rolled['p50'] > 0 else 0
+        print(f"│ {name:28s} │ {raw['p50'] * 1000:10.2f}ms │ {rolled['p50'] * 1000:10.2f}ms │ {speedup:8.1f}배 │")
+
+    print("└──────────────────────────────┴──────────────┴──────────────┴───────────┘")
+    cursor.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="user_logs_daily 요약 테이블 관리")
+    parser.add_argument('command', choices=['build', 'refresh', 'bench'])
+    parser.add_argument('--warmup', type=int, default=2)
+    parser.add_argument('--iterations', type=int, default=10)
+    args = parser.parse_args()
+
+    conn = connect()
+    try:
+        start = time.perf_counter()
+
+        if args.command == 'build':
+            n_rows = build_rollup(conn)
+            print(f"✅ {ROLLUP_TABLE} 구축 완료: {n_rows:,}행 ({time.perf_counter() - start:.2f}초)")
+
+        elif args.command == 'refresh':
+            old, new = refresh_rollup(conn)
+            print(f"✅ 증분 반영: log_id {old:,} -> {new:,} ({time.perf_counter() - start:.2f}초)")
+
+        else:
+            if not is_fresh(conn):
+                refresh_rollup(conn)
+            benchmark(conn, args.warmup, args.iterations)
+
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,126 +1,544 @@
-import pymysql
+# 인덱스 성능 비교 실험 (쿼리 벤치마크 하네스)
+#
+# 처음 버전은 쿼리 3개를 time.time()으로 한 번씩만 재서 '인덱스 없음 vs idx_user_id'를 비교했는데,
+# 한 번 잰 값(특히 첫 실행 = cold run)은 캐시 상태에 따라 들쭉날쭉해서 믿기 어렵다.
+#
+# 지금 버전:
+#   1. 쿼리 목록과 인덱스 구성은 파일(queries/*.json)에서 읽는다. (코드 수정 없이 실험 추가 가능)
+#   2. 워밍업 N회(버퍼 풀에 데이터 올리기) 후 M회 측정 -> p50/p95/p99 (time.perf_counter 사용)
+#   3. 인덱스 구성마다 EXPLAIN ANALYZE 실행 계획을 같이 저장
+#   4. 결과를 JSON으로 저장 -> --baseline으로 예전 결과와 비교해서 성능이 나빠졌는지(regression) 확인
+#   5. 테이블에 원래 있던 인덱스는 건드리지 않고, 측정용으로 만든 인덱스만 지운다. (끝나면 시작 전 인덱스 상태 그대로)
+#      --reset-indexes를 주면 원래 인덱스까지 잠시 지우고 '인덱스 없음'부터 측정한 뒤 다시 만든다.
+#
+# 사용법:
+#   python test_index.py                                          # 기본: none / single / composite / covering 비교
+#   python test_index.py --configs none,single --iterations 30
+#   python test_index.py --baseline results/benchmark_20251120_101500.json
+#   python test_index.py --reset-indexes                          # 기존 보조 인덱스도 잠시 지우고 측정 (끝나면 복구)
+#   python test_index.py --queries queries/user_logs_time_range.json --table user_logs,user_logs_part   # 파티션 프루닝 비교
+#   python test_index.py --queries queries/user_logs_time_range.json --end-date 2025-11-20   # 기간 쿼리 기준 날짜 직접 지정
+#
+# 다른 스크립트(index_advisor.py 등)에서도 import해서 함수만 가져다 쓸 수 있게, 실행 코드는 main() 안에 넣었다.
+
+import argparse
+import json
+import math
+import os
+import re
 import time
+from datetime import datetime
+
+import pymysql
+
+## 1. DB 연결 정보
+DB_CONFIG = {
+    'host': '127.0.0.1',
+    'user': 'root',
+    'password': '1234',
+    'database': 'shop_db'
+}
+
+DEFAULT_QUERY_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'queries', 'user_logs.json')
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+
+
+def connect():
+    return pymysql.connect(**DB_CONFIG)
+
+
+def load_query_set(path):
+    """
+    쿼리 세트 파일 읽기
+
+    파일 형식(JSON):
+        {
+            "table": "user_logs",
+            "queries": [{"name": "...", "sql": "select ... from {table} ..."}],
+            "index_configs": {"none": [], "single": ["create index ... on {table}(...)"]}
+        }
+    SQL 안의 {table}은 실행할 때 실제 테이블 이름으로 바뀐다.
+    {end_date}(기간 쿼리의 기준 날짜)는 bind_end_date()로 채운다.
+    """
+    with open(path, encoding='utf-8') as f:
+        query_set = json.load(f)
+
+    query_set.setdefault('table', 'user_logs')
+    query_set.setdefault('index_configs', {'none': []})
+    return query_set
+
+
+def data_end_date(cursor, table):
+    """
+    table의 created_at 범위 끝 날짜 'YYYY-MM-DD' (= generate_data_fast.py --end-date. 데이터가 end_date 0시 직전까지 있으므로 마지막 날짜 + 1일)
+    테이블이 비어 있으면 오늘
+    """
+    cursor.execute(f"select coalesce(date(max(created_at)) + interval 1 day, current_date) from {table}")
+    return str(cursor.fetchone()[0])
+
+
+def bind_end_date(conn, query_set, table, end_date=None):
+    """
+    쿼리 SQL의 {end_date}를 기준 날짜로 바꾼다. (now() 기준이면 데이터를 만든 날짜/측정하는 날짜에 따라 범위에 데이터가 거의 없을 수 있음)
+    end_date를 안 주면 table 데이터의 끝 날짜(data_end_date)
+
+    Returns:
+        str | None: 사용한 기준 날짜 ({end_date}를 쓰는 쿼리가 없으면 None)
+    """
+    if not any('{end_date}' in q['sql'] for q in query_set['queries']):
+        return None
+
+    if end_date is None:
+        cursor = conn.cursor()
+        end_date = data_end_date(cursor, table)
+        cursor.close()
+
+    for q in query_set['queries']:
+        q['sql'] = q['sql'].replace('{end_date}', end_date)
+
+    print(f"📅 기간 쿼리 기준 날짜: {end_date}")
+    return end_date
+
+
+## 2. 인덱스 관리
+def list_secondary_indexes(cursor, table):
+    """PRIMARY를 제외한 인덱스 목록 {인덱스 이름: [칼럼, ...]}"""
+    cursor.execute(f"show index from {table}")
+    indexes = {}
+
+    for row in cursor.fetchall():
+        # row[2]: 인덱스 이름, row[3]: 인덱스 안에서 칼럼 순서, row[4]: 칼럼 이름
+        if row[2] != 'PRIMARY':
+            indexes.setdefault(row[2], []).append((row[3], row[4]))
+
+    return {name: [col for _, col in sorted(cols)] for name, cols in indexes.items()}
+
+
+def drop_secondary_indexes(cursor, table):
+    for name in list_secondary_indexes(cursor, table):
+        cursor.execute(f"drop index `{name}` on {table}")
+
+
+def snapshot_indexes(cursor, table):
+    """
+    지금 있는 보조 인덱스 정의 {인덱스 이름: create index 문}
+    벤치마크 전에 찍어 두고, 끝나면 restore_indexes()로 이 상태로 되돌린다. (DBA나 이전 단계에서 만든 인덱스 보존)
+    """
+    cursor.execute(f"show index from {table}")
+    names = [d[0].lower() for d in cursor.description]
+    found = {}
+
+    for values in cursor.fetchall():
+        row = dict(zip(names, values))
+        if row['key_name'] == 'PRIMARY':
+            continue
+
+        if row.get('column_name') is None: # 함수 인덱스 (MySQL 8.0.13+)
+            column = f"({row['expression']})"
+        else:
+            column = f"`{row['column_name']}`"
+            column += f"({row['sub_part']})" if row.get('sub_part') else "" # 앞부분 길이 인덱스 (예: name(10))
+            column += " desc" if row.get('collation') == 'D' else ""
+
+        index = found.setdefault(row['key_name'], {'unique': not int(row['non_unique']), 'type': row.get('index_type'), 'columns': []})
+        index['columns'].append((row['seq_in_index'], column))
+
+    snapshot = {}
+    for name, index in found.items():
+        kind = 'unique ' if index['unique'] else {'FULLTEXT': 'fulltext ', 'SPATIAL': 'spatial '}.get(index['type'], '')
+        columns = ", ".join(col for _, col in sorted(index['columns']))
+        snapshot[name] = f"create {kind}index `{name}` on {table}({columns})"
+
+    return snapshot
+
+
+def restore_indexes(conn, table, snapshot, created=()):
+    """
+    벤치마크가 만든 인덱스(created)만 지우고, snapshot에 있었는데 없어진 인덱스(--reset-indexes로 지운 것)는 다시 만든다.
+    """
+    cursor = conn.cursor()
+    existing = list_secondary_indexes(cursor, table)
+
+    for name in created:
+        if name in existing and name not in snapshot:
+            cursor.execute(f"drop index `{name}` on {table}")
+
+    for name, sql in snapshot.items():
+        if name not in existing:
+            print(f"  ↩️ 기존 인덱스 복구: {sql}")
+            cursor.execute(sql)
+
+    conn.commit()
+    cursor.close()
+
+
+def apply_index_config(conn, table, statements, created, reset=False):
+    """
+    인덱스 구성 적용: 이전 구성에서 이 하네스가 만든 인덱스(created)만 지우고, 구성에 있는 인덱스 생성
+
+    - created: 하네스가 만든 인덱스 이름 목록. 여기서 바로 고쳐서(지운 건 빼고, 만든 건 추가) 중간에 실패해도
+      restore_indexes()가 정리할 수 있게 한다.
+    - 원래 테이블에 있던 인덱스는 건드리지 않는다. (공유 DB에서 돌려도 안전)
+    - reset=True(--reset-indexes)면 보조 인덱스를 전부 지우고 시작 -> 진짜 '인덱스 없음' 상태에서 측정.
+      이때는 끝나고 꼭 restore_indexes()로 되돌려야 한다. (run_benchmark가 finally에서 처리)
+    """
+    cursor = conn.cursor()
+
+    if reset:
+        drop_secondary_indexes(cursor, table)
+    else:
+        existing = list_secondary_indexes(cursor, table)
+        for name in created:
+            if name in existing:
+                cursor.execute(f"drop index `{name}` on {table}")
+    created.clear()
+
+    for sql in statements:
+        before = set(list_secondary_indexes(cursor, table))
+        name = re.search(r'\bindex\s+`?(\w+)`?', sql, re.IGNORECASE)
+        if name and name.group(1) in before:
+            # 원래 있던 인덱스와 이름이 같으면 새로 만들지 않고 그대로 씀 (예: 처음 버전이 만든 idx_user_id)
+            print(f"  ℹ️ {name.group(1)}: 이미 있는 인덱스 사용")
+            continue
+        cursor.execute(sql.format(table=table))
+        created += [n for n in list_secondary_indexes(cursor, table) if n not in before]
+
+    cursor.execute(f"analyze table {table}") # 인덱스 통계 갱신 (옵티마이저가 새 인덱스를 제대로 고려하도록)
+    cursor.fetchall()
+    conn.commit()
+    cursor.close()
+
+
+def index_size_bytes(cursor, table):
+    """테이블의 보조 인덱스 전체 크기 (information_schema 기준, 근사값)"""
+    cursor.execute(
+        "select index_length from information_schema.tables where table_schema = database() and table_name = %s",
+        (table,)
+    )
+    row = cursor.fetchone()
+    return int(row[0]) if row and row[0] is not None else 0
+
+
+## 3. 측정
+def percentile(samples, p):
+    """nearest-rank 방식 백분위수 (예: p=95 -> 95번째 백분위수)"""
+    ordered = sorted(samples)
+    k = max(0, math.ceil(p / 100 * len(ordered)) - 1)
+    return ordered[k]
+
+
+def time_query(cursor, sql, warmup=2, iterations=10):
+    """
+    워밍업 후 iterations번 실행해서 걸린 시간(초) 목록 반환
+
+    Returns:
+        (list[float], int): (측정값들, 결과 행 수)
+    """
+    for _ in range(warmup):
+        cursor.execute(sql)
+        cursor.fetchall()
+
+    samples = []
+    n_rows = 0
+    for _ in range(iterations):
+        start = time.perf_counter()
+        cursor.execute(sql)
+        n_rows = len(cursor.fetchall())
+        samples.append(time.perf_counter() - start)
+
+    return samples, n_rows
+
+
+def summarize_samples(samples):
+    return {
+        'p50': percentile(samples, 50),
+        'p95': percentile(samples, 95),
+        'p99': percentile(samples, 99),
+        'min': min(samples),
+        'max': max(samples),
+        'mean': sum(samples) / len(samples),
+    }
+
+
+def explain(cursor, sql):
+    """
+    실행 계획 텍스트
+
+    EXPLAIN ANALYZE(MySQL 8.0.18+)는 실제로 실행해서 행 수/시간까지 보여준다.
+    지원 안 하는 버전(MariaDB/XAMPP 등)이면 일반 EXPLAIN 결과를 표 형태 문자열로 돌려준다.
+    """
+    try:
+        cursor.execute(f"explain analyze {sql}")
+        return "\n".join(row[0] for row in cursor.fetchall())
+
+    except pymysql.MySQLError:
+        cursor.execute(f"explain {sql}")
+        columns = [d[0] for d in cursor.description]
+        return "\n".join(
+            " | ".join(f"{col}={val}" for col, val in zip(columns, row)) for row in cursor.fetchall()
+        )
+
+
+def explain_partitions(cursor, sql):
+    """
+    EXPLAIN 결과의 partitions 칼럼 (파티션 테이블에서 실제로 읽는 파티션 목록. 파티션 프루닝 확인용)
+
+    Returns:
+        str or None: 'p202510,p202511' 형식 (파티션 없는 테이블이면 None)
+    """
+    cursor.execute(f"explain {sql}")
+    columns = [d[0] for d in cursor.description]
+    rows = cursor.fetchall()
+
+    if 'partitions' not in columns:
+        return None
+
+    idx = columns.index('partitions')
+    used = [row[idx] for row in rows if row[idx]]
+    return ",".join(used) if used else None
+
+
+def benchmark_queries(conn, queries, table, warmup=2, iterations=10, with_plan=True):
+    """
+    현재 인덱스 상태에서 쿼리 목록 측정
+
+    Returns:
+        list[dict]: 쿼리별 {'name', 'sql', 'rows', 'samples', 'p50', 'p95', 'p99', ..., 'plan'}
+    """
+    cursor = conn.cursor()
+    results = []
+
+    for q in queries:
+        sql = q['sql'].format(table=table)
+        samples, n_rows = time_query(cursor, sql, warmup, iterations)
+        result = {'name': q['name'], 'sql': sql, 'rows': n_rows, 'samples': samples, **summarize_samples(samples)}
+
+        if with_plan:
+            result['plan'] = explain(cursor, sql)
+            result['partitions'] = explain_partitions(cursor, sql)
+
+        results.append(result)
+        print(f"  🔍 {q['name']:20s} p50 {result['p50'] * 1000:9.2f}ms | p95 {result['p95'] * 1000:9.2f}ms | p99 {result['p99'] * 1000:9.2f}ms | {n_rows}건")
+        if result.get('partitions'):
+            print(f"     ↳ 읽은 파티션: {result['partitions']}")
+
+    cursor.close()
+    return results
+
+
+def run_benchmark(conn, query_set, config_names=None, warmup=2, iterations=10, table=None, reset=False):
+    """
+    인덱스 구성마다: 인덱스 적용 -> 쿼리 측정
+    끝나면(실패해도) 테이블 인덱스를 시작 전 상태로 되돌린다. (reset: apply_index_config 참고)
+
+    Returns:
+        dict: JSON으로 저장할 전체 결과
+    """
+    table = table or query_set['table']
+    configs = query_set['index_configs']
+    config_names = config_names or list(configs)
+
+    output = {
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'table': table,
+        'warmup': warmup,
+        'iterations': iterations,
+        'configs': {},
+    }
+
+    cursor = conn.cursor()
+    snapshot = snapshot_indexes(cursor, table)
+    cursor.close()
+    output['existing_indexes'] = [] if reset else list(snapshot)
+
+    if snapshot and not reset:
+        print(f"\n📌 기존 보조 인덱스 유지: {', '.join(snapshot)}")
+        print("   (모든 구성이 이 인덱스가 있는 상태에서 측정됨. 완전히 비운 상태에서 비교하려면 --reset-indexes)")
+
+    created = []
+    try:
+        for name in config_names:
+            run_config(conn, query_set, table, name, created, reset, warmup, iterations, output)
+    finally:
+        restore_indexes(conn, table, snapshot, created)
+
+    return output
+
+
+def run_config(conn, query_set, table, name, created, reset, warmup, iterations, output):
+    """
+    인덱스 구성 하나 적용 + 측정 (결과는 output['configs'][name]에, 만든 인덱스 이름은 created에)
+    """
+    print("\n" + "=" * 60)
+    print(f"🔧 인덱스 구성: {name}")
+    print("=" * 60)
+
+    statements = query_set['index_configs'][name]
+    start = time.perf_counter()
+    apply_index_config(conn, table, statements, created, reset=reset)
+    build_sec = time.perf_counter() - start
+
+    cursor = conn.cursor()
+    size = index_size_bytes(cursor, table)
+    cursor.close()
+
+    for sql in statements:
+        print(f"  - {sql.format(table=table)}")
+    print(f"  (인덱스 생성 {build_sec:.2f}초, 보조 인덱스 크기 {size / 1024 / 1024:.1f}MB)")
+
+    output['configs'][name] = {
+        'statements': [sql.format(table=table) for sql in statements],
+        'build_sec': build_sec,
+        'index_bytes': size,
+        'queries': benchmark_queries(conn, query_set['queries'], table, warmup, iterations),
+    }
+
+
+## 4. 결과 출력/저장/비교
+def print_comparison(output, base_config=None):
+    """구성별 p50 비교표 (base_config 대비 몇 배 빠른지)"""
+    configs = list(output['configs'])
+    base_config = base_config or configs[0]
+    base = {q['name']: q['p50'] for q in output['configs'][base_config]['queries']}
+
+    print("\n" + "=" * 60)
+    print(f"📈 p50 비교 (기준: {base_config})")
+    print("=" * 60)
+
+    for name in configs:
+        print(f"\n[{name}]")
+        for q in output['configs'][name]['queries']:
+            speedup = base[q['name']] / q['p50'] if q['p50'] > 0 else 0
+            print(f"  {q['name']:20s} {q['p50'] * 1000:9.2f}ms  ({speedup:6.1f}배)")
+
 
-print("=" * 60)
-print("🔬 인덱스 성능 비교 실험")
-print("=" * 60)
-
-## 1. DB 연결
-conn = pymysql.connect(
-    host='127.0.0.1',
-    user='root',
-    password='1234',
-    database='shop_db'
-)
-
-cursor = conn.cursor()
-
-# 테스트 쿼리들 -> 튜플 리스트로 만듦. 2차원 배열 구조랑 비슷하고(이는 또 테이블 형식과 유사하고), 하지만 튜플은 2차원 배열과 다르게 수정이 불가능하다. 
-# 왜 튜플을 사용할까? -> 일단 가장 큰 이유는, 1. DB가 튜플로 반환함.(조회 결과는 수정되면 안 됨. 성능 최적화. 표준 관례의 이유로..) 2. 튜플이 리스트보다 (메모리 적게 쓰고, 생성 속도 빠르고, 반복 속도 빠름). 3. 튜플은 딕셔너리 키로 사용 가능(리스트는 불가능) 4. 언패킹이 편함. 등등...
-test_queries = [
-    ("특정 사용자 조회", "select * from user_logs where user_id = 5000"),
-    ("사용자별 카운트", "select user_id, count(*) from user_logs where user_id between 1000 and 2000 group by user_id"),
-    ("최근 로그 조회", "select * from user_logs where user_id=1234 order by created_at desc limit 10 ")
-]
+def print_table_comparison(outputs):
+    """
+    같은 쿼리/인덱스 구성을 여러 테이블(예: user_logs vs user_logs_part)에서 돌린 결과 비교
+    첫 번째 테이블 기준으로 몇 배 빠른지 + 읽은 파티션 수
+    """
+    tables = list(outputs)
+    base_table = tables[0]
 
-print("\n" + "=" * 60)
-print("📊 1단계: 인덱스 없이 실행")
-print("=" * 60)
+    print("\n" + "=" * 60)
+    print(f"📈 테이블 비교 (기준: {base_table})")
+    print("=" * 60)
 
-results_without_index = []
+    for config, base_result in outputs[base_table]['configs'].items():
+        print(f"\n[인덱스 구성: {config}]")
+        base = {q['name']: q['p50'] for q in base_result['queries']}
 
-for name, query in test_queries:
-    print(f"\n🔍 테스트: {name}")
-    print(f"쿼리: {query[:60]}...") # 60글자만 출력
+        for table in tables:
+            for q in outputs[table]['configs'][config]['queries']:
+                speedup = base[q['name']] / q['p50'] if q['p50'] > 0 else 0
+                parts = q.get('partitions')
+                n_parts = f"{len(parts.split(','))}개 파티션" if parts else "-"
+                print(f"  {table:16s} {q['name']:22s} {q['p50'] * 1000:9.2f}ms ({speedup:6.1f}배) | {n_parts}")
 
-    # 시간 측정
-    start = time.time()
-    cursor.execute(query) # 실제 실행하는 코드
-    result = cursor.fetchall()
-    elapsed = time.time() - start
 
-    results_without_index.append(elapsed)
-    print(f"⏱️  실행 시간: {elapsed:.4f}초")
-    print(f"📝 결과 수: {len(result)}건") # 행의 갯수. 
+def save_results(output, path=None):
+    if path is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        path = os.path.join(RESULTS_DIR, f"benchmark_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
 
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(output, f, ensure_ascii=False, indent=2)
 
-# 인덱스 생성
-print("\n" + "=" * 60)
-print("🔧 2단계: 인덱스 생성")
-print("=" * 60)
+    print(f"\n💾 결과 저장: {path}")
+    return path
 
-print("\n인덱스 생성 중...")
-cursor.execute("CREATE INDEX idx_user_id on user_logs(user_id)") # 인덱스 생성 코드
-conn.commit()
-print("✅ 인덱스 생성 완료: idx_user_id (user_id 컬럼)")
 
-# 인덱스 확인
-cursor.execute("show index from user_logs")
-indexes = cursor.fetchall()
-print("\n📋 생성된 인덱스:")
+def compare_with_baseline(output, baseline_path, threshold=1.2, table=None):
+    """
+    예전 결과 파일과 p50 비교. threshold배 이상 느려진 쿼리는 regression으로 표시
+    baseline이 여러 테이블 결과 파일({'tables': {...}})이면 그중 table의 결과와, 테이블 하나짜리면 같은 테이블일 때만 비교한다.
 
-for idx in indexes:
-    print(f" - {idx[2]} (칼럼: {idx[4]})") # 이제서야 얘기하지만, 일일이 claude에게 질문하지 말고, 결과 직접 돌려서 나온 결과값들로 얻고 싶은 열들 직접 추리면 된다. 하지만, 이번 실습에서는 claude에게 질문을 통해 얻어갈 거임.
-    #idx[2]: 인덱스 이름, idx[4]: 칼럼 이름
+    Returns:
+        list[(config, query, 예전 p50, 지금 p50)]: 느려진 항목들
+    """
+    with open(baseline_path, encoding='utf-8') as f:
+        baseline = json.load(f)
 
+    regressions = []
+    print("\n" + "=" * 60)
+    print(f"🔁 baseline 비교: {baseline_path}{f' ({table})' if table else ''}")
+    print("=" * 60)
 
-# 인덱스 있을 때 실행
-print("\n" + "=" * 60)
-print("📊 3단계: 인덱스 있을 때 실행")
-print("=" * 60)
+    if 'tables' in baseline:
+        baseline = baseline['tables'].get(table)
+    elif table is not None and baseline.get('table', table) != table:
+        baseline = None
+    if baseline is None:
+        print(f"⚠️ baseline에 {table} 결과 없음 -> 비교 건너뜀")
+        return regressions
 
-results_with_index = []
+    for config, result in output['configs'].items():
+        if config not in baseline['configs']:
+            continue
+        old = {q['name']: q['p50'] for q in baseline['configs'][config]['queries']}
 
-for name, query in test_queries:
-    print(f"\n🔍 테스트: {name}")
-    print(f"쿼리: {query[:60]}...")
-    
-    # 시간 측정
-    start = time.time()
-    cursor.execute(query)
-    result = cursor.fetchall()
-    elapsed = time.time() - start
-    
-    results_with_index.append(elapsed)
-    print(f"⏱️  실행 시간: {elapsed:.4f}초")
-    print(f"📝 결과 수: {len(result)}건")
+        for q in result['queries']:
+            if q['name'] not in old:
+                continue
+            ratio = q['p50'] / old[q['name']] if old[q['name']] > 0 else 0
+            mark = "⚠️ " if ratio >= threshold else "  "
+            print(f"{mark}[{config}] {q['name']:20s} {old[q['name']] * 1000:9.2f}ms -> {q['p50'] * 1000:9.2f}ms ({ratio:.2f}x)")
+            if ratio >= threshold:
+                regressions.append((config, q['name'], old[q['name']], q['p50']))
 
+    return regressions
 
-# 결과 비교
-print("\n" + "=" * 60)
-print("📈 4단계: 성능 비교 결과")
-print("=" * 60)
 
-print("\n┌─────────────────────────┬──────────────┬──────────────┬───────────┐")
-print("│ 테스트                  │ 인덱스 없음  │ 인덱스 있음  │ 속도 향상 │")
-print("├─────────────────────────┼──────────────┼──────────────┼───────────┤")
+def main():
+    parser = argparse.ArgumentParser(description="user_logs 인덱스 성능 비교 벤치마크")
+    parser.add_argument('--queries', default=DEFAULT_QUERY_FILE, help="쿼리 세트 JSON 파일")
+    parser.add_argument('--configs', help="실행할 인덱스 구성 (쉼표 구분, 기본: 파일에 있는 전부)")
+    parser.add_argument('--table', help="대상 테이블 (기본: 쿼리 파일의 table). 쉼표로 여러 개 주면 테이블끼리 비교 (예: user_logs,user_logs_part)")
+    parser.add_argument('--warmup', type=int, default=2, help="워밍업 실행 횟수")
+    parser.add_argument('--iterations', type=int, default=10, help="측정 실행 횟수")
+    parser.add_argument('--output', help="결과 JSON 경로 (기본: results/benchmark_<시각>.json)")
+    parser.add_argument('--baseline', help="비교할 예전 결과 JSON")
+    parser.add_argument('--end-date', help="쿼리의 {end_date} 기준 날짜 (YYYY-MM-DD, 기본: 첫 번째 테이블 created_at의 끝 날짜)")
+    parser.add_argument('--reset-indexes', action='store_true',
+                        help="기존 보조 인덱스까지 지우고 측정 (끝나면 복구). 기본: 기존 인덱스는 그대로 두고 측정용 인덱스만 만들고 지움")
+    args = parser.parse_args()
 
-for i, (name, _) in enumerate(test_queries): # i는 앞에 for 구문으로 돌린 3개의 쿼리를 의미함.(즉, i는 3임). (name, _)는 query에서 튜플의 요소들을 의미함. enumerate는 인덱스(숫자)를 추가하여 (인덱스,요소) 쌍으로 만들어주는 함수임.
-    without = results_without_index[i]
-    with_idx = results_with_index[i]
-    improvement = without/with_idx if with_idx > 0 else 0
+    print("=" * 60)
+    print("🔬 인덱스 성능 비교 실험")
+    print("=" * 60)
 
-    print(f"│ {name:23s} │ {without:11.4f}초 │ {with_idx:11.4f}초 │ {improvement:8.1f}배 │")
-    # name:23s -> 빈칸 포함 총 23칸으로 문자열로 출력. without:11.4f/with_idx:11.4f -> 11칸 너비로, 소숫점 4째자리까지 실수 형태로. improvement:8.1f -> 8칸 너비로, 소숫점 첫째자리까지 실수 형태로.
+    query_set = load_query_set(args.queries)
+    config_names = args.configs.split(',') if args.configs else None
 
-print("└─────────────────────────┴──────────────┴──────────────┴───────────┘")
+    tables = args.table.split(',') if args.table else [query_set['table']]
 
+    conn = connect()
+    try:
+        bind_end_date(conn, query_set, tables[0], args.end_date) # 테이블끼리 비교할 때도 같은 기준 날짜
+        outputs = {table: run_benchmark(conn, query_set, config_names, args.warmup, args.iterations, table, args.reset_indexes) for table in tables}
+    finally:
+        conn.close()
 
-# 평균 계산
-avg_without = sum(results_without_index) / len(results_without_index)
-avg_with = sum(results_with_index) / len(results_with_index)
-avg_improvement = avg_without / avg_with if avg_with > 0 else 0
+    if len(tables) > 1:
+        # 여러 테이블 비교 (예: 일반 테이블 vs 월 파티션 테이블)
+        print_table_comparison(outputs)
+        save_results({'tables': outputs}, args.output)
 
-print(f"\n📊 평균 성능:")
-print(f"  인덱스 없음: {avg_without:.4f}초")
-print(f"  인덱스 있음: {avg_with:.4f}초")
-print(f"  평균 {avg_improvement:.1f}배 빠름! 🚀")
+    else:
+        print_comparison(outputs[tables[0]])
+        save_results(outputs[tables[0]], args.output)
 
-cursor.close()
-conn.close()
+    if args.baseline:
+        # 테이블마다 baseline의 같은 테이블 결과와 비교 (예전에는 테이블이 여러 개면 --baseline이 무시됐음)
+        regressions = []
+        for table in tables:
+            regressions += compare_with_baseline(outputs[table], args.baseline, table=table)
+        print(f"\n{'⚠️ 느려진 쿼리 ' + str(len(regressions)) + '개' if regressions else '✅ 느려진 쿼리 없음'}")
 
+    print("\n" + "=" * 60)
+    print("🎉 실험 완료!")
+    print("=" * 60)
 
-print("\n" + "=" * 60)
-print("🎉 실험 완료!")
-print("=" * 60)
 
+if __name__ == "__main__":
+    main()
@@ -22,7 +22,31 @@ LOG_CONFIG = {
 ## 3. 파일 경로
 PATHS = {
     'reports': './reports/', # CSV 저장할 폴더
-    'logs': './logs'
+    'parquet': './reports/parquet/', # Parquet 저장할 폴더 (report_date=YYYY-MM-DD/ 하위 폴더로 나뉨)
+    'logs': './logs',
+    'metrics': './logs/metrics.jsonl', # 단계별 성능 지표(JSON Lines). metrics.py 참고
 }
 
 
+## 4. DB 적재 설정
+LOAD_CONFIG = {
+    'batch_size': 1000, # 한 번의 multi-row INSERT에 담을 행 수. 너무 크면 max_allowed_packet을 넘을 수 있음.
+    'mode': 'replace', # 'replace': 해당 날짜만 지우고 다시 넣기(멱등), 'upsert': 덮어쓰기만
+    'formats': ['csv'], # 파일 출력 형식. Parquet도 같이 쓰려면 ['csv', 'parquet'] (pyarrow 필요)
+    'parquet_compression': 'snappy', # 'snappy'(빠름) 또는 'zstd'(더 작음)
+}
+
+
+## 5. 추출 설정
+EXTRACT_CONFIG = {
+    'chunksize': 10000, # 서버 사이드 커서에서 한 번에 가져올(fetchmany) 행 수
+    'pushdown': False, # True면 리포트 집계를 MySQL GROUP BY로 (실패하면 pandas 집계로 대체)
+}
+
+
+## 6. 커넥션 풀 설정 (db_pool.py)
+POOL_CONFIG = {
+    'max_size': 8, # 최대 연결 수
+    'idle_timeout': 300, # 이 시간(초) 넘게 안 쓴 연결은 닫음
+    'checkout_timeout': 30, # 연결을 빌릴 때 최대 대기 시간(초)
+}
@@ -0,0 +1,189 @@
+# 'db_pool.py'는 extract/load가 같이 쓰는 DB 커넥션 풀(Connection Pool) 모듈입니다.
+# 예전에는 extract.py, load.py가 각자 get_db_connection()을 가지고 있어서, 호출할 때마다 새로 연결(TCP + 인증)을 맺고 끊었다.
+# 이제는 한 번 맺은 연결을 풀에 보관했다가 다음 호출에서 다시 빌려 쓴다.
+
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+import pymysql
+
+from config import DB_CONFIG, POOL_CONFIG
+
+logger = logging.getLogger(__name__)
+
+
+class ConnectionPool:
+    """
+    스레드 안전한 pymysql 커넥션 풀
+    
+    - max_size: 동시에 열 수 있는 최대 연결 수. 다 빌려갔으면 반납될 때까지 기다린다. (checkout_timeout초 넘으면 에러)
+    - 빌려줄 때 ping()으로 연결이 살아 있는지 확인하고, 죽었으면 버리고 새로 맺는다. (health check)
+    - idle_timeout초 넘게 안 쓰인 연결은 닫는다. (idle eviction. MySQL의 wait_timeout에 끊기기 전에 정리)
+    - hit(재사용) / miss(새로 연결) / 대기 시간을 세어 두었다가 stats()로 보여준다.
+    """
+
+    def __init__(self, db_config, max_size=8, idle_timeout=300, checkout_timeout=30):
+        self.db_config = db_config
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.checkout_timeout = checkout_timeout
+
+        self._idle = [] # [(conn, 마지막 반납 시각), ...]
+        self._created = 0 # 현재 열려 있는 연결 수 (빌려준 것 + 쉬고 있는 것)
+        self._cond = threading.Condition()
+        self._stats = {'hits': 0, 'misses': 0, 'waits': 0, 'wait_time': 0.0, 'evicted': 0, 'broken': 0}
+
+    def _evict_idle(self):
+        """오래 쉬고 있는 연결 정리 (lock을 잡은 상태에서 호출)"""
+        now = time.monotonic()
+        alive = []
+
+        for conn, last_used in self._idle:
+            if now - last_used > self.idle_timeout:
+                self._close(conn)
+                self._stats['evicted'] += 1
+            else:
+                alive.append((conn, last_used))
+
+        self._idle = alive
+
+    def _close(self, conn):
+        self._created -= 1
+        try:
+            conn.close()
+        except Exception:
+            pass # 이미 끊긴 연결이면 close()도 실패할 수 있음.
+
+    def acquire(self):
+        """연결 하나 빌리기"""
+        start = time.monotonic()
+        waited = False
+
+        while True:
+            with self._cond:
+                self._evict_idle()
+
+                if self._idle:
+                    conn, _ = self._idle.pop()
+                    self._stats['hits'] += 1
+                    new = False
+
+                elif self._created < self.max_size:
+                    self._created += 1
+                    self._stats['misses'] += 1
+                    new = True
+
+                else:
+                    # 다 빌려갔음 -> 반납될 때까지 대기
+                    remaining = self.checkout_timeout - (time.monotonic() - start)
+                    if remaining <= 0:
+                        raise TimeoutError(f"커넥션 풀 대기 시간 초과 ({self.checkout_timeout}초, max_size={self.max_size})")
+                    waited = True
+                    self._cond.wait(remaining)
+                    continue
+
+                if waited:
+                    self._stats['waits'] += 1
+                    self._stats['wait_time'] += time.monotonic() - start
+
+            # 실제 연결/ping은 네트워크 작업이라 lock 밖에서 한다.
+            if new:
+                try:
+                    return pymysql.connect(**self.db_config)
+                except Exception:
+                    with self._cond:
+                        self._created -= 1
+                        self._cond.notify()
+                    raise
+
+            try:
+                conn.ping(reconnect=False) # health check
+                return conn
+            except Exception:
+                logger.warning("죽은 연결 발견 -> 버리고 다시 연결")
+                with self._cond:
+                    self._close(conn)
+                    self._stats['broken'] += 1
+
+    def release(self, conn, broken=False):
+        """연결 반납 (broken=True면 풀에 넣지 않고 닫음)"""
+        with self._cond:
+            if broken:
+                self._close(conn)
+            else:
+                self._idle.append((conn, time.monotonic()))
+            self._cond.notify()
+
+    @contextmanager
+    def connection(self):
+        conn = self.acquire()
+        broken = False
+
+        try:
+            yield conn
+
+        except Exception as e:
+            logger.error(f"Error: {e}")
+            raise
+
+        finally:
+            try:
+                conn.rollback() # commit 안 한 작업은 버리고 깨끗한 상태로 반납 (다음 사용자에게 트랜잭션이 넘어가지 않도록)
+            except Exception:
+                broken = True
+            self.release(conn, broken=broken)
+
+    def stats(self):
+        with self._cond:
+            return {**self._stats, 'open': self._created, 'idle': len(self._idle)}
+
+    def log_stats(self):
+        s = self.stats()
+        logger.info(
+            f"커넥션 풀: hit {s['hits']}회, miss(새 연결) {s['misses']}회, "
+            f"대기 {s['waits']}회({s['wait_time']:.3f}초), 정리 {s['evicted']}개, 끊김 {s['broken']}개, "
+            f"열린 연결 {s['open']}개(idle {s['idle']}개)"
+        )
+
+    def close_all(self):
+        with self._cond:
+            for conn, _ in self._idle:
+                self._close(conn)
+            self._idle = []
+
+
+## 모듈 전체에서 하나만 쓰는 풀 (extract/load/백필 스레드가 모두 공유)
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    global _pool
+
+    with _pool_lock:
+        if _pool is None:
+            _pool = ConnectionPool(DB_CONFIG, **POOL_CONFIG)
+        return _pool
+
+
+def init_pool(**overrides):
+    """
+    설정을 바꿔서 풀을 새로 만든다. (예: 백필 workers 수에 맞춰 max_size 늘리기)
+    기존 풀의 쉬고 있는 연결은 닫는다.
+    """
+    global _pool
+
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close_all()
+        _pool = ConnectionPool(DB_CONFIG, **{**POOL_CONFIG, **overrides})
+        return _pool
+
+
+@contextmanager
+def get_db_connection():
+    """DB 연결 Context Manager (풀에서 빌리고, with 블록이 끝나면 반납)"""
+    with get_pool().connection() as conn:
+        yield conn
@@ -1,37 +1,17 @@
 # 'extract.py'는 데이터베이스에서 원하는 데이터를 추출하는 모듈입니다.
 # 'ETL 파이프라인'에서 'E(Extract)' 부분입니다.
 
-import pymysql
+import pymysql.cursors
 import pandas as pd
 import logging
-from config import DB_CONFIG, LOG_CONFIG
-from contextlib import contextmanager
+from config import LOG_CONFIG, EXTRACT_CONFIG
+from db_pool import get_db_connection # extract/load 공용 커넥션 풀
 
 ## 로그 설정
 logger = logging.getLogger(__name__) # '__name__':파이썬의 특수 변수. 현재 파일(모듈)의 이름을 담고 있는 변수. 비슷한 개념으로는, '__main__'(실행 파일)이 있다.
 # 어느 파일에서 발생한 로그인지 알 수 있음. '__name__' 안 쓰면, 기본인 'root'에서 가져옴.
 # 뒤 코드에서 보면, 'logger.info','logger.error' 이렇게 썼는데, 이를 통해 자동으로 'extract.py'에서 일어난 로그로 기록한다.
 
-## context Manager
-@contextmanager
-def get_db_connection():
-
-    # 연결 열기
-    conn = pymysql.connect(
-        **DB_CONFIG # 'config.py'에 미리 적어 둠. '**'의 의미는 '딕셔너리 언패킹'이라는 의미이다.
-    )
-
-    try:
-        yield conn # yield에서 잠시 멈추고, conn을 with에 넘김.
-
-    except Exception as e:
-        logger.error(f"Error: {e}") # logging이 아닌 logger
-        raise
-
-    finally:
-        conn.close()
-
-
 ## 메인 함수 
 def extract_sales_data(target_date):
     """
@@ -46,13 +26,14 @@ def extract_sales_data(target_date):
      
     try:
         with get_db_connection() as conn: # conn을 받아서 실제 작업을 하는 곳
-             query = f"""
+             # f-string으로 날짜를 직접 넣으면 SQL Injection 위험이 있으므로, %s 파라미터로 전달한다.
+             query = """
                     select date, category, product, quantity, price
                     from sales
-                    where date = '{target_date}'
+                    where date = %s
             """
              
-             df = pd.read_sql(query,conn)
+             df = pd.read_sql(query, conn, params=(target_date,))
 
              logger.info(f"{target_date} 데이터 {len(df)}건 추출 완료!")
              return df
@@ -62,6 +43,273 @@ def extract_sales_data(target_date):
         return None
 
 
+SALES_COLUMNS = ['date', 'category', 'product', 'quantity', 'price']
+
+
+def ensure_sales_date_index(conn):
+    """
+    sales(date) 인덱스가 없으면 생성
+    
+    기간 조회(where date between ... order by date)가 테이블 전체를 훑지 않고,
+    인덱스 순서대로 필요한 범위만 읽게 해준다.
+    """
+    cursor = conn.cursor()
+    cursor.execute("show index from sales where column_name = 'date' and seq_in_index = 1")
+
+    if not cursor.fetchall():
+        logger.info("sales(date) 인덱스 생성: idx_sales_date")
+        cursor.execute("create index idx_sales_date on sales(date)")
+
+    cursor.close()
+
+
+def prepare_sales_indexes(pushdown=False):
+    """
+    파이프라인 시작 전(스키마 준비 단계)에 sales 조회용 인덱스를 만들어 둔다.
+    CREATE INDEX는 DDL(암묵적 commit + 테이블 잠금)이라, 추출 함수 안에서 조회할 때마다 확인하지 않고 여기서 한 번만 실행한다.
+    
+    Args:
+        pushdown (bool): True면 SQL 집계용 커버링 인덱스도 생성
+    """
+    with get_db_connection() as conn:
+        ensure_sales_date_index(conn)
+        if pushdown:
+            ensure_sales_covering_index(conn)
+
+
+def _iter_chunks(conn, query, params, chunksize):
+    """
+    서버 사이드 커서(SSCursor)로 결과를 chunksize 행씩 DataFrame으로 나눠서 돌려준다.
+    
+    일반 커서는 결과 전체를 한 번에 클라이언트 메모리로 가져오지만,
+    SSCursor는 서버에 결과를 두고 fetchmany()로 필요한 만큼만 가져온다.
+    """
+    cursor = conn.cursor(pymysql.cursors.SSCursor)
+
+    try:
+        cursor.execute(query, params)
+
+        while True:
+            rows = cursor.fetchmany(chunksize)
+            if not rows:
+                break
+            yield pd.DataFrame.from_records(rows, columns=SALES_COLUMNS)
+
+    finally:
+        cursor.close() # 남은 결과를 다 읽고 닫아야 같은 연결을 다시 쓸 수 있음.
+
+
+def extract_sales_range(start_date, end_date, chunksize=None):
+    """
+    기간(start_date ~ end_date)의 판매 데이터를 한 번의 스캔으로 추출해서, 날짜별 DataFrame으로 하나씩 돌려주는 제너레이터
+    
+    - 날짜마다 쿼리를 날리지 않고, 'order by date'로 한 번만 읽는다.
+    - chunk 경계에 걸친 날짜는 다음 chunk와 합쳐서 완성된 뒤에 yield 한다.
+    - 메모리에는 '하루치 + chunk 1개' 정도만 올라간다. (기간이 길어도 일정)
+    - sales(date) 인덱스는 prepare_sales_indexes()로 미리 만들어 둔다. (조회 함수 안에서 DDL을 실행하지 않음)
+    
+    Args:
+        start_date (str): 시작 날짜 (예: '2024-11-01')
+        end_date (str): 종료 날짜 (예: '2024-11-30')
+        chunksize (int): fetchmany 크기 (기본값: config.EXTRACT_CONFIG['chunksize'])
+    
+    Yields:
+        (str, DataFrame): ('2024-11-19', 그 날짜의 판매 데이터)
+    """
+
+    if chunksize is None:
+        chunksize = EXTRACT_CONFIG['chunksize']
+
+    query = """
+        select date, category, product, quantity, price
+        from sales
+        where date between %s and %s
+        order by date
+    """
+
+    with get_db_connection() as conn:
+        pending = [] # 아직 끝나지 않은(다음 chunk에 이어질 수 있는) 날짜의 조각들
+        total = 0
+
+        for chunk in _iter_chunks(conn, query, (start_date, end_date), chunksize):
+            total += len(chunk)
+            last_date = chunk['date'].iloc[-1]
+
+            # 이 chunk의 마지막 날짜 이전 날짜들은 완성됨
+            done = chunk[chunk['date'] != last_date]
+            for target_date, group in done.groupby('date', sort=False):
+                if pending and pending[0]['date'].iloc[0] != target_date:
+                    # 이전 chunk에서 넘어온 날짜가 이 chunk에서 이어지지 않고 끝난 경우
+                    df = pd.concat(pending, ignore_index=True)
+                    pending = []
+                    yield str(df['date'].iloc[0]), df
+
+                df = pd.concat(pending + [group], ignore_index=True)
+                pending = []
+                yield str(target_date), df
+
+            if pending and pending[0]['date'].iloc[0] != last_date:
+                df = pd.concat(pending, ignore_index=True)
+                pending = []
+                yield str(df['date'].iloc[0]), df
+
+            pending.append(chunk[chunk['date'] == last_date])
+
+        if pending:
+            df = pd.concat(pending, ignore_index=True)
+            yield str(df['date'].iloc[0]), df
+
+        logger.info(f"{start_date} ~ {end_date} 데이터 {total}건 추출 완료!")
+
+
+def extract_sales_chunks(target_date, chunksize=None):
+    """
+    특정 날짜의 판매 데이터를 chunksize 행씩 나눠서 돌려주는 제너레이터 (transform 스트리밍 모드용)
+    
+    Args:
+        target_date (str): 추출할 날짜 (예: '2024-11-19')
+        chunksize (int): 한 번에 가져올 행 수 (기본값: config.EXTRACT_CONFIG['chunksize'])
+    
+    Yields:
+        DataFrame: 최대 chunksize 행의 판매 데이터
+    """
+
+    if chunksize is None:
+        chunksize = EXTRACT_CONFIG['chunksize']
+
+    query = """
+        select date, category, product, quantity, price
+        from sales
+        where date = %s
+    """
+
+    with get_db_connection() as conn:
+        total = 0
+
+        for chunk in _iter_chunks(conn, query, (target_date,), chunksize):
+            total += len(chunk)
+            yield chunk
+
+        logger.info(f"{target_date} 데이터 {total}건 추출 완료! (chunk 단위)")
+
+
+## Pushdown 집계: 리포트 계산을 pandas 대신 MySQL에서 (원본 행 대신 카테고리별 결과 몇 줄만 네트워크로 받음)
+def ensure_sales_covering_index(conn):
+    """
+    sales(date, category, quantity, price, product) 커버링 인덱스가 없으면 생성
+    
+    where date = ? + group by category 에 필요한 칼럼이 전부 인덱스 안에 있어서,
+    MySQL이 테이블 본문을 안 읽고 인덱스만 읽어서 집계할 수 있다. (EXPLAIN의 Extra에 'Using index')
+    """
+    cursor = conn.cursor()
+    cursor.execute("show index from sales where key_name = 'idx_sales_date_category_cover'")
+
+    if not cursor.fetchall():
+        logger.info("sales 커버링 인덱스 생성: idx_sales_date_category_cover")
+        cursor.execute("create index idx_sales_date_category_cover on sales(date, category, quantity, price, product)")
+
+    cursor.close()
+
+
+# pushdown 리포트 쿼리 (transform_daily_report와 같은 집계)
+# category가 NULL인 행은 pandas groupby가 버리므로(dropna=True) SQL에서도 뺀다. (안 빼면 SQL 쪽에만 NULL 카테고리 행이 생김)
+DAILY_REPORT_SQL = """
+    select category,
+           sum(quantity * price) as total_sales,
+           sum(quantity) as total_quantity,
+           sum(price) as price_sum,
+           count(price) as price_count,
+           count(product) as product_count
+    from sales
+    where date = %s and category is not null
+    group by category
+"""
+
+
+def _finish_report_sql(df):
+    """DAILY_REPORT_SQL 결과 -> transform_daily_report와 같은 칼럼/타입/정렬"""
+    df['total_sales'] = df['total_sales'].astype('float64')
+    df['total_quantity'] = df['total_quantity'].astype('int64')
+    df['avg_price'] = df['price_sum'].astype('float64') / df['price_count']
+    df['product_count'] = df['product_count'].astype('int64')
+
+    # MySQL 정렬(collation)은 pandas groupby 정렬과 다를 수 있어서 pandas에서 다시 정렬
+    report_df = df[['category', 'total_sales', 'total_quantity', 'avg_price', 'product_count']]
+    return report_df.sort_values('category').reset_index(drop=True)
+
+
+def extract_daily_report_sql(target_date):
+    """
+    transform_daily_report와 같은 리포트를 SQL GROUP BY로 바로 계산해서 가져온다. (DAILY_REPORT_SQL)
+    
+    - avg_price는 MySQL의 AVG() 대신 SUM(price) / COUNT(price)를 가져와서 파이썬에서 나눈다.
+      (AVG()는 DECIMAL 소수점 4자리로 잘려서 pandas mean()과 값이 달라지기 때문)
+    - MySQL의 SUM()은 DECIMAL(-> 파이썬 Decimal)로 오므로, pandas 경로와 같은 숫자 타입으로 바꿔 준다.
+    - category가 NULL인 행은 pandas 경로처럼 리포트에서 빠진다.
+    - 커버링 인덱스는 prepare_sales_indexes(pushdown=True)로 미리 만들어 둔다.
+    
+    Args:
+        target_date (str): 날짜 (예: '2024-11-19')
+    
+    Returns:
+        DataFrame: 리포트 데이터 or None (실패 시)
+            - 컬럼: category, total_sales, total_quantity, avg_price, product_count
+    """
+
+    try:
+        with get_db_connection() as conn:
+            df = pd.read_sql(DAILY_REPORT_SQL, conn, params=(target_date,))
+
+        report_df = _finish_report_sql(df)
+
+        logger.info(f"{target_date} 리포트 SQL 집계 완료: {len(report_df)}개 카테고리")
+        return report_df
+
+    except Exception as e:
+        logger.error(f"리포트 SQL 집계 실패:{e}")
+        return None
+
+
+## pushdown vs pandas 일치 검사 (DB 없이 실행 가능)
+# 고정된 판매 데이터(NULL 카테고리/NULL 가격 포함)를 메모리 SQLite에 넣고 DAILY_REPORT_SQL을 그대로 실행해서
+# transform_daily_report(pandas) 결과와 compare_reports로 비교한다.
+PARITY_SAMPLE = pd.DataFrame([
+    ('2024-11-19', '전자', '노트북', 2, 916120),
+    ('2024-11-19', '전자', '마우스', 5, 25000),
+    ('2024-11-19', '도서', '자기계발서', 1, 20843),
+    ('2024-11-19', '도서', '소설', 3, None), # 가격 없음 -> avg_price / total_sales에서 빠짐
+    ('2024-11-19', None, '미분류 상품', 4, 10000), # 카테고리 없음 -> 두 경로 모두 리포트에서 빠짐
+    ('2024-11-20', '전자', '노트북', 1, 900000), # 다른 날짜 -> 빠짐
+], columns=SALES_COLUMNS)
+
+
+def check_report_parity(sales=PARITY_SAMPLE, target_date='2024-11-19'):
+    """
+    sales(판매 원본)에 대해 pushdown SQL(DAILY_REPORT_SQL) 결과와 transform_daily_report 결과가 같은지 검사
+
+    Returns:
+        DataFrame: 리포트 (두 결과가 같을 때)
+
+    Raises:
+        AssertionError: 두 결과가 다르면
+    """
+    import sqlite3
+    from transform import transform_daily_report, compare_reports
+
+    conn = sqlite3.connect(':memory:')
+    try:
+        sales.to_sql('sales', conn, index=False)
+        sql_report = _finish_report_sql(pd.read_sql(DAILY_REPORT_SQL.replace('%s', '?'), conn, params=(target_date,)))
+    finally:
+        conn.close()
+
+    pandas_report = transform_daily_report(sales[sales['date'] == target_date].copy())
+
+    if pandas_report is None or not compare_reports(sql_report, pandas_report):
+        raise AssertionError(f"pushdown / pandas 리포트 불일치\n[SQL]\n{sql_report}\n[pandas]\n{pandas_report}")
+    return sql_report
+
+
 ## 테스트 코드(extract.py는 모듈이지 실행 파일이 아니므로 따로 테스트 코드 작성함.)
 if __name__ == "__main__":
     # 로깅 기본 설정
@@ -71,6 +319,11 @@ if __name__ == "__main__":
     # 테스트 실행
     print("=== extract.py 테스트 시작 ===")
 
+    # 0. pushdown SQL vs pandas 집계 일치 검사 (DB 없이. 다르면 AssertionError로 종료)
+    print("\n[0. pushdown vs pandas 일치 검사 (고정 데이터, SQLite)]")
+    print(check_report_parity())
+    print("✅ 두 결과가 같음!")
+
     # DB에 어떤 날짜가 있는지 확인.
     print("\n[1. DB에 있는 날짜들 확인]")
 
@@ -95,6 +348,22 @@ if __name__ == "__main__":
                 else:
                     print("\n❌ 추출 실패!")
 
+                # 3. pushdown(SQL 집계) vs pandas 집계 결과 비교 (parity test)
+                print(f"\n[3. {test_date} pushdown vs pandas 결과 비교]")
+                from transform import transform_daily_report, compare_reports
+
+                prepare_sales_indexes(pushdown=True)
+                sql_report = extract_daily_report_sql(str(test_date))
+                pandas_report = transform_daily_report(result) if result is not None else None
+
+                if sql_report is not None and pandas_report is not None and compare_reports(sql_report, pandas_report):
+                    print(f"✅ 두 결과가 같음! ({len(sql_report)}개 카테고리)")
+                    print(sql_report)
+                else:
+                    print("❌ 두 결과가 다름!")
+                    print(sql_report)
+                    print(pandas_report)
+
             else:
                 print("⚠️ sales 테이블에 데이터가 없어요!")
 
@@ -3,154 +3,204 @@
 
 # 이로써 ETL 전(all) 단계를 수행했는데, ETL은 '추출(Extract)' -> '가공(Transform)' -> '저장(Load)'를 의미한다.
 
-import pymysql
 import logging
 import os
-from config import DB_CONFIG, PATHS
-from contextlib import contextmanager
+import time
+from config import PATHS, LOAD_CONFIG
+from db_pool import get_db_connection # extract/load 공용 커넥션 풀
+from metrics import track_stage
 
 logger = logging.getLogger(__name__)
 
-@contextmanager
-def get_db_connection():
-    """DB 연결 Context Manager (어제 배운 거!)"""
-
-    # 연결 열기
-    conn = pymysql.connect(
-        **DB_CONFIG
-    )
-
-    try:
-        yield conn
+# 리포트 칼럼 순서(INSERT 문의 %s 순서와 맞춰야 함)
+REPORT_COLUMNS = ['category', 'total_sales', 'total_quantity', 'avg_price', 'product_count']
+
+# UPSERT(INSERT ... ON DUPLICATE KEY UPDATE) 
+# UPSERT = UPDATE + INSERT. 같은 (report_date, category)가 이미 있으면 UPDATE, 없으면 INSERT.
+# pymysql의 executemany()는 'insert ... values (...)' 형태의 SQL을 알아서 multi-row INSERT 한 문장으로 묶어서 보내준다.
+# (그래서 SQL 안에 '#' 주석을 넣지 않고, 여기 파이썬 주석으로 설명을 옮김.)
+UPSERT_SQL = """
+insert into daily_reports (report_date, category, total_sales, total_quantity, avg_price, product_count)
+values (%s, %s, %s, %s, %s, %s)
+on DUPLICATE KEY UPDATE
+    total_sales = values(total_sales),
+    total_quantity = values(total_quantity),
+    avg_price = values(avg_price),
+    product_count = values(product_count)
+"""
+
+
+def _to_rows(df, report_date):
+    """
+    DataFrame -> INSERT 파라미터 튜플 리스트
     
-    except Exception as e:
-        logger.error(f"Error: {e}")
-        raise
-
-    finally:
-        conn.close()
-
-    # pass # 'pass'는 그냥 빈 공간으로 두고 싶을 때 쓰는 키워드이다. 그냥 두면 오류가 나니, pass로 오류가 안 나게 끔 한다.
-
+    df.iterrows()는 행마다 Series를 새로 만들어서 느리다.
+    대신 칼럼 단위로 한 번에 파이썬 리스트로 바꾼 뒤(tolist), zip으로 묶는다.
+    tolist()를 쓰면 numpy.int64 같은 타입도 파이썬 기본 타입(int, float)으로 바뀌어서 pymysql이 그대로 처리할 수 있다.
+    """
+    columns = [df[col].tolist() for col in REPORT_COLUMNS]
+    dates = [report_date] * len(df)
+
+    return list(zip(dates, *columns))
+
+
+# daily_reports 테이블: report_date 기준 월 단위 RANGE 파티션.
+# - PRIMARY KEY에 파티션 키(report_date)가 들어 있어야 파티셔닝이 가능하다. (이미 (report_date, category)라서 OK)
+# - 처음에는 p_future(MAXVALUE) 파티션 하나만 만들고, 새 달이 들어올 때마다 ensure_partition()이 월 파티션을 떼어낸다.
+#   (오래된 달을 나중에 넣어도(backfill) 그 날짜를 담고 있는 파티션에서 떼어내므로, 파티션 = 달 하나가 유지됨)
+CREATE_TABLE_SQL = """
+create table if not exists daily_reports (
+    report_date DATE,
+    category VARCHAR(50),
+    total_sales DECIMAL(15,2),
+    total_quantity INT,
+    avg_price DECIMAL(10,2),
+    product_count INT,
+    PRIMARY KEY (report_date, category) 
+)
+PARTITION BY RANGE COLUMNS(report_date) (
+    PARTITION p_future VALUES LESS THAN (MAXVALUE)
+)
+"""
+
+
+def create_table(cursor):
+    """daily_reports 테이블 생성 (없을 때만. 예전처럼 매번 DROP 하지 않음 -> 이력이 유지됨)"""
+    cursor.execute(CREATE_TABLE_SQL)
+
+
+def ensure_partition(cursor, report_date):
+    """
+    report_date가 속한 달의 파티션(p{YYYY}{MM})이 없으면, 지금 그 날짜를 담고 있는 파티션에서 떼어내서 만든다.
+    
+    - 그 달 파티션(이름이 p{YYYY}{MM})이 이미 있으면 아무것도 안 함.
+    - 최신 달이면 p_future를, 이미 있는 월 파티션보다 오래된 달(backfill)이면 그 날짜를 담고 있는 월 파티션을
+      [새 달, 나머지(원래 이름/상한 그대로)] 두 개로 나눈다. -> 나중에 오래된 달을 넣어도 달마다 파티션이 생김
+    - 예전 버전으로 만들어진(파티션 없는) 테이블이면 그냥 넘어감.
+    - ALTER TABLE은 DDL이라 암묵적으로 commit 되므로, 트랜잭션 시작 전에 호출해야 한다.
+    """
+    cursor.execute(
+        """
+        select partition_name, partition_description
+        from information_schema.partitions
+        where table_schema = database() and table_name = 'daily_reports'
+        order by partition_ordinal_position
+        """
+    )
+    partitions = [(name, desc.strip("'")) for name, desc in cursor.fetchall() if name is not None]
+    if not partitions:
+        return # 파티션 없는 테이블
+
+    # 다음 달 1일이 파티션 상한. ('2025-11-19' -> p202511, '2025-12-01' 미만)
+    year, month = int(str(report_date)[:4]), int(str(report_date)[5:7])
+    next_year, next_month = (year + 1, 1) if month == 12 else (year, month + 1)
+    name = f"p{year}{month:02d}"
+    upper = f"{next_year}-{next_month:02d}-01"
+
+    if any(existing == name for existing, _ in partitions):
+        return # 이미 그 달 파티션이 있음
+
+    # report_date를 지금 담고 있는 파티션 = 상한이 report_date보다 큰 첫 파티션 (순서대로 정렬돼 있음)
+    cover, cover_bound = next((p, bound) for p, bound in partitions if bound == 'MAXVALUE' or str(report_date) < bound)
+    cover_value = 'MAXVALUE' if cover_bound == 'MAXVALUE' else f"('{cover_bound}')"
+
+    cursor.execute(
+        f"""
+        alter table daily_reports reorganize partition {cover} into (
+            partition {name} values less than ('{upper}'),
+            partition {cover} values less than {cover_value}
+        )
+        """
+    )
+    logger.info(f"파티션 추가: {name} (< {upper}, {cover}에서 분리)")
 
 
-def load_to_db(df,report_date):
+def load_to_db(df, report_date, batch_size=None, mode=None):
     """
-    DB에 리포트 저장 (UPSERT 방식)
+    DB에 리포트 저장 (배치 단위 multi-row INSERT)
     
     Parameters:
         df: transform에서 나온 DataFrame
         report_date: '2024-11-19' 형식
+        batch_size: 한 번에 보낼 행 수 (기본값: config.LOAD_CONFIG['batch_size'])
+        mode: 'replace' 또는 'upsert' (기본값: config.LOAD_CONFIG['mode'])
+            - replace: 한 트랜잭션 안에서 report_date 날짜 데이터만 지우고 다시 넣음.
+                       (그 날 사라진 카테고리도 깔끔하게 정리됨. 몇 번을 다시 돌려도 결과가 같다 = 멱등성)
+            - upsert: 기존 행은 UPDATE, 없는 행은 INSERT만 함. (지우는 건 없음)
     """
 
-    logger.info(f"DB 저장 시작: {report_date}")
+    if batch_size is None:
+        batch_size = LOAD_CONFIG['batch_size']
+    if mode is None:
+        mode = LOAD_CONFIG['mode']
+    if mode not in ('replace', 'upsert'):
+        raise ValueError(f"지원하지 않는 mode: {mode}")
+
+    logger.info(f"DB 저장 시작: {report_date} (mode={mode})")
+    start = time.perf_counter()
 
     with get_db_connection() as conn:
         cursor = conn.cursor()
 
-        # 기존 테이블 삭제
-        cursor.execute("DROP TABLE IF EXISTS daily_reports")
-
-        # 1. 테이블 없으면 생성
-        create_table_sql = """
-        create table if not exists daily_reports (
-            report_date DATE,
-            category VARCHAR(50),
-            total_sales DECIMAL(15,2),
-            total_quantity INT,
-            avg_price DECIMAL(10,2),
-            product_count INT,
-            PRIMARY KEY (report_date, category) 
-        )
-        """
+        # 1. 테이블/파티션 준비 (DDL이라 트랜잭션 밖에서)
+        create_table(cursor)
+        ensure_partition(cursor, report_date)
 
-        cursor.execute(create_table_sql)
+        # 2. DataFrame -> 파라미터 리스트 (한 번만 변환)
+        rows = _to_rows(df, report_date)
 
-        # 2. UPSERT(INSERT ... ON DUPLICATE KEY UPDATE) 
-        # UPSERT = UPDATE + INSERT. 
+        try:
+            conn.begin()
 
-        """
-        같은 날짜 데이터가 이미 DB에 있으면?
-        → UPDATE (기존 데이터 수정)
+            # 3. replace 모드면 해당 날짜만 삭제 (파티션 프루닝으로 그 달 파티션만 건드림)
+            if mode == 'replace':
+                cursor.execute("delete from daily_reports where report_date = %s", (report_date,))
 
-        같은 날짜 데이터가 없으면?
-        → INSERT (새로 추가)
-        """
+            # 4. batch_size 단위로 잘라서 UPSERT (행마다 왕복하지 않고, 배치마다 1번 왕복)
+            for i in range(0, len(rows), batch_size):
+                cursor.executemany(UPSERT_SQL, rows[i:i + batch_size])
 
+            # 5. commit(실제로 DB에 저장. 수정사항 반영.) -> 삭제 + 삽입이 한 번에 반영됨.
+            conn.commit()
 
-        """
-        오늘 (11/21) 리포트 실행:
-        - 11/21 데이터를 DB에 저장
+        except Exception:
+            conn.rollback() # 중간에 실패하면 삭제도 취소되어서, 기존 데이터가 그대로 남는다.
+            raise
 
-        나중에 데이터 수정되어서 다시 실행:
-        - 11/21 데이터를 또 INSERT하면?
-        → 에러! (PRIMARY KEY 중복)
+    elapsed = time.perf_counter() - start
+    rows_per_sec = len(rows) / elapsed if elapsed > 0 else 0
+    logger.info(f"DB 저장 완료: {len(rows)}건 ({elapsed:.3f}초, {rows_per_sec:,.0f} rows/sec, batch_size={batch_size})")
 
-        해결책:
-        - UPSERT 사용!
-        → 있으면 UPDATE, 없으면 INSERT
-        """
-        
-        insert_sql = """
-        insert into daily_reports (report_date, category, total_sales, total_quantity, avg_price, product_count)
-        values (%s, %s, %s, %s, %s, %s)
-        on DUPLICATE KEY UPDATE # 중복 키(기본 키가 중복)가 있을 경우, 이런 식으로 업데이트를 하겠다는 의미.
-            total_sales = values(total_sales), # 새 값을 넣겠다. 밑에도 동일한 구조. 기존의 값은 지워지고 나중의 값으로 채워진다(update).
-            total_quantity = values(total_quantity),
-            avg_price = values(avg_price),
-            product_count = values(product_count)
-        """
 
-        # 3. Dataframe 각 행 처리
-        for index, row in df.iterrows(): # 'df.iterrows()': dataframe의 각 행을 하나씩 순회(loop)한다는 의미.
-            # index: 행 번호. row: 그 행의 데이터(딕셔너리처럼 쓸 수 있음)
-            # 여기서는 index는 따로 안 쓰임. '_'로 변수명을 처리하여, 이 변수를 사용하지 않는다라고 표현해도 좋음.
-            # df.iterrows()는 항상 'index,row' 2개를 돌려주므로, index를 사용 안 해도 꼭 써야하긴 한다.
-
-            """
-            for index, row in df.iterrows():
-                print(f"Index: {index}")
-                print(f"Row: {row}")
-                print("---")
-            ```
-
-            **출력:**
-            ```
-            Index: 0
-            Row: report_date       2024-11-19
-                category          전자제품
-                total_sales       150000
-                total_quantity    50
-                top_product       노트북
-            ---
-            Index: 1
-            Row: report_date       2024-11-19
-                category          의류
-                total_sales       80000
-                total_quantity    30
-                top_product       청바지
-            ---
-            Index: 2
-            Row: ...
-            """
-
-            # 깂 추출
-            # date = row['report_date'] # 이미 파라미터로 report_date를 받고 있으므로, 제거해줌.
-            category = row['category']
-            sales = row['total_sales']
-            quantity = row['total_quantity']
-            avg_price = row['avg_price']
-            prod_count = row['product_count']
-
-            # SQL 실행
-            cursor.execute(
-                insert_sql,
-                (report_date,category,sales,quantity,avg_price, prod_count)
-            )
-
-        # 4. commit(실제로 DB에 저장. 수정사항 반영.)
-        conn.commit()
-        logger.info(f"DB 저장 완료: {len(df)}건")
+def prepare_partitions(report_dates):
+    """
+    여러 날짜를 병렬로 적재하기 전에, 필요한 월 파티션을 미리 순서대로 만들어 둔다.
+    (스레드 여러 개가 동시에 같은 p_future를 REORGANIZE 하면 충돌하기 때문)
+    """
+
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        create_table(cursor)
+        for report_date in sorted(report_dates):
+            ensure_partition(cursor, report_date)
+
+
+def get_loaded_dates(start_date, end_date):
+    """
+    daily_reports에 이미 저장된 날짜 목록 조회 (백필할 때 건너뛸 날짜 확인용)
+    
+    Returns:
+        set: {'2024-11-19', ...} 형식의 문자열 집합 (테이블이 없으면 빈 집합)
+    """
+
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        create_table(cursor)
+        cursor.execute(
+            "select distinct report_date from daily_reports where report_date between %s and %s",
+            (start_date, end_date)
+        )
+        return {str(row[0]) for row in cursor.fetchall()}
 
 
 def load_to_csv(df, report_date):
@@ -176,17 +226,63 @@ def load_to_csv(df, report_date):
     logger.info(f"CSV 저장 완료: {filename}")
 
 
+def parquet_partition_dir(report_date):
+    """Hive 스타일 파티션 폴더: reports/parquet/report_date=2024-11-19/"""
+    return os.path.join(PATHS['parquet'], f"report_date={report_date}")
+
+
+def load_to_parquet(df, report_date, compression=None):
+    """
+    Parquet 파일로 저장 (열 기반 포맷 -> 읽을 때 필요한 칼럼만 골라 읽을 수 있고, 타입도 그대로 유지됨)
+    
+    저장 위치: reports/parquet/report_date=2024-11-19/part-0.parquet
+    
+    - 날짜는 폴더 이름에 들어가므로 파일 안에는 저장하지 않는다. (Hive 파티션 방식)
+    - 임시 파일에 다 쓴 뒤 os.replace()로 이름을 바꾸므로, 읽는 쪽에서 반쯤 쓰인 파일을 볼 일이 없다.
+    """
+    if compression is None:
+        compression = LOAD_CONFIG['parquet_compression']
+
+    logger.info(f"Parquet 저장 시작: {report_date}")
+
+    partition_dir = parquet_partition_dir(report_date)
+    os.makedirs(partition_dir, exist_ok=True)
+
+    filepath = os.path.join(partition_dir, "part-0.parquet")
+    tmp_path = filepath + ".tmp"
+
+    try:
+        df.to_parquet(tmp_path, index=False, compression=compression) # pyarrow가 없으면 여기서 ImportError
+        os.replace(tmp_path, filepath) # 같은 폴더 안에서의 이름 변경은 원자적(atomic)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+    logger.info(f"Parquet 저장 완료: {filepath} ({compression})")
+
+
 def load_report(df, report_date):
     """
-    메인 함수: DB와 CSV 둘 다 저장
+    메인 함수: DB와 파일(CSV / Parquet) 저장
     """
 
     try:
         # 1. DB 저장
-        load_to_db(df, report_date)
-
-        # 2. CSV 저장
-        load_to_csv(df, report_date)
+        with track_stage('load_to_db', report_date, rows_in=len(df)) as m:
+            load_to_db(df, report_date)
+            m['rows_out'] = len(df)
+
+        # 2. 파일 저장 (config.LOAD_CONFIG['formats'])
+        if 'csv' in LOAD_CONFIG['formats']:
+            with track_stage('load_to_csv', report_date, rows_in=len(df)) as m:
+                load_to_csv(df, report_date)
+                m['rows_out'] = len(df)
+
+        if 'parquet' in LOAD_CONFIG['formats']:
+            with track_stage('load_to_parquet', report_date, rows_in=len(df)) as m:
+                load_to_parquet(df, report_date)
+                m['rows_out'] = len(df)
 
         logger.info("리포트 저장 완료!")
 
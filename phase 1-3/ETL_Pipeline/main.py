@@ -1,59 +1,315 @@
 # 'main.py'는 모든 모듈들을 연결하여 전체 ETL 파이프라인을 실행하는 파일이다.
 # 'main.py' 실행 -> Extract -> Transform -> Load -> 완료
+#
+# 사용법:
+#   python main.py                                          # 10일 전 하루치 실행 (기존 방식)
+#   python main.py --start 2025-09-01 --end 2025-11-30      # 기간 백필 (이미 있는 날짜는 건너뜀)
+#   python main.py --start 2025-09-01 --end 2025-11-30 --workers 8 --force
+#   python main.py --stream                                 # 하루치가 클 때 chunk 단위로 추출/집계
+#   python main.py --pushdown                               # 집계를 MySQL에서 (원본 행을 안 가져옴)
 
+import argparse
 import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime,timedelta
-from extract import extract_sales_data
-from transform import transform_daily_report
-from load import load_report
-from config import LOG_CONFIG
+import pandas as pd
+from extract import (extract_sales_data, extract_sales_chunks, extract_sales_range, extract_daily_report_sql,
+                     prepare_sales_indexes, SALES_COLUMNS)
+from transform import transform_daily_report, transform_daily_report_stream
+from load import load_report, get_loaded_dates, prepare_partitions
+from config import LOG_CONFIG, POOL_CONFIG, EXTRACT_CONFIG
+from db_pool import get_pool, init_pool
+from metrics import track_stage, summarize
 
 # 1. 전역 로깅 설정
 logging.basicConfig(**LOG_CONFIG)
 logger = logging.getLogger(__name__)
 
-def main():
+
+def _timed_chunks(chunks, timing):
+    """chunk 제너레이터를 감싸서, chunk를 가져오는 데 걸린 시간(=extract)과 행 수를 timing에 누적"""
+    timing['extract'] = 0.0
+    timing['rows'] = 0
+    iterator = iter(chunks)
+
+    while True:
+        start = time.perf_counter()
+        try:
+            chunk = next(iterator)
+        except StopIteration:
+            timing['extract'] += time.perf_counter() - start
+            return
+        timing['extract'] += time.perf_counter() - start
+        timing['rows'] += len(chunk)
+        yield chunk
+
+
+def run_pipeline(report_date, stream=False, pushdown=None, df=None, extract_sec=0.0):
     """
-    메인 ETL 파이프라인
+    하루치 ETL 실행
     
     처리 순서:
     1. Extract: DB에서 데이터 추출
     2. Transform: 데이터 가공
     3. Load: 결과 저장 (DB + CSV)
+    
+    stream=True면 하루치 데이터를 한 번에 올리지 않고, chunk 단위로 추출하면서 바로 집계한다.
+    (이때는 extract와 transform이 번갈아 실행되므로, chunk를 가져오는 시간만 extract로 따로 센다.)
+    
+    pushdown=True면 1+2단계를 MySQL GROUP BY 한 번으로 처리한다. (원본 행을 가져오지 않음)
+    SQL 집계가 실패하면 경고를 남기고 원래 pandas 경로로 다시 처리한다. (기본값: config.EXTRACT_CONFIG['pushdown'])
+    
+    df가 있으면 이미 추출된 하루치(백필의 기간 스캔 결과)로 보고 1단계(Extract)를 건너뛴다.
+    (extract_sec: 기간 스캔에서 이 날짜를 읽는 데 걸린 시간. 시간 표에 Extract로 표시)
+    
+    Returns:
+        dict: 날짜, 단계별 소요 시간(초), 건수
     """
 
+    if pushdown is None:
+        pushdown = EXTRACT_CONFIG['pushdown']
+
+    timing = {'report_date': report_date}
+    total_start = time.perf_counter()
+    report_df = None
+
+    if pushdown:
+        # 1+2. Extract + Transform (MySQL에서 집계)
+        logger.info(f"[{report_date}] Step 1+2: 리포트 SQL 집계 시작 (pushdown)")
+        with track_stage('pushdown', report_date) as m:
+            report_df = extract_daily_report_sql(report_date)
+            m['rows_out'] = None if report_df is None else len(report_df)
+
+        if report_df is None:
+            logger.warning(f"[{report_date}] SQL 집계 실패 -> pandas 집계로 대체")
+        else:
+            timing['extract'] = m['wall_sec']
+            timing['transform'] = 0.0
+            timing['rows'] = int(report_df['product_count'].sum()) # 원본 행은 안 가져왔으므로, 집계된 상품 건수로 대신 표시
+            timing['categories'] = len(report_df)
+            logger.info(f"[{report_date}] SQL 집계 완료: {len(report_df)}건")
+
+    # pushdown을 안 쓰거나 실패했으면 pandas 경로로
+    if report_df is None and stream:
+        # 1+2. Extract + Transform (스트리밍)
+        logger.info(f"[{report_date}] Step 1+2: 데이터 추출/변환 시작 (스트리밍)")
+        with track_stage('extract+transform', report_date) as m:
+            report_df = transform_daily_report_stream(_timed_chunks(extract_sales_chunks(report_date), timing))
+            if report_df is None:
+                raise RuntimeError(f"{report_date} 데이터 변환 실패")
+            m['rows_in'] = timing['rows']
+            m['rows_out'] = len(report_df)
+        timing['transform'] = m['wall_sec'] - timing['extract']
+        timing['categories'] = len(report_df)
+        logger.info(f"[{report_date}] 추출/변환 완료: {timing['rows']}건 -> {len(report_df)}건")
+
+    elif report_df is None and df is not None:
+        # 1. Extract (백필 기간 스캔에서 이미 추출됨)
+        timing['extract'] = extract_sec
+        timing['rows'] = len(df)
+        logger.info(f"[{report_date}] 추출 완료(기간 스캔): {len(df)}건")
+
+    elif report_df is None:
+        # 1. Extract
+        logger.info(f"[{report_date}] Step 1: 데이터 추출 시작")
+        with track_stage('extract', report_date) as m:
+            df = extract_sales_data(report_date)
+            if df is None:
+                raise RuntimeError(f"{report_date} 데이터 추출 실패")
+            m['rows_out'] = len(df)
+        timing['extract'] = m['wall_sec']
+        timing['rows'] = len(df)
+        logger.info(f"[{report_date}] 추출 완료: {len(df)}건")
+
+    if report_df is None:
+        # 2. Transform
+        logger.info(f"[{report_date}] Step 2: 데이터 변환 시작")
+        with track_stage('transform', report_date, rows_in=len(df)) as m:
+            report_df = transform_daily_report(df)
+            if report_df is None:
+                raise RuntimeError(f"{report_date} 데이터 변환 실패")
+            m['rows_out'] = len(report_df)
+        timing['transform'] = m['wall_sec']
+        timing['categories'] = len(report_df)
+        logger.info(f"[{report_date}] 변환 완료: {len(report_df)}건")
+
+    # 3. Load (load_to_db / load_to_csv 단계 지표는 load_report 안에서 기록됨)
+    logger.info(f"[{report_date}] Step 3: 데이터 저장 시작")
+    start = time.perf_counter()
+    load_report(report_df, report_date)
+    timing['load'] = time.perf_counter() - start
+
+    timing['total'] = time.perf_counter() - total_start
+    return timing
+
+
+def date_range(start_date, end_date):
+    """'2025-09-01' ~ '2025-09-03' -> ['2025-09-01', '2025-09-02', '2025-09-03']"""
+    start = datetime.strptime(start_date, '%Y-%m-%d')
+    end = datetime.strptime(end_date, '%Y-%m-%d')
+
+    return [(start + timedelta(days=i)).strftime('%Y-%m-%d') for i in range((end - start).days + 1)]
+
+
+def print_timing_table(results):
+    """날짜별 소요 시간 표 출력"""
+
+    print("\n┌────────────┬──────────┬──────────┬──────────┬──────────┬──────────┬────────┐")
+    print("│ 날짜       │ 원본 건수│  Extract │Transform │     Load │    Total │ 상태   │")
+    print("├────────────┼──────────┼──────────┼──────────┼──────────┼──────────┼────────┤")
+
+    for r in sorted(results, key=lambda r: r['report_date']):
+        if r['status'] == 'ok':
+            print(f"│ {r['report_date']} │ {r['rows']:8,} │ {r['extract']:7.3f}s │ {r['transform']:7.3f}s │ {r['load']:7.3f}s │ {r['total']:7.3f}s │ 성공   │")
+        else:
+            print(f"│ {r['report_date']} │ {'-':>8} │ {'-':>8} │ {'-':>8} │ {'-':>8} │ {'-':>8} │ {r['status']:6s} │")
+
+    print("└────────────┴──────────┴──────────┴──────────┴──────────┴──────────┴────────┘")
+
+
+def _scan_days(dates):
+    """
+    dates 전체 기간을 extract_sales_range로 한 번만 스캔해서, 실행할 날짜의 하루치를 (날짜, DataFrame, 걸린 시간)으로 하나씩 돌려준다.
+    sales에 행이 없는 날짜도 빈 DataFrame으로 돌려준다. (날짜별 추출(extract_sales_data)과 같은 결과)
+    """
+    wanted = set(dates)
+    scan = extract_sales_range(min(dates), max(dates))
+
+    with track_stage('extract_range', f"{min(dates)}~{max(dates)}") as m:
+        m['rows_out'] = 0
+        while True:
+            start = time.perf_counter()
+            target_date, df = next(scan, (None, None))
+            elapsed = time.perf_counter() - start
+            if target_date is None:
+                break
+
+            m['rows_out'] += len(df)
+            if target_date in wanted: # 이미 리포트가 있어서 건너뛰는 날짜는 버림
+                wanted.discard(target_date)
+                yield target_date, df, elapsed
+
+    for target_date in sorted(wanted):
+        yield target_date, pd.DataFrame(columns=SALES_COLUMNS), 0.0
+
+
+def backfill(start_date, end_date, workers=4, force=False, stream=False, pushdown=None):
+    """
+    기간 백필: 날짜들을 스레드 풀에 나눠서 병렬로 실행
+    
+    - ETL 작업 대부분이 DB 대기(I/O)라서 프로세스 대신 스레드로 충분하다.
+    - 모든 스레드가 db_pool의 커넥션 풀 하나를 같이 쓴다. (날짜마다 새로 연결하지 않음)
+    - force=False면 daily_reports에 이미 있는 날짜는 건너뛴다.
+    - 기본(pandas) 경로는 sales를 날짜마다 조회하지 않고, 기간 전체를 한 번만 스캔(extract_sales_range)해서
+      하루치가 완성될 때마다 worker에 넘긴다. (stream/pushdown 모드는 예전처럼 날짜별로 조회)
+      worker가 밀리면 스캔을 잠깐 멈춰서, 메모리에는 최대 workers x 2일치만 올라간다.
+    
+    Returns:
+        list[dict]: 날짜별 결과 (run_pipeline 반환값 + status)
+    """
+
+    if pushdown is None:
+        pushdown = EXTRACT_CONFIG['pushdown']
+
+    dates = date_range(start_date, end_date)
+    results = []
+
+    if not force:
+        loaded = get_loaded_dates(start_date, end_date)
+        results += [{'report_date': d, 'status': 'skip'} for d in dates if d in loaded]
+        dates = [d for d in dates if d not in loaded]
+
+    logger.info(f"백필 시작: {start_date} ~ {end_date}, 실행 {len(dates)}일, 건너뜀 {len(results)}일, workers={workers}")
+
+    if not dates:
+        return results
+
+    prepare_partitions(dates)
+    prepare_sales_indexes(pushdown=pushdown)
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        if stream or pushdown:
+            futures = {executor.submit(run_pipeline, d, stream, pushdown): d for d in dates}
+        else:
+            in_flight = threading.BoundedSemaphore(workers * 2)
+            futures = {}
+            try:
+                for d, df, extract_sec in _scan_days(dates):
+                    in_flight.acquire()
+                    future = executor.submit(run_pipeline, d, stream, pushdown, df, extract_sec)
+                    future.add_done_callback(lambda _: in_flight.release())
+                    futures[future] = d
+            except Exception as e:
+                # 스캔이 중간에 실패하면, 아직 못 넘긴 날짜는 실패로 기록 (이미 넘긴 날짜는 그대로 진행)
+                logger.error(f"기간 스캔 실패: {e}")
+                results += [{'report_date': d, 'status': 'fail'} for d in dates if d not in futures.values()]
+
+        for future in as_completed(futures):
+            report_date = futures[future]
+            try:
+                results.append({**future.result(), 'status': 'ok'})
+            except Exception as e:
+                logger.error(f"[{report_date}] 실패: {e}")
+                results.append({'report_date': report_date, 'status': 'fail'})
+
+    return results
+
+
+def main():
+    """
+    메인 ETL 파이프라인
+    
+    --start/--end가 없으면 10일 전 하루치만, 있으면 그 기간 전체를 백필한다.
+    """
+
+    parser = argparse.ArgumentParser(description="일일 판매 리포트 ETL")
+    parser.add_argument('--start', help="백필 시작 날짜 (YYYY-MM-DD)")
+    parser.add_argument('--end', help="백필 종료 날짜 (YYYY-MM-DD, 생략 시 start와 같음)")
+    parser.add_argument('--workers', type=int, default=4, help="동시에 처리할 날짜 수")
+    parser.add_argument('--force', action='store_true', help="이미 리포트가 있는 날짜도 다시 처리")
+    parser.add_argument('--stream', action='store_true', help="chunk 단위 스트리밍 추출/변환 (하루치 데이터가 클 때)")
+    parser.add_argument('--pushdown', action='store_true', default=None, help="리포트 집계를 MySQL GROUP BY로 (실패 시 pandas로 대체)")
+    args = parser.parse_args()
+
     try:
         # 실행 시작 로그
         logger.info("=" * 50)
         logger.info("ETL 파이프라인 시작")
         logger.info("=" * 50)
 
-        # 날짜 설정
-        today = datetime.now() # 오늘('2025-11-21')
-        ten_days_ago = today - timedelta(days=10) # 10일 전('2025-11-11')
-        report_date = ten_days_ago.strftime('%Y-%m-%d') # 문자열로 변환
+        if args.start:
+            # 백필 스레드들 + 기간 스캔 연결 1개가 풀 하나를 같이 쓰므로, 그보다 연결이 적으면 대기가 생긴다.
+            if args.workers + 1 > POOL_CONFIG['max_size']:
+                init_pool(max_size=args.workers + 1)
 
-        # 1. Extract
-        logger.info("Step 1: 데이터 추출 시작")
-        df = extract_sales_data(report_date)
-        logger.info(f"추출 완료: {len(df)}건")
+            results = backfill(args.start, args.end or args.start, workers=args.workers, force=args.force, stream=args.stream, pushdown=args.pushdown)
+            print_timing_table(results)
 
-        # 2. Transform
-        logger.info("Step 2: 데이터 변환 시작")
-        report_df = transform_daily_report(df)
-        logger.info(f"변환 완료: {len(report_df)}건")
+            failed = [r['report_date'] for r in results if r['status'] == 'fail']
+            if failed:
+                raise RuntimeError(f"실패한 날짜: {', '.join(sorted(failed))}")
+
+        else:
+            # 날짜 설정
+            today = datetime.now() # 오늘('2025-11-21')
+            ten_days_ago = today - timedelta(days=10) # 10일 전('2025-11-11')
+            report_date = ten_days_ago.strftime('%Y-%m-%d') # 문자열로 변환
 
-        # 3. Load
-        logger.info("Step 3: 데이터 저장 시작")
-        load_report(report_df, report_date)
+            prepare_sales_indexes(pushdown=EXTRACT_CONFIG['pushdown'] if args.pushdown is None else args.pushdown)
+            run_pipeline(report_date, stream=args.stream, pushdown=args.pushdown)
 
         # 완료 로그
+        get_pool().log_stats()
+        summarize()
         logger.info("=" * 50)
         logger.info("ETL 파이프라인 완료!")
         logger.info("=" * 50)
 
 
     except Exception as e:
+        summarize() # 실패한 실행도 어디까지 갔는지 남겨 둠
         logger.error("=" * 50)
         logger.error(f"파이프라인 실패: {e}")
         logger.error("=" * 50)
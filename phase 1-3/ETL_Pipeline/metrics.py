@@ -0,0 +1,131 @@
+# 'metrics.py'는 파이프라인 단계(extract, transform, load_to_db, load_to_csv ...)별로 성능 지표를 기록하는 모듈입니다.
+# "Step N 시작/완료" 로그만으로는 어디서 시간이 걸리는지(SQL? pandas? 파일 쓰기?) 알 수 없어서 추가함.
+#
+# 단계마다 기록하는 값:
+#   - wall_sec: 실제 걸린 시간 (DB/디스크 대기 포함)
+#   - cpu_sec: 이 스레드가 CPU를 쓴 시간 (wall은 큰데 cpu가 작으면 -> 대기(I/O)가 원인)
+#   - process_peak_rss_kb: 단계가 끝난 시점의 '프로세스 전체' 최대 메모리(peak RSS, 실행 시작부터의 최고치)
+#     ※ 단계별 메모리가 아님. ru_maxrss는 프로세스 하나에 값이 하나라서, 백필처럼 여러 날짜가 스레드로 동시에 돌면
+#       어느 단계가 메모리를 썼는지 나눌 수 없다. (그래서 단계 전후 차이도 기록하지 않음)
+#   - rows_in / rows_out: 들어온 행 수 / 나간 행 수
+#
+# 기록은 logs/metrics.jsonl에 한 줄에 JSON 하나씩(JSON Lines) 쌓이므로, 나중에 pandas로 읽어서 느린 날을 분석할 수 있다.
+#   pd.read_json('logs/metrics.jsonl', lines=True)
+
+import json
+import logging
+import os
+import sys
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+
+from config import PATHS
+
+try:
+    import resource # 리눅스/맥 전용 모듈. 윈도우에는 없어서 메모리 지표는 None으로 남긴다.
+except ImportError:
+    resource = None
+
+logger = logging.getLogger(__name__)
+
+RUN_ID = uuid.uuid4().hex[:8] # 실행(run)마다 하나. 같은 실행에서 나온 기록끼리 묶을 때 사용.
+
+_lock = threading.Lock() # 백필 스레드들이 동시에 파일에 쓰므로
+_records = [] # 이번 실행의 기록 (summarize용)
+
+
+def _process_peak_rss_kb():
+    if resource is None:
+        return None
+    # ru_maxrss 단위: 리눅스는 KB, 맥은 byte
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == 'darwin' else peak
+
+
+def _write(record):
+    path = PATHS['metrics']
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+
+    with _lock:
+        _records.append(record)
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+@contextmanager
+def track_stage(stage, report_date=None, rows_in=None):
+    """
+    단계 하나를 감싸서 지표를 기록하는 Context Manager
+    
+    사용 예:
+        with track_stage('transform', report_date, rows_in=len(df)) as m:
+            report_df = transform_daily_report(df)
+            m['rows_out'] = len(report_df)
+        print(m['wall_sec'])  # with 블록이 끝나면 측정값이 채워짐
+    
+    예외가 나도 기록은 남고(status='error'), 예외는 그대로 다시 던진다.
+    """
+    record = {
+        'run_id': RUN_ID,
+        'stage': stage,
+        'report_date': report_date,
+        'rows_in': rows_in,
+        'rows_out': None,
+    }
+
+    cpu_start = time.thread_time() # process_time()은 다른 스레드 CPU까지 합쳐지므로, 스레드 단위로 잰다.
+    wall_start = time.perf_counter()
+    status = 'ok'
+
+    try:
+        yield record
+    except Exception:
+        status = 'error'
+        raise
+    finally:
+        record.update({
+            'ts': datetime.now().isoformat(timespec='seconds'),
+            'status': status,
+            'wall_sec': round(time.perf_counter() - wall_start, 6),
+            'cpu_sec': round(time.thread_time() - cpu_start, 6),
+            'process_peak_rss_kb': _process_peak_rss_kb(),
+        })
+        _write(record)
+
+
+def summarize():
+    """
+    이번 실행의 단계별 합계를 로그로 남기고, dict로 반환
+    
+    Returns:
+        dict: {stage: {'count', 'wall_sec', 'cpu_sec', 'rows_in', 'rows_out', 'errors'}}
+        (프로세스 최대 메모리는 단계별 값이 아니라서, 합계 줄 대신 마지막에 한 번만 로그로 남김)
+    """
+    with _lock:
+        records = list(_records)
+
+    summary = {}
+    for r in records:
+        s = summary.setdefault(r['stage'], {'count': 0, 'wall_sec': 0.0, 'cpu_sec': 0.0,
+                                            'rows_in': 0, 'rows_out': 0, 'errors': 0})
+        s['count'] += 1
+        s['wall_sec'] += r['wall_sec']
+        s['cpu_sec'] += r['cpu_sec']
+        s['rows_in'] += r['rows_in'] or 0
+        s['rows_out'] += r['rows_out'] or 0
+        s['errors'] += r['status'] == 'error'
+
+    logger.info(f"단계별 성능 요약 (run_id={RUN_ID})")
+    for stage, s in summary.items():
+        logger.info(
+            f"  {stage:18s} {s['count']:4d}회 | wall {s['wall_sec']:8.3f}초 | cpu {s['cpu_sec']:8.3f}초 | "
+            f"rows {s['rows_in']:,} -> {s['rows_out']:,} | 실패 {s['errors']}회"
+        )
+
+    peak = _process_peak_rss_kb()
+    logger.info(f"  프로세스 최대 메모리(peak RSS): {'-' if peak is None else format(peak, ',') + 'KB'}")
+
+    return summary
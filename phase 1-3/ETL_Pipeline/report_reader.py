@@ -0,0 +1,84 @@
+# 'report_reader.py'는 load.py가 저장한 Parquet 리포트(reports/parquet/report_date=YYYY-MM-DD/)를 기간 단위로 읽는 모듈입니다.
+# 월간 집계처럼 여러 날짜를 한꺼번에 볼 때, CSV를 날짜마다 다시 파싱하는 대신 이걸 쓰면 된다.
+
+import logging
+import os
+
+import pandas as pd
+
+from config import PATHS
+
+logger = logging.getLogger(__name__)
+
+
+def list_partitions(start_date=None, end_date=None):
+    """
+    기간 안에 있는 날짜 파티션 목록 (폴더 이름만 보고 거름 = 파티션 프루닝. 기간 밖 파일은 열지도 않음)
+    
+    Returns:
+        list[(str, str)]: [('2024-11-19', '.../report_date=2024-11-19'), ...] 날짜순
+    """
+    if not os.path.isdir(PATHS['parquet']):
+        return []
+
+    partitions = []
+    for name in os.listdir(PATHS['parquet']):
+        if not name.startswith('report_date='):
+            continue
+
+        report_date = name.split('=', 1)[1]
+        if start_date and report_date < start_date: # 'YYYY-MM-DD' 문자열은 사전순 = 날짜순
+            continue
+        if end_date and report_date > end_date:
+            continue
+
+        partitions.append((report_date, os.path.join(PATHS['parquet'], name)))
+
+    return sorted(partitions)
+
+
+def read_reports(start_date=None, end_date=None, columns=None):
+    """
+    기간의 리포트를 하나의 DataFrame으로 읽기
+    
+    Args:
+        start_date (str): 시작 날짜 (예: '2024-11-01', 생략하면 처음부터)
+        end_date (str): 종료 날짜 (예: '2024-11-30', 생략하면 끝까지)
+        columns (list): 읽을 칼럼 (예: ['category', 'total_sales']). Parquet은 열 단위로 저장돼서, 필요한 칼럼만 디스크에서 읽는다.
+    
+    Returns:
+        DataFrame: report_date 칼럼 + 리포트 칼럼
+    """
+    frames = []
+
+    for report_date, partition_dir in list_partitions(start_date, end_date):
+        for filename in sorted(os.listdir(partition_dir)):
+            if not filename.endswith('.parquet'): # 쓰는 중인 .tmp 파일은 건너뜀
+                continue
+
+            df = pd.read_parquet(os.path.join(partition_dir, filename), columns=columns)
+            df.insert(0, 'report_date', report_date)
+            frames.append(df)
+
+    logger.info(f"Parquet 리포트 읽기: {start_date} ~ {end_date}, {len(frames)}개 파일")
+
+    if not frames:
+        return pd.DataFrame(columns=['report_date'] + (columns or []))
+
+    return pd.concat(frames, ignore_index=True)
+
+
+## 테스트 코드
+if __name__ == "__main__":
+    from config import LOG_CONFIG
+    logging.basicConfig(**LOG_CONFIG)
+
+    print("=== report_reader.py 테스트 ===")
+    df = read_reports(columns=['category', 'total_sales'])
+    print(f"\n[전체 {len(df)}건]")
+    print(df.head())
+
+    if len(df) > 0:
+        # 월별 카테고리 매출 합계
+        df['month'] = df['report_date'].str[:7]
+        print(df.groupby(['month', 'category'])['total_sales'].sum())
@@ -95,6 +95,105 @@ def transform_daily_report(df):
         return None
     
 
+## 스트리밍 transform (하루치 데이터가 메모리에 다 안 올라갈 때)
+# 카테고리별로 '합칠 수 있는(mergeable)' 중간 집계값만 들고 다닌다.
+# - 합계(sum), 개수(count)는 chunk별로 구해서 더하면 전체와 같다.
+# - 평균(mean)은 chunk별 평균을 평균 내면 틀리므로, '가격 합계 / 가격 개수'로 마지막에 한 번만 나눈다.
+PARTIAL_COLUMNS = ['total_sales', 'total_quantity', 'price_sum', 'price_count', 'product_count']
+
+
+def _partial_aggregate(chunk):
+    """chunk 하나 -> 카테고리별 중간 집계 (원본 chunk는 수정하지 않음)"""
+
+    grouped = chunk.groupby('category')
+    partial = pd.DataFrame({
+        'total_sales': (chunk['quantity'] * chunk['price']).groupby(chunk['category']).sum(),
+        'total_quantity': grouped['quantity'].sum(),
+        'price_sum': grouped['price'].sum(),
+        'price_count': grouped['price'].count(), # mean()처럼 NaN은 빼고 셈
+        'product_count': grouped['product'].count(),
+    })
+
+    return partial[PARTIAL_COLUMNS]
+
+
+def transform_daily_report_stream(chunks):
+    """
+    chunk(DataFrame) 이터레이터를 받아서 transform_daily_report와 같은 리포트를 만든다.
+    하루치 전체 DataFrame을 만들지 않으므로, 메모리에는 chunk 1개 + 카테고리 수만큼의 집계값만 올라간다.
+    
+    quantity/price가 정수(INT 칼럼)이면 결과가 transform_daily_report와 완전히 같다.
+    (실수 칼럼이면 합계를 나눠서 더하는 순서가 달라서 소수점 끝자리 정도 차이가 날 수 있음)
+    
+    Args:
+        chunks: DataFrame 이터레이터 (예: extract.extract_sales_chunks(...))
+            - 컬럼: date, category, product, quantity, price
+    
+    Returns:
+        DataFrame: 리포트 데이터 (실패 시 None)
+            - 컬럼: category, total_sales, total_quantity, avg_price, product_count
+    """
+
+    try:
+        logger.info("데이터 변환 시작! (스트리밍)")
+
+        acc = None
+        n_chunks = 0
+
+        for chunk in chunks:
+            # 1. chunk마다 데이터 검증
+            if not validate_data(chunk):
+                return None
+
+            # 2. chunk 집계 -> 누적 집계와 합치기 (같은 카테고리끼리 더함. concat 후 groupby sum이라 정수 타입이 유지됨)
+            partial = _partial_aggregate(chunk)
+            acc = partial if acc is None else pd.concat([acc, partial]).groupby(level=0).sum()
+            n_chunks += 1
+
+        # 데이터가 하나도 없던 날
+        if acc is None:
+            logger.info("변환 완료: 0개 카테고리")
+            return pd.DataFrame(columns=['category', 'total_sales', 'total_quantity', 'avg_price', 'product_count'])
+
+        # 3. 평균 가격은 마지막에 한 번만 계산
+        acc['avg_price'] = acc['price_sum'] / acc['price_count']
+
+        report_df = acc[['total_sales', 'total_quantity', 'avg_price', 'product_count']].sort_index()
+        report_df.index.name = 'category'
+        report_df = report_df.reset_index()
+
+        logger.info(f"변환 완료: {len(report_df)}개 카테고리 ({n_chunks}개 chunk)")
+        return report_df
+
+    except Exception as e:
+        logger.error(f"데이터 변환 실패: {e}")
+        return None
+
+
+## 리포트 비교 (pushdown 집계 / 스트리밍 집계가 기본 pandas 집계와 같은지 확인할 때 사용)
+def compare_reports(left, right, rtol=1e-9):
+    """
+    리포트 두 개가 같은지 비교
+    
+    - 카테고리 순서와 숫자 타입(int/float, DB에서 온 Decimal 변환 등)은 무시하고 값만 비교한다.
+    - 실수 칼럼은 rtol(상대 오차)까지 허용.
+    
+    Returns:
+        bool: 같으면 True (다르면 어디가 다른지 로그로 남김)
+    """
+    columns = ['category', 'total_sales', 'total_quantity', 'avg_price', 'product_count']
+
+    try:
+        left = left[columns].sort_values('category').reset_index(drop=True)
+        right = right[columns].sort_values('category').reset_index(drop=True)
+        pd.testing.assert_frame_equal(left, right, check_dtype=False, check_exact=False, rtol=rtol)
+        return True
+
+    except AssertionError as e:
+        logger.warning(f"리포트 불일치: {e}")
+        return False
+
+
 ## 테스트 코드
 if __name__ == "__main__":
     import logging
@@ -1,5 +1,7 @@
 # 삼성전자 주식 데이터를 웹 MySQL에 적재하는 모듈
 
+import time
+
 import pymysql
 import pandas as pd
 
@@ -45,7 +47,36 @@ def create_table():
     print("테이블 생성 완료!")
 
 # 4. 데이터 적재 함수
-def load_data():
+UPSERT_SQL = """
+insert into samsung_daily (date, open, high, low, close, volume, `change`)
+values (%s, %s, %s, %s, %s, %s, %s)
+on DUPLICATE KEY UPDATE
+    open = values(open),
+    high = values(high),
+    low = values(low),
+    close = values(close),
+    volume = values(volume),
+    `change` = values(`change`)
+"""
+
+LOAD_COLUMNS = ['Date', 'Open', 'High', 'Low', 'Close', 'Volume', 'Change'] # csv 열 순서 = UPSERT_SQL의 %s 순서
+
+
+def get_max_date(cursor):
+    """테이블에 적재된 마지막 날짜 (비어 있으면 None)"""
+    cursor.execute("select max(date) from samsung_daily")
+    return cursor.fetchone()[0]
+
+
+def _to_rows(df):
+    """DataFrame -> executemany용 튜플 리스트 (numpy 타입 -> 파이썬 기본 타입, NaN -> None(NULL))"""
+    df = df[LOAD_COLUMNS].astype(object)
+    df['Date'] = [d.date() for d in df['Date']] # Timestamp -> date (DATE 칼럼)
+    df = df.where(df.notna(), None)
+    return list(df.itertuples(index=False, name=None))
+
+
+def load_data(input_file="../phase 2-2/Data/samsung_2024-11-28_2025-11-27.csv", batch_size=1000, full_reload=False):
     """
     [설계 결정] 파생변수 저장 방식
 
@@ -62,49 +93,51 @@ def load_data():
     - 면접 답변: "학습 목적으로 쿼리 시점 계산을 선택했지만, 
     실무에서 대용량이라면 자주 쓰는 지표는 미리 계산해서 저장하는 게 효율적이라는 것도 알고 있습니다."
 
+    [적재 방식]
+    - 예전: df.iterrows()로 한 행씩 upsert -> 거래일 수만큼 DB 왕복
+    - 지금: batch_size 행씩 묶어서 multi-row upsert (pymysql executemany가 'values (...), (...), ...' 한 문장으로 합쳐서 보냄)
+    - 기본은 테이블의 MAX(date)보다 새로운 날짜만 적재 (이미 있는 과거 데이터는 다시 안 보냄)
+    - full_reload=True면 csv 전체를 다시 upsert
+
+    Returns:
+        int: 적재한 행 수
     """
 
     # 1. csv 파일 읽기(삼성주식 원본 데이터) -> 쿼리 시점에서 계산하기로 하였으므로, 원본 데이터만 DB에 저장한다.
-    df = pd.read_csv("../phase 2-2/Data/samsung_2024-11-28_2025-11-27.csv")
+    df = pd.read_csv(input_file, parse_dates=['Date'], float_precision='round_trip')
 
     # 2. DB 연결
     conn = pymysql.connect(**DB_CONFIG)
     cursor = conn.cursor()
+    start = time.perf_counter()
 
-    # 3. 데이터 insert(upsert는 굳이 필요 x -> 이미 끝난 과거 데이터 자료이니깐, 수정될 일이 없다고 판단함.) -> 하지만 Claude의 반문이, 코드를 두번 실행하면 이미 있던 데이터가 중복되므로 upsert로 해결해야한다고 말함.(insert로 그냥 하면 에러가 난다고 함.)
-    insert_sql = """
-    insert into samsung_daily (date, open, high, low, close, volume, `change`)
-    values (%s, %s, %s, %s, %s, %s, %s)
-    on DUPLICATE KEY UPDATE
-        open = values(open),
-        high = values(high),
-        low = values(low),
-        close = values(close),
-        volume = values(volume),
-        `change` = values(`change`)
-    """
-    
-    for index, row in df.iterrows():
-
-        # 값 추출
-        # csv를 df에서 불렀는데, 어쨋든 csv에 저장된 열 이름대로 대소문자 구분해서 작성해야한다.
-        date = row['Date']
-        open = row['Open']
-        high = row['High']
-        low = row['Low']
-        close = row['Close']
-        volume = row['Volume']
-        #change = row['`change`'] # 백틱은 SQL에서만 예약어 구분용이다. Dataframe 칼럼명에서는 필요가 없다.
-        change = row['Change']
-
-        cursor.execute(insert_sql, (date,open,high,low,close,volume,change)) # Upsert로 했으므로, df(dataframe)에서 각 열에 해당하는 각 행 값들을 가져와서 for문을 통해 직접 값들을 넣어줘야한다.('phase 1-3'의 'load.py' 참고)
-
-    # 4. 종료
-    conn.commit()
-    cursor.close()
-    conn.close()
+    try:
+        # 3. 새 날짜만 고르기 (upsert라서 다시 넣어도 중복은 안 생기지만, 안 바뀐 과거 데이터를 매번 보낼 필요는 없음)
+        if not full_reload:
+            max_date = get_max_date(cursor)
+            if max_date is not None:
+                df = df[df['Date'].dt.date > max_date]
+
+        rows = _to_rows(df)
+
+        # 4. batch_size 단위로 묶어서 upsert (행마다 왕복하지 않고, 배치마다 1번 왕복) -> 전체를 한 트랜잭션으로
+        for i in range(0, len(rows), batch_size):
+            cursor.executemany(UPSERT_SQL, rows[i:i + batch_size])
+        conn.commit()
+
+    except Exception:
+        conn.rollback() # 중간에 실패하면 이번에 넣은 건 전부 취소
+        raise
+
+    finally:
+        # 5. 종료
+        cursor.close()
+        conn.close()
+
+    elapsed = time.perf_counter() - start
+    print(f"데이터 {len(rows)}건 적재 완료! ({elapsed:.3f}초, batch_size={batch_size}{', 전체 재적재' if full_reload else ''})")
 
-    print(f"데이터 {len(df)}건 적재 완료!")
+    return len(rows)
 
 
 # 5. 쿼리 시점 계산(파생변수 계산)(Window Function)
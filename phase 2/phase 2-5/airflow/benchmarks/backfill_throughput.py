@@ -0,0 +1,149 @@
+# samsung_etl_daily backfill 처리량 벤치마크
+#
+# 일별 DAG 한 번 실행(= 날짜 하나)과 똑같은 함수들(extract -> extract_partition -> transform_partition -> replace_range)을
+# 동시 실행 수(= max_active_runs)를 바꿔 가며 여러 날짜에 돌리고, 초당 처리한 실행(날짜) 수를 비교한다.
+#   - extract/transform: 동시 실행 수만큼 프로세스로 병렬 (Airflow worker에서 날짜별 task가 동시에 도는 것과 같음)
+#   - load(--with-load): DAG의 samsung_mysql pool(slot 1)처럼 한 번에 하나씩
+#
+# 사용법 (airflow 폴더에서):
+#   python benchmarks/backfill_throughput.py --start 2025-01-01 --end 2025-03-31 --concurrency 1,2,4,8
+#   python benchmarks/backfill_throughput.py --with-load          # MySQL(samsung_daily)까지 적재
+#
+# ※ Airflow 스케줄러/worker 오버헤드(task 큐잉, XCom 저장 등)는 빠져 있다. 날짜별 작업 자체의 처리량 비교용.
+
+import argparse
+import contextlib
+import io
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import date, datetime, timedelta, timezone
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'modules'))
+
+import airflow_extract_samsung as extract_module
+from airflow_transform_samsung import transform_partition
+
+DEFAULT_SOURCE = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'data', 'samsung_2024-11-28_2025-11-27.csv')
+TICKER = '005930'
+
+
+def run_day(day, data_dir, source):
+    """
+    날짜 하나 = 일별 DAG 실행 하나 (extract_day + transform_day). 휴장일이면 None
+
+    Returns:
+        (dict | None, float): (transform 결과, 걸린 시간)
+    """
+    extract_module.SOURCE_FILES[TICKER] = source # 프로세스마다 원본 경로 설정 (spawn 방식이면 부모 설정이 안 넘어옴)
+    start = time.perf_counter()
+
+    with contextlib.redirect_stdout(io.StringIO()): # 모듈들의 진행 출력은 숨김
+        interval_start = datetime(day.year, day.month, day.day, tzinfo=timezone.utc)
+        manifest = extract_module.extract(interval_start, interval_start + timedelta(days=1), ticker=TICKER,
+                                          raw_dir=f"{data_dir}/raw")
+        if manifest['rows'] == 0:
+            return None, time.perf_counter() - start
+
+        staged = extract_module.extract_partition(TICKER, manifest['start'], manifest['start'], raw_dir=f"{data_dir}/staging",
+                                                  store_dir=os.path.dirname(manifest['path']))
+        transformed = transform_partition(staged, f"{data_dir}/transformed/{TICKER}/date={manifest['start']}")
+
+    return transformed, time.perf_counter() - start
+
+
+def backfill(days, concurrency, data_dir, source, with_load):
+    """
+    Returns:
+        dict: {'concurrency', 'runs', 'skipped', 'wall_sec', 'runs_per_sec', 'p50_run_sec', 'load_sec'}
+    """
+    if with_load:
+        from airflow_load_samsung import create_table, replace_range
+        create_table()
+
+    run_times = []
+    load_sec = 0.0
+    skipped = 0
+
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=concurrency) as pool:
+        futures = [pool.submit(run_day, day, data_dir, source) for day in days]
+
+        for future in as_completed(futures):
+            transformed, elapsed = future.result()
+            run_times.append(elapsed)
+
+            if transformed is None:
+                skipped += 1
+                continue
+
+            if with_load: # pool slot 1: 끝난 순서대로 하나씩 적재
+                t = time.perf_counter()
+                with contextlib.redirect_stdout(io.StringIO()):
+                    replace_range(transformed['output_file'], transformed['start'], transformed['end'])
+                load_sec += time.perf_counter() - t
+
+    wall = time.perf_counter() - start
+
+    return {
+        'concurrency': concurrency,
+        'runs': len(days),
+        'skipped': skipped,
+        'wall_sec': wall,
+        'runs_per_sec': len(days) / wall if wall > 0 else 0,
+        'p50_run_sec': statistics.median(run_times) if run_times else 0,
+        'load_sec': load_sec,
+    }
+
+
+def print_results(results):
+    base = results[0]['runs_per_sec']
+
+    print("\n┌────────────┬──────────┬────────────┬──────────────┬──────────────┬───────────┐")
+    print("│ 동시 실행  │ 실행 수  │ 전체 시간  │ 실행/초      │ 실행당 p50   │ 1 대비    │")
+    print("├────────────┼──────────┼────────────┼──────────────┼──────────────┼───────────┤")
+    for r in results:
+        speedup = r['runs_per_sec'] / base if base > 0 else 0
+        print(f"│ {r['concurrency']:10d} │ {r['runs']:8d} │ {r['wall_sec']:9.2f}초 │ {r['runs_per_sec']:12.2f} │ "
+              f"{r['p50_run_sec'] * 1000:10.1f}ms │ {speedup:8.2f}배 │")
+    print("└────────────┴──────────┴────────────┴──────────────┴──────────────┴───────────┘")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="samsung_etl_daily backfill 처리량 벤치마크")
+    parser.add_argument('--start', default='2025-01-01', help="backfill 시작 날짜 (YYYY-MM-DD)")
+    parser.add_argument('--end', default='2025-03-31', help="backfill 끝 날짜 (포함)")
+    parser.add_argument('--concurrency', default='1,2,4,8', help="비교할 동시 실행 수 (쉼표로 구분)")
+    parser.add_argument('--source', default=DEFAULT_SOURCE, help="원본 csv (FinanceDataReader 대신)")
+    parser.add_argument('--with-load', action='store_true', help="MySQL samsung_daily까지 적재 (DB 필요)")
+    args = parser.parse_args()
+
+    start, end = date.fromisoformat(args.start), date.fromisoformat(args.end)
+    days = [start + timedelta(days=i) for i in range((end - start).days + 1)]
+    levels = [int(c) for c in args.concurrency.split(',')]
+
+    print("=" * 60)
+    print(f"📊 backfill 벤치마크: {args.start} ~ {args.end} ({len(days)}일), 동시 실행 {levels}")
+    print("=" * 60)
+
+    results = []
+    for level in levels:
+        data_dir = tempfile.mkdtemp(prefix='backfill_bench_') # 실행마다 빈 저장소에서 시작
+        try:
+            result = backfill(days, level, data_dir, os.path.abspath(args.source), args.with_load)
+        finally:
+            shutil.rmtree(data_dir, ignore_errors=True)
+
+        results.append(result)
+        load_note = f", 적재 {result['load_sec']:.2f}초" if args.with_load else ""
+        print(f" 동시 {level}: {result['wall_sec']:.2f}초 ({result['runs_per_sec']:.2f} 실행/초, 휴장 {result['skipped']}일{load_note})")
+
+    print_results(results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+# DAG 파일 parse 시간 벤치마크
+#
+# 스케줄러(dag-processor)는 dags/ 폴더의 파일을 주기적으로 다시 읽는다(parse). 파일 맨 위에서 modules를 import하면
+# parse할 때마다 pandas/numpy/pymysql까지 불러오게 되고, 종목별 DAG 파일이 수백 개가 되면 그만큼 곱해진다.
+#
+# 비교:
+#   - lazy : 지금 samsung_ETL_dag.py (modules import는 task 함수 안에서만)
+#   - eager: 예전처럼 맨 위에서 modules를 import한 경우 (= modules import + DAG 파일 parse)
+# 측정마다 새 파이썬 프로세스를 띄운다. (이미 import된 모듈이 캐시되면 두 번째부터는 비용이 안 보이므로)
+# Airflow 자체(airflow.sdk 등) import는 dag-processor에 이미 올라와 있으므로 시간에서 뺀다.
+#
+# 사용법 (airflow 폴더에서, Airflow가 설치된 환경 = 컨테이너 안):
+#   python benchmarks/dag_parse_time.py --repeat 10
+#   python benchmarks/dag_parse_time.py --dags 500      # DAG 파일 500개일 때 parse 한 바퀴 예상 시간
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_DAG = os.path.join(BENCH_DIR, '..', 'dags', 'samsung_ETL_dag.py')
+MODULES_DIR = os.path.join(BENCH_DIR, '..', 'modules')
+
+TASK_MODULES = ['airflow_extract_samsung', 'airflow_transform_samsung', 'airflow_load_samsung']
+HEAVY_MODULES = ['pandas', 'numpy', 'pymysql', 'pyarrow']
+
+# 새 프로세스에서 실행할 코드: Airflow import -> (eager면 modules import) -> DAG 파일 실행, 시간과 로드된 무거운 모듈을 JSON으로 출력
+CHILD_CODE = """
+import importlib, json, runpy, sys, time
+dag_file, modules_dir, eager = sys.argv[1], sys.argv[2], sys.argv[3] == '1'
+task_modules, heavy_modules = {task_modules!r}, {heavy_modules!r}
+
+import airflow.sdk, airflow.exceptions, airflow.timetables.interval, pendulum  # dag-processor에 이미 올라와 있는 부분
+sys.path.insert(0, modules_dir)
+
+start = time.perf_counter()
+if eager:
+    for name in task_modules:
+        importlib.import_module(name)
+runpy.run_path(dag_file)
+elapsed = time.perf_counter() - start
+
+print(json.dumps({{'sec': elapsed, 'heavy': [m for m in heavy_modules if m in sys.modules]}}))
+""".format(task_modules=TASK_MODULES, heavy_modules=HEAVY_MODULES)
+
+
+def parse_once(dag_file, eager):
+    """
+    새 프로세스에서 DAG 파일 한 번 parse
+
+    Returns:
+        dict: {'sec': parse 시간, 'heavy': parse 후 올라와 있는 무거운 모듈 목록}
+    """
+    proc = subprocess.run(
+        [sys.executable, '-c', CHILD_CODE, dag_file, MODULES_DIR, '1' if eager else '0'],
+        capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"DAG parse 실패:\n{proc.stderr}")
+    return json.loads(proc.stdout.strip().splitlines()[-1]) # DAG 파일의 print 출력은 건너뜀
+
+
+def measure(dag_file, eager, repeat):
+    """
+    Returns:
+        dict: {'mode', 'p50_sec', 'min_sec', 'heavy'}
+    """
+    runs = [parse_once(dag_file, eager) for _ in range(repeat)]
+    times = [r['sec'] for r in runs]
+
+    return {
+        'mode': 'eager' if eager else 'lazy',
+        'p50_sec': statistics.median(times),
+        'min_sec': min(times),
+        'heavy': runs[-1]['heavy'],
+    }
+
+
+def print_results(results, n_dags):
+    print("\n┌────────┬──────────────┬──────────────┬────────────────────┬──────────────────────────────┐")
+    print(f"│ 방식   │ parse p50    │ parse 최소   │ DAG {n_dags:5d}개 예상   │ parse 때 로드된 무거운 모듈  │")
+    print("├────────┼──────────────┼──────────────┼────────────────────┼──────────────────────────────┤")
+    for r in results:
+        heavy = ', '.join(r['heavy']) or '-'
+        print(f"│ {r['mode']:6s} │ {r['p50_sec'] * 1000:10.1f}ms │ {r['min_sec'] * 1000:10.1f}ms │ "
+              f"{r['p50_sec'] * n_dags:16.1f}초 │ {heavy:28s} │")
+    print("└────────┴──────────────┴──────────────┴────────────────────┴──────────────────────────────┘")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="DAG 파일 parse 시간 벤치마크 (lazy import vs 맨 위 import)")
+    parser.add_argument('--dag', default=DEFAULT_DAG, help="측정할 DAG 파일")
+    parser.add_argument('--repeat', type=int, default=10, help="방식마다 반복 횟수 (매번 새 프로세스)")
+    parser.add_argument('--dags', type=int, default=300, help="예상 시간 계산용 DAG 파일 수 (종목별 DAG 개수)")
+    args = parser.parse_args()
+
+    dag_file = os.path.abspath(args.dag)
+
+    print("=" * 60)
+    print(f"📊 DAG parse 벤치마크: {os.path.basename(dag_file)} ({args.repeat}회씩, 매번 새 프로세스)")
+    print("=" * 60)
+
+    results = []
+    for eager in (False, True):
+        result = measure(dag_file, eager, args.repeat)
+        results.append(result)
+        print(f" {result['mode']}: p50 {result['p50_sec'] * 1000:.1f}ms")
+
+    print_results(results, args.dags)
+
+    lazy, eager = results
+    if lazy['p50_sec'] > 0:
+        print(f"\n✅ lazy import로 parse 시간 {eager['p50_sec'] / lazy['p50_sec']:.1f}배 단축 "
+              f"(DAG {args.dags}개 기준 한 바퀴 {(eager['p50_sec'] - lazy['p50_sec']) * args.dags:.1f}초 절약)")
+    if lazy['heavy']:
+        print(f"⚠️ lazy인데도 parse 때 로드됨: {', '.join(lazy['heavy'])} (DAG 파일 맨 위 import 확인 필요)")
+
+
+if __name__ == "__main__":
+    main()
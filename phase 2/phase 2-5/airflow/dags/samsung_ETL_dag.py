@@ -1,30 +1,165 @@
 # 본격적인 '삼성주식 ETL 파일'의 DAG(자동화) 작업이다.
+#
+# 구조 (Dynamic Task Mapping):
+#   create_table ─┐
+#   plan_partitions ─> [ (종목, 기간 파티션)마다 extract -> transform -> load ] x N  (mapped task group) ─> refresh_features
+#
+# - plan_partitions: 종목 목록(TICKERS) x 월 단위 기간으로 파티션 목록을 만듦 -> 파티션 수만큼 task group이 펼쳐짐(expand)
+# - 파티션마다 extract/transform/load가 따로 실행되므로, worker가 여러 개면 파티션끼리 병렬로 돈다.
+# - 파일 경로는 하드코딩(op_args) 대신 XCom(task의 return 값)으로 다음 task에 넘긴다.
+# - load는 transform 결과 파일을 적재하고, MySQL 동시 접속은 pool(DB_POOL)의 slot 수만큼으로 제한한다.
+#   (pool은 docker-compose의 airflow-init에서 만듦: airflow pools set samsung_mysql 1 ...)
+#   slot 1개 = 적재가 한 번에 하나씩. (extract/transform은 제한 없이 병렬)
+# - 파티션 적재는 자기 구간만 교체(replace_range)하고 파생변수는 건드리지 않는다. samsung_daily_features는 모든 적재가 끝난 뒤
+#   refresh_features가 시작일부터 한 번만 다시 계산한다. (파티션마다 '그 구간 ~ 끝'을 다시 계산하면 파티션 N개에 O(N²))
 
-from airflow import DAG
-from airflow.operators.python import PythonOperator
+import os
+
+from airflow.exceptions import AirflowSkipException
+from airflow.sdk import DAG, Param, task, task_group
+from airflow.timetables.interval import CronDataIntervalTimetable
 import pendulum # 파이썬 날짜/시간 라이브러리. Python 기본 'datetime'보다 시간대(time zone) 처리가 편해서 Airflow에서 많이 쓴다고 함.
 
 # 'modules'에서 함수 import
+# 스케줄러(dag-processor)는 이 파일을 주기적으로 계속 다시 읽는데(parse), 맨 위에서 modules를 import하면
+# 그때마다 pandas/numpy/pymysql까지 같이 불러와서 parse가 느려진다.
+# -> 경로만 추가해 두고, 실제 import는 각 task 함수 안에서 (task가 실행될 때 worker에서만) 한다.
+# (parse 시간 비교: benchmarks/dag_parse_time.py)
 import sys
 sys.path.append('/opt/airflow/modules') # 'modules' 폴더 경로 추가.
-from airflow_extract_samsung import extract
-from airflow_transform_samsung import transform
-from airflow_load_samsung import create_table, load_data
+
+TICKERS = ['005930'] # 관심 종목 (삼성전자). 원본 데이터가 있는 종목을 추가하면 파티션이 그만큼 늘어난다.
+LOAD_TICKER = '005930' # samsung_daily 테이블에는 종목 칼럼이 없어서, 이 종목만 MySQL에 적재
+DB_POOL = 'samsung_mysql' # MySQL 적재 동시 실행 제한용 pool
+DATA_DIR = "/opt/airflow/data"
+MAX_ACTIVE_RUNS = int(os.environ.get('SAMSUNG_MAX_ACTIVE_RUNS', 16)) # 일별 DAG backfill 때 동시에 도는 실행(날짜) 수
 
 with DAG(
     dag_id = "samsung_etl_dag",
     start_date = pendulum.datetime(2025,12,3, tz="UTC"),
     catchup = False,
     schedule = None,
+    params = {
+        'start_date': Param('2024-11-28', type='string', format='date'),
+        'end_date': Param('2025-11-27', type='string', format='date'),
+    },
     tags = ["ETL", "samsung"]
 ) as dag:
-    task_1 = PythonOperator(task_id="extract_task", python_callable=extract) # bash에서는 command를 직접 입력했지만, python은 함수를 직접 호출해서 작동시킨다.
-    task_2 = PythonOperator(task_id="transform_task", python_callable=transform, op_args=["/opt/airflow/data/samsung_2024-11-28_2025-11-27.csv"]) # 'transform'과 'load_data'는 파라미터가 필요하므로, 'op_args(operator arguments(연산자 인자): 함수에 전달할 파라미터를 리스트로 넣어줌.)' 추가해야 함.
-    # task_3 = PythonOperator(task_id="load_task", python_callable=create_table,load_data) # 'python_callable'은 함수 1개만 받을 수 있다. 따라서, task 2개로 분리해서 작성해야 함.
-    task_3 = PythonOperator(task_id="create_table_task", python_callable=create_table)
-    task_4 = PythonOperator(task_id="load_task", python_callable=load_data, op_args=["/opt/airflow/data/samsung_2024-11-28_2025-11-27.csv"])
 
-    task_1 >> task_2 >> task_3 >> task_4
+    @task
+    def create_table_task():
+        from airflow_load_samsung import create_table
+        create_table()
+
+
+    @task
+    def plan_partitions(params=None):
+        """(종목, 월) 파티션 목록. 예) [{'ticker': '005930', 'start': '2024-11-28', 'end': '2024-11-30'}, ...]"""
+        start = pendulum.parse(params['start_date']).date()
+        end = pendulum.parse(params['end_date']).date()
+
+        partitions = []
+        for ticker in TICKERS:
+            month_start = start
+            while month_start <= end:
+                month_end = min(month_start.end_of('month'), end)
+                partitions.append({'ticker': ticker, 'start': str(month_start), 'end': str(month_end)})
+                month_start = month_end.add(days=1)
+
+        print(f"파티션 {len(partitions)}개: 종목 {len(TICKERS)}개 x 기간")
+        return partitions
+
+
+    @task
+    def extract_task(partition):
+        from airflow_extract_samsung import extract_partition
+        extracted = extract_partition(partition['ticker'], partition['start'], partition['end'])
+        if extracted is None:
+            raise AirflowSkipException(f"데이터 없음: {partition}") # 휴장 등으로 빈 구간이면 이 파티션의 transform/load도 건너뜀
+        return extracted # XCom으로 transform_task에 전달
+
+
+    @task
+    def transform_task(extracted):
+        from airflow_transform_samsung import transform_partition
+        # 파티션마다 따로 저장 (여러 파티션이 동시에 같은 파일에 쓰지 않도록)
+        return transform_partition(extracted, f"{DATA_DIR}/transformed/{extracted['ticker']}/range={extracted['start']}_{extracted['end']}")
+
+
+    @task(pool=DB_POOL)
+    def load_task(transformed):
+        from airflow_load_samsung import replace_range
+        if transformed['ticker'] != LOAD_TICKER:
+            raise AirflowSkipException(f"{transformed['ticker']}: samsung_daily 적재 대상 아님")
+
+        # 파티션들이 순서 없이 적재되므로, MAX(date) 이후만 넣는 load_data 대신 파티션 구간만 교체. 파생변수는 refresh_features에서 한 번에
+        return replace_range(transformed['output_file'], transformed['start'], transformed['end'], update_features=False)
+
+
+    @task_group
+    def etl_partition(partition):
+        load_task(transform_task(extract_task(partition)))
+
+
+    # 휴장 등으로 건너뛴(skipped) 파티션이 있어도 실행, 실패한 파티션이 있으면 실행 안 함
+    @task(pool=DB_POOL, trigger_rule='none_failed')
+    def refresh_features(params=None):
+        from airflow_load_samsung import rebuild_features_since
+        rebuild_features_since(params['start_date'])
+
+
+    create_table_task() >> etl_partition.expand(partition=plan_partitions()) >> refresh_features()
+
+
+
+# ========================================
+# 일별 스케줄 DAG (catchup/backfill)
+# ========================================
+# - 매일 [data_interval_start, data_interval_end) 하루치만 extract -> transform -> load
+# - catchup=True: start_date부터 밀린 날짜를 전부 실행(backfill). 동시에 도는 실행 수는 max_active_runs로 제한
+# - 실행(날짜)마다 자기 date= 파티션에만 쓰고, MySQL도 그 날짜 구간만 지우고 다시 넣으므로(replace_range)
+#   여러 날짜가 동시에 돌아도 서로의 결과를 덮어쓰지 않고, 같은 날짜를 다시 돌려도 결과가 같다.
+# - Airflow 3의 기본 cron 스케줄은 data_interval_start = end(구간 없음)라서, 구간이 있는 CronDataIntervalTimetable을 명시
+with DAG(
+    dag_id = "samsung_etl_daily",
+    start_date = pendulum.datetime(2024,11,28, tz="UTC"), # 원본 데이터 시작일
+    schedule = CronDataIntervalTimetable("@daily", timezone="UTC"),
+    catchup = True,
+    max_active_runs = MAX_ACTIVE_RUNS,
+    tags = ["ETL", "samsung", "daily"]
+) as daily_dag:
+
+    @task
+    def create_table_daily():
+        from airflow_load_samsung import create_table
+        create_table()
+
+
+    @task
+    def extract_day(data_interval_start=None, data_interval_end=None):
+        from airflow_extract_samsung import extract
+        manifest = extract(data_interval_start, data_interval_end, ticker=LOAD_TICKER) # raw/{종목}/date=.../ 에 추가
+        if manifest['rows'] == 0:
+            raise AirflowSkipException(f"{manifest['start']}: 거래 데이터 없음 (휴장일)")
+        return manifest
+
+
+    @task
+    def transform_day(manifest):
+        from airflow_extract_samsung import extract_partition
+        from airflow_transform_samsung import transform_partition
+        # 파생 변수 계산에는 이전 19거래일이 필요해서, 그만큼 붙인 transform 입력을 따로 만든다.
+        # 입력은 extract_day가 쓴 raw 저장소(manifest['path'])에서 읽고, backfill 중 아직 추출 안 된 이전 날짜만 원본에서 가져옴
+        last_day = pendulum.parse(manifest['end']).subtract(days=1).to_date_string()
+        staged = extract_partition(manifest['ticker'], manifest['start'], last_day,
+                                   store_dir=os.path.dirname(manifest['path']))
+        return transform_partition(staged, f"{DATA_DIR}/transformed/{manifest['ticker']}/date={manifest['start']}")
+
 
+    @task(pool=DB_POOL)
+    def load_day(transformed):
+        from airflow_load_samsung import replace_range
+        return replace_range(transformed['output_file'], transformed['start'], transformed['end'])
 
 
+    create_table_daily() >> load_day(transform_day(extract_day()))
@@ -2,89 +2,204 @@
 # 'phase 2-1/finance_test.py'에서 사용했던 'FinanceDataReader' 라이브러리를 사용할 예정입니다.
 
 #import FinanceDataReader as fdr
+import hashlib
+import os
+
 import pandas as pd
 from datetime import datetime
 
+import airflow_storage as storage
+
 # ※ 기존의 'extract_samsung.py'에서 airflow에 맞게끔 리팩토링(코드 내용은 같지만 구조를 변화시키는 것)하는 작업이다.
 # 함수로 작성했으니 return 부분 추가 + 경로를 Docker 경로로 바꾸기만 수정되었다.
 
-def extract():
-    # 1. 추출 범위 설정
-    Start_Date = '2024-11-28'
-    End_Date = '2025-11-27'
-    Stock_Code = '005930' # 삼성전자 코드
-
-    print("=" * 50)
-    print("삼성전자 주가 데이터 추출")
-    print("=" * 50)
-    print(f"종목 코드: {Stock_Code}")
-    print(f"추출 기간: {Start_Date} ~ {End_Date}")
-    print("-" * 50)
-
+## 설정
+RAW_DIR = "/opt/airflow/data/raw" # 날짜 파티션 원본 저장소 (extract)
+STAGING_DIR = "/opt/airflow/data/staging" # transform 입력 파일 (extract_partition: 구간 + 이전 19거래일)
 
-    # 2. 데이터 추출
-    print("\n데이터 추출 중...")
-    #samsung = fdr.DataReader(Stock_Code, Start_Date, End_Date) # Docker 컨테이너에서 이 'FinanceDataReader' 패키지가 잘 설치되지 않음. 그래서 밑에 직접 파일 읽는 걸로 수정함.
-    samsung = "/opt/airflow/data/samsung_2024-11-28_2025-11-27.csv"
-    #print(samsung.index) # samsung 데이터의 index 출력. 자동으로 DataReader가 'Date'를 인덱스로 설정함.
-    # Index: 각 행(row)을 식별하는 기준. 인덱스 단어 그 자체의 의미로 행이라고 생각하면 되고, 대신 여기에 '행의 기준이 되는 = 식별할 기준이 되는'을 덧붙이면 된다.
+# FinanceDataReader를 못 쓰는 환경이라, 종목별로 미리 받아 둔 원본 csv에서 잘라서 쓴다.
+# (csv는 처음 한 번만 parse해서 옆에 같은 이름의 .arrow로 저장해 두고, 그 다음부터는 .arrow에서 구간만 꺼냄)
+SOURCE_FILES = {
+    '005930': "/opt/airflow/data/samsung_2024-11-28_2025-11-27.csv", # 삼성전자
+}
 
-    # 파일 존재 확인 코드
-    import os
-    if os.path.exists(samsung):
-        df = pd.read_csv(samsung)
-        print(f"✅ 파일 확인 완료: {samsung}")
-        print(f"총 데이터: {len(df)} rows")
-    else:
-        raise FileNotFoundError(f"파일 없음: {samsung}") # 'raise'는 'phase 1-3'에서 'sales_data.ipynb'에서 다룬 '에러를 위(나를 호출한 곳)로 다시 던지는 개념임.
-
-    return samsung
-    # 기존 extract_samsung 코드는 'DataReader'로 불러서 csv로 변환하는 작업을 거쳤지만, 여기서는 이미 저장된 csv 파일만을 불러오기에 이렇게 코드를 변경하였습니다.(Docker의 패키지(라이브러리) 의존성 충돌 문제로 인해 이렇게 변경함.)  
+LOOKBACK_ROWS = 19 # 가장 긴 윈도우(MA_20, Volatility_20)를 계산하려면 파티션 시작 전 19거래일이 더 필요함
 
 
-    # # 3. 기본 정보 확인 
-    # print(f"\n✅ 추출 완료!")
-    # print(f"총 데이터: {len(samsung)} rows")
-    # print(f"컬럼: {list(samsung.columns)}") # 삼성 데이터프레임의 column들을 list 형식으로 보여 줌.
+def extract(data_interval_start=None, data_interval_end=None, ticker='005930', raw_dir=RAW_DIR):
+    """
+    DAG 실행 구간(data_interval_start ~ data_interval_end)만 가져와서 날짜 파티션 원본 저장소에 추가
 
+    - Airflow task에서 python_callable로 쓰면 data_interval_start/end를 context에서 자동으로 넣어준다.
+    - 구간은 [start, end) (start 포함, end 미포함) -> 매일 실행하면 하루치만 읽고 씀
+    - 저장: raw/{ticker}/date=YYYY-MM-DD/{ticker}.arrow (날짜마다 파일 1개. 같은 날짜를 다시 추출하면 그 파일만 교체)
+      거래가 없는 날(휴장일)도 빈 파일을 남김 -> 저장소에 폴더가 없는 날짜 = 아직 추출 안 된 날짜 (read_window가 이걸로 구분)
+    - 예전처럼 저장한 파일을 다시 read_csv로 읽어서 확인하지 않고, 쓴 내용으로 바로 manifest(경로, 행 수, 체크섬)를 만든다.
+    - 구간을 안 주면(직접 실행) 예전 고정 구간(2024-11-28 ~ 2025-11-27)
 
-    # # 4. 기본 통계
-    # print("\n" + "=" * 50)
-    # print("기본 통계")
-    # print("=" * 50)
-    # print(f"시작일: {samsung.index[0]}") # 첫 인덱스(행). 즉, 시작일 데이터.
-    # print(f"종료일: {samsung.index[-1]}") # 마지막 인덱스(행). 즉, 마지막일 데이터.
-    # print(f"최고가: {samsung['High'].max():,.0f}원") # samsung의 high column에서의 max. 즉, high 중에서도 최고값. 그리고 쉼표(,)는 천 단위 구분 기호를, 0f는 소수점 아래 0자리의 float을, ':'은 포맷 시작(이렇게 설정을 하겠다라는 의미)이다.
-    # print(f"최저가: {samsung['Low'].min():,.0f}원") # samsung의 low column에서의 min. 즉, low 중에서도 최저값.
-    # print(f"평균 거래량: {samsung['Volume'].mean():,.0f}주")
+    Returns:
+        dict: manifest {'ticker', 'start', 'end', 'path', 'files', 'rows', 'checksum'}
+    """
+    # 1. 추출 범위 설정
+    if data_interval_start is None or data_interval_end is None:
+        start, end = pd.Timestamp('2024-11-28'), pd.Timestamp('2025-11-28')
+    else:
+        # Airflow가 주는 값은 시간대가 있는 pendulum DateTime -> 날짜만 사용
+        start = pd.Timestamp(data_interval_start.strftime('%Y-%m-%d'))
+        end = pd.Timestamp(data_interval_end.strftime('%Y-%m-%d'))
 
-    # # 최근 5일 데이터 확인
-    # print("\n" + "=" * 50)
-    # print("최근 5일 데이터")
-    # print("=" * 50)
-    # print(samsung.tail())
+    print("=" * 50)
+    print("주가 데이터 추출")
+    print("=" * 50)
+    print(f"종목 코드: {ticker}")
+    print(f"추출 기간: {start.date()} ~ {end.date()} (미포함)")
+    print("-" * 50)
 
-    # # 5. 데이터 품질 체크
-    # print("\n" + "=" * 50)
-    # print("데이터 품질 체크")
-    # print("=" * 50)
-    # print(f"결측치: {samsung.isnull().sum().sum()}개") # isnull()을 통해, 데이터프레임의 각 셀에 결측치가 있는지 판단(있으면 true, 없으면 false 반환). 첫번째 sum()을 통해 각 컬럼별로 결측치 갯수를 합함. 두번째 sum()을 통해 전부 다 합하여, 전체 결측치 갯수로 합함.(2차원)
-    # print(f"중복: {samsung.duplicated().sum()}개") # 이거는 행 단위이므로, duplicated()를 통해 중복행이 있는지 판단하고, 한번의 sum()을 통해 전체로 합침.(1차원)
+    # 2. 데이터 추출 (구간만)
+    df = fetch(ticker, start, end - pd.Timedelta(days=1))
+    df = df[(df.index >= start) & (df.index < end)]
+
+    # 3. 날짜 파티션에 저장
+    files, checksum = write_raw_partitions(df, ticker, raw_dir, days=pd.date_range(start, end, inclusive='left'))
+
+    manifest = {
+        'ticker': ticker,
+        'start': str(start.date()),
+        'end': str(end.date()),
+        'path': f"{raw_dir}/{ticker}",
+        'files': files,
+        'rows': len(df),
+        'checksum': checksum,
+    }
+    print(f"✅ 추출 완료: {len(df)}건, 파티션 {len(files)}개 ({checksum[:19]}...)")
+    return manifest
+
+
+## 원본 데이터 가져오기 / 날짜 파티션 저장소
+def fetch(ticker, start=None, end=None):
+    """
+    종목 원본 데이터 중 [start, end] 구간 (Date 인덱스. start/end가 None이면 처음/끝까지)
+    FinanceDataReader가 설치돼 있으면 그 구간만 받아오고, 없으면 SOURCE_FILES 원본에서 그 구간만 꺼냄.
+    (매일 실행마다 1년치 csv를 다시 parse하지 않도록 source_arrow()의 .arrow에서 메모리 맵으로 구간만 읽음)
+    """
+    try:
+        import FinanceDataReader as fdr # 설치돼 있으면 실제로 받아옴
+        return fdr.DataReader(ticker, start, end)
+    except ImportError:
+        pass
+
+    return storage.read_frame(source_arrow(ticker), start=start, end=end)
+
+
+def source_arrow(ticker):
+    """
+    SOURCE_FILES[ticker] csv를 RAW_SCHEMA 그대로 옆에 .arrow로 저장해 두고 그 경로를 반환
+    (.arrow가 없거나 csv가 더 새로우면 다시 만듦 -> csv parse는 원본이 바뀔 때만 한 번)
+    """
+    if ticker not in SOURCE_FILES:
+        raise FileNotFoundError(f"원본 데이터 없음: {ticker} (SOURCE_FILES에 csv 경로 추가 필요)")
+
+    csv_path = SOURCE_FILES[ticker]
+    arrow_path = os.path.splitext(csv_path)[0] + storage.SUFFIX
+    if not os.path.exists(arrow_path) or os.path.getmtime(arrow_path) < os.path.getmtime(csv_path):
+        storage.write_frame(storage.read_frame(csv_path), arrow_path, storage.RAW_SCHEMA)
+    return arrow_path
+
+
+def write_raw_partitions(df, ticker, raw_dir=RAW_DIR, days=None):
+    """
+    날짜마다 raw_dir/{ticker}/date=YYYY-MM-DD/{ticker}.arrow 로 저장 (RAW_SCHEMA 타입 그대로, 임시 파일에 쓰고 교체)
+    days를 주면 그 날짜들 전부 저장 (df에 행이 없는 날짜는 0행 파일 = '추출했는데 거래 없음')
+
+    Returns:
+        (list[str], str): (저장한 파일 경로들, 'sha256:...' 체크섬(저장한 바이트 전체 기준))
+    """
+    digest = hashlib.sha256()
+    files = []
+
+    groups = {day: rows for day, rows in df.groupby(df.index.normalize())}
+    for day in (groups if days is None else days):
+        rows = groups.get(day, df.iloc[0:0])
+        path = f"{raw_dir}/{ticker}/date={day.strftime('%Y-%m-%d')}/{ticker}{storage.SUFFIX}"
+
+        data = storage.to_ipc_bytes(rows, storage.RAW_SCHEMA)
+        digest.update(data)
+        files.append(storage.write_bytes(path, data))
+
+    return files, f"sha256:{digest.hexdigest()}"
+
+
+def raw_dates(ticker, start, end, raw_dir=RAW_DIR):
+    """
+    날짜 파티션 원본 저장소에 있는 [start, end] 구간 날짜들 ('YYYY-MM-DD' 정렬 리스트, 파일까지 다 쓴 날짜만)
+    start/end는 문자열/date/Timestamp 아무거나 (폴더 이름과 같은 'YYYY-MM-DD'로 맞춰서 비교)
+    """
+    base = f"{raw_dir}/{ticker}"
+    if not os.path.isdir(base):
+        return []
+
+    start, end = pd.Timestamp(start).strftime('%Y-%m-%d'), pd.Timestamp(end).strftime('%Y-%m-%d')
+    return sorted(d[len('date='):] for d in os.listdir(base)
+                  if d.startswith('date=') and start <= d[len('date='):] <= end
+                  and os.path.exists(f"{base}/{d}/{ticker}{storage.SUFFIX}")) # 다른 실행이 아직 쓰는 중인 날짜(폴더만 있음)는 없는 날짜로
+
+
+def read_raw(ticker, start, end, raw_dir=RAW_DIR):
+    """날짜 파티션 원본 저장소에서 [start, end] 구간 읽기 (Date 인덱스)"""
+    frames = [storage.read_frame(f"{raw_dir}/{ticker}/date={d}/{ticker}{storage.SUFFIX}")
+              for d in raw_dates(ticker, start, end, raw_dir)]
+    return pd.concat(frames) if frames else pd.DataFrame()
+
+
+def read_window(ticker, start, end, raw_dir=RAW_DIR):
+    """
+    [start, end] 구간을 날짜 파티션 원본 저장소에서 읽고, 저장소에 없는 날짜(아직 추출 안 된 날짜)만 fetch()로 채움
+    (backfill 중에는 이전 날짜 실행이 아직 안 끝났을 수 있음 -> 그 날짜들만 원본에서 가져옴)
+    """
+    stored = read_raw(ticker, start, end, raw_dir)
+    have = set(raw_dates(ticker, start, end, raw_dir))
+    missing = [day for day in pd.date_range(pd.Timestamp(start).normalize(), end) if day.strftime('%Y-%m-%d') not in have]
+    if not missing:
+        return stored
+
+    fetched = fetch(ticker, missing[0], missing[-1])
+    fetched = fetched[fetched.index.normalize().isin(missing)]
+    print(f"원본 저장소 {len(stored)}건 + 저장소에 없는 날짜 {len(missing)}일 원본에서 {len(fetched)}건")
+    return pd.concat([stored, fetched]).sort_index() if len(stored) else fetched
+
+
+## 종목/기간 단위 추출 (DAG에서 (종목, 기간 파티션)마다 하나씩 실행)
+def extract_partition(ticker, start_date, end_date, lookback=LOOKBACK_ROWS, raw_dir=STAGING_DIR, store_dir=None):
+    """
+    ticker의 [start_date, end_date] 구간만 잘라서 raw_dir/{ticker}/ 아래 .arrow로 저장 (transform 입력)
+    파생 변수 계산용으로 구간 앞 lookback 거래일도 같이 저장한다. (Transform에서 keep_from=start_date로 잘라냄)
+    store_dir: 날짜 파티션 원본 저장소(extract()가 쓴 곳). 주면 거기서 읽고 저장소에 없는 날짜만 원본에서 가져옴 (read_window)
+
+    Returns:
+        dict | None: {'ticker', 'start', 'end', 'path', 'rows'(구간 안 행 수)}. 구간에 데이터가 없으면 None
+    """
+    # lookback 거래일을 확보하려고 달력 기준으로 넉넉히(거래일 x 2 + 10일) 앞에서부터 가져옴 (연휴 고려)
+    window_start = pd.Timestamp(start_date) - pd.Timedelta(days=lookback * 2 + 10)
+    if store_dir is None:
+        df = fetch(ticker, window_start, end_date)
+    else:
+        df = read_window(ticker, window_start, end_date, store_dir)
 
-    # print("\n" + "=" * 50)
-    # print("추출 완료!")
-    # print("=" * 50)
+    in_range = (df.index >= pd.Timestamp(start_date)) & (df.index <= pd.Timestamp(end_date))
+    if not in_range.any():
+        print(f"⚠️ {ticker} {start_date} ~ {end_date}: 데이터 없음")
+        return None
 
-    # # 6. 최종 CSV 저장
-    # import os
+    first = in_range.argmax() # 구간 안 첫 행 위치
+    last = len(in_range) - 1 - in_range[::-1].argmax() # 구간 안 마지막 행 위치
+    part = df.iloc[max(first - lookback, 0): last + 1]
 
-    # os.makedirs("/opt/airflow/data", exist_ok=True) # Docker 경로로 수정. Docker 안에서는 '/opt/airflow/data' 경로가 내 로컬 'airflow/data' 폴더이다.
+    path = storage.write_frame(part, f"{raw_dir}/{ticker}/{ticker}_{start_date}_{end_date}{storage.SUFFIX}", storage.RAW_SCHEMA)
 
-    # filename = f"/opt/airflow/data/samsung_{Start_Date}_{End_Date}.csv"
-    # samsung.to_csv(filename, encoding='utf-8-sig')
-    # print(f"\n✅ 저장 완료: {filename}")
+    rows = int(in_range.sum())
+    print(f"✅ {ticker} {start_date} ~ {end_date}: {rows}건 (+ 이전 {first - max(first - lookback, 0)}건) -> {path}")
+    return {'ticker': ticker, 'start': str(start_date), 'end': str(end_date), 'path': path, 'rows': rows}
 
-    # return filename # airflow 부분에서 새로 추가됨. 함수로 작성했으니 return 값으로 결과 반환.
 
 if __name__ == "__main__":
     extract()
\ No newline at end of file
@@ -2,9 +2,13 @@
 
 # 삼성전자 주식 데이터를 웹 MySQL에 적재하는 모듈
 
+import time
+
 import pymysql
 import pandas as pd
 
+import airflow_storage as storage
+
 # 1. DB 설정
 DB_CONFIG = {
     'host': 'host.docker.internal', # Docker가 로컬 PC를 가리키는 주소.
@@ -41,6 +45,27 @@ create table if not exists samsung_daily (
 )
 """
 
+# 파생변수를 미리 계산해서 저장해 두는 테이블 (materialized). get_data_with_query()가 최신이면 여기서 바로 읽음.
+# 칼럼 타입은 window 쿼리 결과 타입과 맞춤 (avg(int) -> 소수점 4자리 decimal) -> 어느 쪽에서 읽어도 같은 값.
+CREATE_FEATURES_TABLE_SQL = """
+create table if not exists samsung_daily_features (
+    date DATE Primary Key,
+    open int,
+    high int,
+    low int,
+    close int,
+    volume int,
+    `change` float,
+    MA_5 decimal(20,4),
+    MA_20 decimal(20,4),
+    Volatility int,
+    Volume_MA_5 decimal(20,4),
+    Price_Range decimal(20,4)
+)
+"""
+
+MA_WINDOW = 20 # 가장 긴 윈도우 (MA_20)
+
 # 3. 테이블 생성 함수
 def create_table():
 
@@ -50,6 +75,7 @@ def create_table():
 
     # SQL 실행
     cursor.execute(CREATE_TABLE_SQL)
+    cursor.execute(CREATE_FEATURES_TABLE_SQL)
 
     # 반영 및 종료
     conn.commit()
@@ -59,7 +85,44 @@ def create_table():
     print("테이블 생성 완료!")
 
 # 4. 데이터 적재 함수
-def load_data(input_file): # 파라미터 추가.
+UPSERT_SQL = """
+insert into samsung_daily (date, open, high, low, close, volume, `change`)
+values (%s, %s, %s, %s, %s, %s, %s)
+on DUPLICATE KEY UPDATE
+    open = values(open),
+    high = values(high),
+    low = values(low),
+    close = values(close),
+    volume = values(volume),
+    `change` = values(`change`)
+"""
+
+LOAD_COLUMNS = ['Date', 'Open', 'High', 'Low', 'Close', 'Volume', 'Change'] # 열 순서 = UPSERT_SQL의 %s 순서
+
+
+def read_input(input_file):
+    """
+    적재할 원본 칼럼만 읽기 (Date 칼럼 + 가격/거래량)
+    transform 결과(.arrow)는 메모리 맵으로 원본 칼럼만 꺼냄 -> 파생 변수 칼럼은 읽지도, parse하지도 않음
+    """
+    return storage.read_frame(input_file, columns=LOAD_COLUMNS[1:]).reset_index()
+
+
+def get_max_date(cursor):
+    """테이블에 적재된 마지막 날짜 (비어 있으면 None)"""
+    cursor.execute("select max(date) from samsung_daily")
+    return cursor.fetchone()[0]
+
+
+def _to_rows(df):
+    """DataFrame -> executemany용 튜플 리스트 (numpy 타입 -> 파이썬 기본 타입, NaN -> None(NULL))"""
+    df = df[LOAD_COLUMNS].astype(object)
+    df['Date'] = [d.date() for d in df['Date']] # Timestamp -> date (DATE 칼럼)
+    df = df.where(df.notna(), None)
+    return list(df.itertuples(index=False, name=None))
+
+
+def load_data(input_file, batch_size=1000, full_reload=False, update_features=True):
     """
     [설계 결정] 파생변수 저장 방식
 
@@ -76,53 +139,111 @@ def load_data(input_file): # 파라미터 추가.
     - 면접 답변: "학습 목적으로 쿼리 시점 계산을 선택했지만, 
     실무에서 대용량이라면 자주 쓰는 지표는 미리 계산해서 저장하는 게 효율적이라는 것도 알고 있습니다."
 
+    [적재 방식]
+    - 예전: df.iterrows()로 한 행씩 upsert -> 거래일 수만큼 DB 왕복
+    - 지금: batch_size 행씩 묶어서 multi-row upsert (pymysql executemany가 'values (...), (...), ...' 한 문장으로 합쳐서 보냄)
+    - 기본은 테이블의 MAX(date)보다 새로운 날짜만 적재 (이미 있는 과거 데이터는 다시 안 보냄)
+    - full_reload=True면 파일 전체를 다시 upsert
+    - update_features=True면 같은 트랜잭션 안에서 samsung_daily_features도 '영향받는 구간'만 다시 계산
+
+    Returns:
+        int: 적재한 행 수
     """
 
-    # 1. csv 파일 읽기(삼성주식 원본 데이터) -> 쿼리 시점에서 계산하기로 하였으므로, 원본 데이터만 DB에 저장한다.
-    df = pd.read_csv(input_file) 
+    # 1. 파일 읽기(삼성주식 원본 데이터) -> 쿼리 시점에서 계산하기로 하였으므로, 원본 데이터만 DB에 저장한다.
+    df = read_input(input_file)
 
     # 2. DB 연결
     conn = pymysql.connect(**DB_CONFIG)
     cursor = conn.cursor()
+    start = time.perf_counter()
+
+    if update_features:
+        cursor.execute(CREATE_FEATURES_TABLE_SQL) # DDL은 자동 commit 되므로 트랜잭션 시작 전에
+
+    try:
+        # 3. 새 날짜만 고르기 (upsert라서 다시 넣어도 중복은 안 생기지만, 안 바뀐 과거 데이터를 매번 보낼 필요는 없음)
+        if not full_reload:
+            max_date = get_max_date(cursor)
+            if max_date is not None:
+                df = df[df['Date'].dt.date > max_date]
+
+        rows = _to_rows(df)
+
+        # 4. batch_size 단위로 묶어서 upsert (행마다 왕복하지 않고, 배치마다 1번 왕복) -> 전체를 한 트랜잭션으로
+        for i in range(0, len(rows), batch_size):
+            cursor.executemany(UPSERT_SQL, rows[i:i + batch_size])
+
+        # 적재한 날짜 중 가장 이른 날짜부터 파생변수 다시 계산 (원본과 파생변수 테이블이 같이 commit 됨)
+        if update_features and rows:
+            refresh_features(cursor, min(row[0] for row in rows))
+
+        conn.commit()
+
+    except Exception:
+        conn.rollback() # 중간에 실패하면 이번에 넣은 건 전부 취소
+        raise
+
+    finally:
+        # 5. 종료
+        cursor.close()
+        conn.close()
+
+    elapsed = time.perf_counter() - start
+    print(f"데이터 {len(rows)}건 적재 완료! ({elapsed:.3f}초, batch_size={batch_size}{', 전체 재적재' if full_reload else ''})")
 
-    # 3. 데이터 insert(upsert는 굳이 필요 x -> 이미 끝난 과거 데이터 자료이니깐, 수정될 일이 없다고 판단함.) -> 하지만 Claude의 반문이, 코드를 두번 실행하면 이미 있던 데이터가 중복되므로 upsert로 해결해야한다고 말함.(insert로 그냥 하면 에러가 난다고 함.)
-    insert_sql = """
-    insert into samsung_daily (date, open, high, low, close, volume, `change`)
-    values (%s, %s, %s, %s, %s, %s, %s)
-    on DUPLICATE KEY UPDATE
-        open = values(open),
-        high = values(high),
-        low = values(low),
-        close = values(close),
-        volume = values(volume),
-        `change` = values(`change`)
+    return len(rows)
+
+
+def replace_range(input_file, start_date, end_date, batch_size=1000, update_features=True):
     """
-    
-    for index, row in df.iterrows():
-
-        # 값 추출
-        # csv를 df에서 불렀는데, 어쨋든 csv에 저장된 열 이름대로 대소문자 구분해서 작성해야한다.
-        date = row['Date']
-        open = row['Open']
-        high = row['High']
-        low = row['Low']
-        close = row['Close']
-        volume = row['Volume']
-        #change = row['`change`'] # 백틱은 SQL에서만 예약어 구분용이다. Dataframe 칼럼명에서는 필요가 없다.
-        change = row['Change']
-
-        cursor.execute(insert_sql, (date,open,high,low,close,volume,change)) # Upsert로 했으므로, df(dataframe)에서 각 열에 해당하는 각 행 값들을 가져와서 for문을 통해 직접 값들을 넣어줘야한다.('phase 1-3'의 'load.py' 참고)
-
-    # 4. 종료
-    conn.commit()
-    cursor.close()
-    conn.close()
+    [start_date, end_date] 날짜 구간만 교체 적재 (일별 DAG 실행/backfill용)
+
+    한 트랜잭션 안에서 그 구간을 지우고 input_file의 같은 구간 행을 다시 넣는다.
+    -> 같은 날짜를 몇 번 다시 돌려도 결과가 같고(멱등성), 다른 날짜 데이터는 건드리지 않음.
+
+    Returns:
+        int: 적재한 행 수
+    """
+    df = read_input(input_file)
+    df = df[(df['Date'] >= pd.Timestamp(start_date)) & (df['Date'] <= pd.Timestamp(end_date))]
+    rows = _to_rows(df)
+
+    conn = pymysql.connect(**DB_CONFIG)
+    cursor = conn.cursor()
+    start = time.perf_counter()
+
+    if update_features:
+        cursor.execute(CREATE_FEATURES_TABLE_SQL) # DDL은 자동 commit 되므로 트랜잭션 시작 전에
+
+    try:
+        conn.begin()
+        cursor.execute("delete from samsung_daily where date between %s and %s", (start_date, end_date))
+        for i in range(0, len(rows), batch_size):
+            cursor.executemany(UPSERT_SQL, rows[i:i + batch_size])
+
+        if update_features:
+            cursor.execute("delete from samsung_daily_features where date between %s and %s", (start_date, end_date))
+            refresh_features(cursor, start_date)
+
+        conn.commit()
+
+    except Exception:
+        conn.rollback() # 실패하면 삭제도 취소 -> 기존 데이터 그대로
+        raise
 
-    print(f"데이터 {len(df)}건 적재 완료!")
+    finally:
+        cursor.close()
+        conn.close()
+
+    print(f"{start_date} ~ {end_date} 구간 교체 적재: {len(rows)}건 ({time.perf_counter() - start:.3f}초)")
+    return len(rows)
 
 
 # 5. 쿼리 시점 계산(파생변수 계산)(Window Function)
 # 원본 데이터만 저장했으므로, 파생변수는 SELECT할 때 계산한다.
+# (+ load_data()가 같은 쿼리로 samsung_daily_features 테이블도 '새로 들어온 날짜 구간'만 갱신해 둠 -> 최신이면 그 테이블에서 바로 읽음)
+# ※ 최신 여부는 마지막 날짜 + 행 수로만 비교하므로, load_data()를 거치지 않고 samsung_daily 값을 직접 고치면 refresh_features()를 따로 호출해야 함.
 # - Phase 2-3에서 만들었던 파생변수들:
 #   - MA_5: 5일 이동평균
 #   - MA_20: 20일 이동평균
@@ -130,13 +251,7 @@ def load_data(input_file): # 파라미터 추가.
 #   - Volume_MA_5: 5일 거래량 이동평균
 #   - Price_Range: 당일 가격 범위 비율 ((High - Low) / Open * 100)
 
-def get_data_with_query():
-    """파생변수가 포함된 데이터 조회 (쿼리 시점 계산)"""
-
-    conn = pymysql.connect(**DB_CONFIG)
-    cursor = conn.cursor()
-
-    query = """
+FEATURES_QUERY = """
     select date, open, high, low, close, volume, `change`,
 
         -- 5일 이동평균
@@ -155,9 +270,104 @@ def get_data_with_query():
         (high - low) / open * 100 as Price_Range
 
     from samsung_daily
+    {where}
     order by date
+"""
+
+FEATURE_COLUMNS = ['date', 'open', 'high', 'low', 'close', 'volume', '`change`',
+                   'MA_5', 'MA_20', 'Volatility', 'Volume_MA_5', 'Price_Range']
+
+
+def refresh_features(cursor, since_date):
+    """
+    samsung_daily_features에서 since_date 이후 날짜만 다시 계산 (commit은 호출한 쪽에서)
+
+    ROWS 윈도우라서 since_date 이후 행들의 값은 '직전 19거래일 + 그 이후' 원본만 있으면 계산된다.
+    -> since_date 직전 19거래일부터 window 쿼리를 돌리고, since_date 이후 행만 upsert.
+    """
+    cursor.execute(
+        "select min(date) from (select date from samsung_daily where date < %s order by date desc limit %s) t",
+        (since_date, MA_WINDOW - 1)
+    )
+    window_start = cursor.fetchone()[0] or since_date
+
+    columns = ", ".join(FEATURE_COLUMNS)
+    updates = ",\n        ".join(f"{c} = values({c})" for c in FEATURE_COLUMNS[1:])
+
+    cursor.execute(
+        f"""
+        insert into samsung_daily_features ({columns})
+        select * from ({FEATURES_QUERY.format(where="where date >= %s")}) w
+        where w.date >= %s
+        on DUPLICATE KEY UPDATE
+        {updates}
+        """,
+        (window_start, since_date)
+    )
+
 
+def rebuild_features_since(since_date):
     """
+    samsung_daily_features를 since_date부터 끝까지 한 번에 다시 계산
+    (여러 구간을 update_features=False로 적재한 뒤 마지막에 한 번만 호출 -> 구간마다 '그 구간 ~ 끝'을 반복 계산하지 않음)
+
+    since_date 이후 파생변수 행을 지우고 다시 채우므로, 원본에서 사라진 날짜의 파생변수도 같이 정리된다.
+    """
+    conn = pymysql.connect(**DB_CONFIG)
+    cursor = conn.cursor()
+    start = time.perf_counter()
+
+    cursor.execute(CREATE_FEATURES_TABLE_SQL) # DDL은 자동 commit 되므로 트랜잭션 시작 전에
+
+    try:
+        conn.begin()
+        cursor.execute("delete from samsung_daily_features where date >= %s", (since_date,))
+        refresh_features(cursor, since_date)
+        conn.commit()
+
+    except Exception:
+        conn.rollback()
+        raise
+
+    finally:
+        cursor.close()
+        conn.close()
+
+    print(f"파생변수 재계산: {since_date} ~ 끝 ({time.perf_counter() - start:.3f}초)")
+
+
+def features_are_fresh(cursor):
+    """파생변수 테이블이 원본(samsung_daily)의 모든 날짜를 반영했는지 (마지막 날짜 + 행 수 비교)"""
+    cursor.execute(
+        """
+        select (select max(date) from samsung_daily) <=> (select max(date) from samsung_daily_features),
+               (select count(*) from samsung_daily) = (select count(*) from samsung_daily_features)
+        """
+    )
+    same_last, same_count = cursor.fetchone()
+    return bool(same_last) and bool(same_count)
+
+
+def get_data_with_query(prefer_materialized=True):
+    """
+    파생변수가 포함된 데이터 조회
+
+    - samsung_daily_features가 최신이면 거기서 바로 읽음 (계산 없음)
+    - 테이블이 없거나 최신이 아니면 예전처럼 window function으로 쿼리 시점 계산
+    """
+
+    conn = pymysql.connect(**DB_CONFIG)
+    cursor = conn.cursor()
+
+    try:
+        use_table = prefer_materialized and features_are_fresh(cursor)
+    except pymysql.err.ProgrammingError: # 파생변수 테이블이 아직 없음
+        use_table = False
+
+    if use_table:
+        query = f"select {', '.join(FEATURE_COLUMNS)} from samsung_daily_features order by date"
+    else:
+        query = FEATURES_QUERY.format(where="")
 
     cursor.execute(query)
     results = cursor.fetchall()
@@ -0,0 +1,168 @@
+# Transform 검증 리포트 (통계 계산 / 출력 형식 분리)
+#
+# 기존에는 transform() 안에서 f.write() 100줄 사이사이에 정렬, to_string(), isnull().sum() 같은 계산이 섞여 있었다.
+# 여기서는:
+#   1. compute_stats(): 리포트에 들어갈 숫자/표를 한 번만 계산해서 stats(딕셔너리) 하나로 모음
+#      - 상위 N건은 전체 정렬(sort_values) 대신 nlargest/nsmallest (airflow_validation.violations)
+#      - N과 제목은 규칙(airflow_validation.RULES)의 top_n / label을 따름 -> 기존 리포트처럼 급등/급락 3건, 거래량/변동폭 5건, 거래량 평균 표시
+#   2. render_text() / render_json() / render_html(): stats만 보고 문자열을 만듦 (계산 없음)
+#   3. save_reports(): validation_report.txt + 같은 이름의 .json(대시보드용, 기계가 읽는 형식) + .html 저장
+
+import html
+import json
+import os
+from datetime import datetime
+
+import airflow_validation as validation
+
+DERIVED_COLUMNS = ['MA_5', 'MA_20', 'Volatility_20', 'Volume_MA_5',
+                   'Price_Range', 'Price_Range_Pct', 'Close_Position']
+SAMPLE_COLUMNS = ['Close', 'MA_5', 'MA_20', 'Volatility_20', 'Price_Range_Pct']
+
+
+## 1. 통계 한 번 계산
+def compute_stats(df, result, title="삼성전자 주가 데이터 Transform & 검증 리포트", top_n=None):
+    """
+    Args:
+        df: 파생 변수까지 추가된 DataFrame (Date 인덱스)
+        result: airflow_validation.validate(df) 결과
+        top_n: 이상치 샘플 수를 규칙과 상관없이 하나로 맞출 때 (None이면 규칙별 top_n)
+
+    Returns:
+        dict: 리포트 렌더러들이 쓰는 통계 (표는 DataFrame 그대로)
+    """
+    null_counts = df.isnull().sum()
+    score = validation.quality_score(result)
+
+    return {
+        'title': title,
+        'generated_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'period': (str(df.index[0]), str(df.index[-1])) if len(df) else (None, None),
+        'total': len(df),
+        'derived_columns': DERIVED_COLUMNS,
+        'sample': df[SAMPLE_COLUMNS].tail(),
+        'null_counts': {col: int(n) for col, n in null_counts.items() if n > 0},
+        'logic_checks': [
+            {'name': r['name'], 'label': r['ok'], 'count': result['counts'][r['name']]}
+            for r in result['rules'] if r['kind'] == 'logic'
+        ],
+        'outliers': [
+            {'name': r['name'], 'label': r['label'](df) if 'label' in r else r['ok'], 'count': result['counts'][r['name']],
+             'top': validation.violations(df, result, r['name'], n=top_n or r['top_n'])}
+            for r in result['rules'] if r['kind'] == 'outlier'
+        ],
+        'summary': validation.summary(result),
+        'quality_score': score,
+        'quality_grade': validation.quality_grade(score),
+    }
+
+
+## 2. 렌더러
+def _check_text(count):
+    return '정상' if count == 0 else f'오류 {count}건'
+
+
+def render_text(stats):
+    """기존 validation_report.txt와 같은 형식"""
+    line, thin = "=" * 60, "-" * 60
+    out = [
+        line, stats['title'], line,
+        f"생성 시각: {stats['generated_at']}",
+        f"데이터 기간: {stats['period'][0]} ~ {stats['period'][1]}",
+        f"총 데이터: {stats['total']}건",
+        "",
+        line, "Step 1: 파생 변수 생성", line, "",
+        "생성된 파생 변수:", thin,
+    ]
+    out += [f"{i}. {col}" for i, col in enumerate(stats['derived_columns'], 1)]
+    out += ["", "최근 5일 데이터 샘플:", thin, stats['sample'].to_string(), "", "결측치 현황:", thin]
+    out += [f"{col}: {count}개" for col, count in stats['null_counts'].items()]
+    out += ["", line, "Step 2: 데이터 검증 로직", line, "", "[1] 논리적 검증", thin]
+    out += [f"{c['label']}: {_check_text(c['count'])}" for c in stats['logic_checks']]
+    out += ["", "[2] 이상치 탐지", thin]
+    for o in stats['outliers']:
+        out += ["", f"{o['label']}: {o['count']}건"]
+        if o['count'] > 0:
+            out.append(o['top'].to_string())
+    out += ["", line, "검증 결과 요약", line]
+    out += [f"{key}: {value:,}건" for key, value in stats['summary'].items()]
+    out += ["", f"데이터 품질 점수: {stats['quality_score']:.1f}/100", stats['quality_grade'],
+            "", line, "리포트 생성 완료", line]
+
+    return "\n".join(out) + "\n"
+
+
+def _table_records(df):
+    """DataFrame -> JSON 배열 (인덱스 포함, 날짜는 ISO 문자열, NaN은 null)"""
+    return json.loads(df.reset_index().to_json(orient='records', date_format='iso', double_precision=15))
+
+
+def render_json(stats):
+    """대시보드에서 읽을 수 있는 형식 (표는 레코드 배열로)"""
+    doc = {key: value for key, value in stats.items() if key not in ('sample', 'outliers')}
+    doc['period'] = {'start': stats['period'][0], 'end': stats['period'][1]}
+    doc['sample'] = _table_records(stats['sample'])
+    doc['outliers'] = [{**{k: v for k, v in o.items() if k != 'top'}, 'top': _table_records(o['top'])}
+                       for o in stats['outliers']]
+    return json.dumps(doc, ensure_ascii=False, indent=2)
+
+
+def render_html(stats):
+    esc = html.escape
+    checks = "".join(
+        f"<tr><td>{esc(c['label'])}</td><td>{_check_text(c['count'])}</td></tr>"
+        for c in stats['logic_checks']
+    )
+    outliers = "".join(
+        f"<h3>{esc(o['label'])}: {o['count']}건</h3>" + (o['top'].to_html() if o['count'] > 0 else "")
+        for o in stats['outliers']
+    )
+    summary = "".join(f"<tr><td>{esc(key)}</td><td>{value:,}건</td></tr>" for key, value in stats['summary'].items())
+    nulls = "".join(f"<li>{esc(col)}: {count}개</li>" for col, count in stats['null_counts'].items())
+
+    return f"""<!DOCTYPE html>
+<html lang="ko">
+<head><meta charset="utf-8"><title>{esc(stats['title'])}</title></head>
+<body>
+<h1>{esc(stats['title'])}</h1>
+<p>생성 시각: {stats['generated_at']}<br>데이터 기간: {stats['period'][0]} ~ {stats['period'][1]}<br>총 데이터: {stats['total']}건</p>
+<h2>Step 1: 파생 변수 생성</h2>
+<p>{esc(', '.join(stats['derived_columns']))}</p>
+<h3>최근 5일 데이터 샘플</h3>
+{stats['sample'].to_html()}
+<h3>결측치 현황</h3>
+<ul>{nulls}</ul>
+<h2>Step 2: 데이터 검증 로직</h2>
+<h3>[1] 논리적 검증</h3>
+<table>{checks}</table>
+<h3>[2] 이상치 탐지</h3>
+{outliers}
+<h2>검증 결과 요약</h2>
+<table>{summary}</table>
+<p><b>데이터 품질 점수: {stats['quality_score']:.1f}/100</b> {esc(stats['quality_grade'])}</p>
+</body>
+</html>
+"""
+
+
+RENDERERS = {'.txt': render_text, '.json': render_json, '.html': render_html}
+
+
+## 3. 저장
+def save_reports(stats, report_file, formats=('.txt', '.json', '.html')):
+    """
+    report_file(예: validation_report.txt)과 확장자만 다른 파일로 형식별 저장
+
+    Returns:
+        dict: {확장자: 저장 경로}
+    """
+    base = os.path.splitext(report_file)[0]
+    paths = {}
+
+    for ext in formats:
+        path = report_file if report_file.endswith(ext) else base + ext
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(RENDERERS[ext](stats))
+        paths[ext] = path
+
+    return paths
@@ -0,0 +1,110 @@
+# task 사이 중간 파일 저장소 (Arrow IPC)
+#
+# 예전에는 extract -> transform -> load 사이를 전부 CSV로 넘겼다.
+# 단계마다 텍스트를 다시 parse하고(read_csv), 타입도 매번 다시 추론하고, 실수는 float_precision='round_trip'을 챙겨야 했다.
+# 여기서는:
+#   1. 스키마(칼럼 이름 + 타입)를 미리 정해 두고 (RAW_SCHEMA / FEATURES_SCHEMA) 그 타입 그대로 Arrow IPC 파일(.arrow)로 저장
+#      -> 타입이 안 맞는 데이터(예: 가격에 소수)가 들어오면 저장할 때 바로 에러
+#   2. 읽을 때는 parse 없이 파일을 메모리 맵(memory map)으로 열어서 필요한 칼럼/날짜 구간만 꺼냄 (압축 안 함 -> 디스크 내용 = 메모리 배열)
+#   3. extract / transform / load가 모두 이 모듈의 write_frame / read_frame만 씀
+# 외부에서 받은 원본(.csv)은 read_frame이 확장자를 보고 예전처럼 read_csv로 읽는다.
+
+import os
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+SUFFIX = ".arrow"
+INDEX_COLUMN = 'Date'
+
+# Date는 pandas read_csv(parse_dates)와 같은 마이크로초 단위 -> CSV로 읽은 데이터와 비교해도 인덱스 타입이 같음
+RAW_SCHEMA = pa.schema([
+    (INDEX_COLUMN, pa.timestamp('us')),
+    ('Open', pa.int64()),
+    ('High', pa.int64()),
+    ('Low', pa.int64()),
+    ('Close', pa.int64()),
+    ('Volume', pa.int64()),
+    ('Change', pa.float64()),
+])
+
+# 파생 변수 (airflow_transform_samsung.add_features). Price_Range = High - Low 라서 정수
+FEATURES_SCHEMA = pa.schema(list(RAW_SCHEMA) + [
+    ('MA_5', pa.float64()),
+    ('MA_20', pa.float64()),
+    ('Volatility_20', pa.float64()),
+    ('Volume_MA_5', pa.float64()),
+    ('Price_Range', pa.int64()),
+    ('Price_Range_Pct', pa.float64()),
+    ('Close_Position', pa.float64()),
+])
+
+
+## 1. 저장
+def to_ipc_bytes(df, schema):
+    """
+    Date 인덱스 DataFrame -> 스키마대로 변환한 Arrow IPC 파일 내용 (스키마에 없는 칼럼은 버림)
+
+    Returns:
+        pa.Buffer
+    """
+    table = pa.Table.from_pandas(df.reset_index(), schema=schema, preserve_index=False)
+    table = table.replace_schema_metadata(None) # pandas 버전 정보 등을 빼서, 같은 데이터면 항상 같은 바이트 (체크섬용)
+
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_file(sink, schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue()
+
+
+def write_bytes(path, data):
+    """임시 파일에 쓰고 교체 (중간에 실패해도 반쯤 쓴 파일이 안 남음. 임시 파일은 프로세스마다 따로 -> 여러 task가 같은 파일을 써도 안 섞임)"""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+    return path
+
+
+def write_frame(df, path, schema):
+    """
+    DataFrame -> path(.arrow)
+
+    Returns:
+        str: path
+    """
+    return write_bytes(path, to_ipc_bytes(df, schema))
+
+
+## 2. 읽기
+def read_frame(path, columns=None, start=None, end=None):
+    """
+    path -> Date 인덱스 DataFrame. columns를 주면 그 칼럼만 (Date 제외), start/end를 주면 Date가 [start, end]인 행만
+
+    - .arrow: 메모리 맵으로 열어서 고른 칼럼/행만 pandas로 변환 (텍스트 parse 없음, 안 고른 칼럼은 디스크에서 안 읽음)
+    - .csv: 외부 원본 / 예전 결과 파일용 (read_csv)
+    """
+    if path.endswith(".csv"):
+        df = pd.read_csv(path, index_col=INDEX_COLUMN, parse_dates=True, float_precision='round_trip', encoding='utf-8-sig')
+        if start is not None:
+            df = df[df.index >= pd.Timestamp(start)]
+        if end is not None:
+            df = df[df.index <= pd.Timestamp(end)]
+        return df if columns is None else df[columns]
+
+    with pa.memory_map(path, 'r') as source:
+        table = pa.ipc.open_file(source).read_all()
+        if columns is not None:
+            table = table.select([INDEX_COLUMN] + list(columns))
+        # 구간 밖 행은 pandas로 변환하기 전에 Arrow에서 걸러냄 (1년치 원본에서 하루치만 꺼낼 때 하루치만 변환)
+        dates = table[INDEX_COLUMN]
+        if start is not None:
+            table = table.filter(pc.greater_equal(dates, pa.scalar(pd.Timestamp(start), dates.type)))
+            dates = table[INDEX_COLUMN]
+        if end is not None:
+            table = table.filter(pc.less_equal(dates, pa.scalar(pd.Timestamp(end), dates.type)))
+        df = table.to_pandas()
+
+    return df.set_index(INDEX_COLUMN)
@@ -0,0 +1,143 @@
+# 여러 종목(멀티 티커) Transform
+#
+# airflow_transform_samsung.py는 삼성전자('005930') 한 종목, CSV 하나 -> 결과 CSV 하나 구조다.
+# 관심 종목(KOSPI watchlist) 전체에 같은 파생 변수를 만들기 위해:
+#   1. 입력은 long 형식 DataFrame 하나: symbol, date, Open, High, Low, Close, Volume, Change (종목마다 여러 행)
+#   2. 파생 변수는 종목별로(groupby('symbol')) 계산. 계산 함수는 airflow_transform_samsung.add_features를 그대로 씀
+#      -> 한 종목만 넣으면 기존 Transform과 완전히 같은 결과.
+#   3. 종목 수가 많으면(parallel_min_symbols 이상) 종목을 묶음으로 나눠서 여러 프로세스에 분배
+#   4. 결과는 종목마다 작은 CSV 수천 개 대신, symbol로 파티션된 Parquet 데이터셋 하나로 저장
+#      (features/symbol=005930/xxx.parquet, features/symbol=000660/xxx.parquet ...)
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from airflow_transform_samsung import RAW_COLUMNS, add_features
+
+FEATURES_DIR = "/opt/airflow/data/features" # 종목별 파티션 Parquet 데이터셋
+
+LONG_COLUMNS = ['symbol', 'date'] + RAW_COLUMNS
+
+
+## 1. 입력 만들기
+def read_long(csv_files):
+    """
+    종목별 CSV(FinanceDataReader 형식: Date,Open,High,Low,Close,Volume,Change) -> long 형식 DataFrame 하나
+
+    Args:
+        csv_files: {종목코드: csv 경로}
+    """
+    frames = []
+    for symbol, path in csv_files.items():
+        df = pd.read_csv(path, parse_dates=['Date'], float_precision='round_trip', encoding='utf-8-sig')
+        df = df.rename(columns={'Date': 'date'})
+        df.insert(0, 'symbol', symbol)
+        frames.append(df[LONG_COLUMNS])
+
+    return pd.concat(frames, ignore_index=True)
+
+
+## 2. 종목별 파생 변수
+def _features_for_symbols(frame):
+    """
+    여러 종목이 섞인 long DataFrame -> 종목별로 add_features 적용한 결과 (프로세스 풀 worker에서도 이 함수를 실행)
+    """
+    out = []
+    for symbol, group in frame.groupby('symbol', sort=False):
+        group = group.sort_values('date').set_index('date')[RAW_COLUMNS]
+        features = add_features(group)
+        features.insert(0, 'symbol', symbol)
+        out.append(features)
+
+    return pd.concat(out) if out else frame.iloc[0:0]
+
+
+def _split_symbols(df, n_chunks):
+    """종목을 n_chunks 묶음으로 나눔 (한 종목은 항상 한 묶음에만 들어감)"""
+    symbols = df['symbol'].unique()
+    groups = [symbols[i::n_chunks] for i in range(n_chunks)]
+    return [df[df['symbol'].isin(g)] for g in groups if len(g) > 0]
+
+
+def transform_multi(df, workers=None, parallel_min_symbols=50):
+    """
+    long 형식 주가 데이터 -> 종목별 파생 변수 추가 (MA_5, MA_20, Volatility_20, Volume_MA_5, Price_Range, Price_Range_Pct, Close_Position)
+
+    Args:
+        df: symbol, date, Open, High, Low, Close, Volume, Change 칼럼의 DataFrame
+        workers: 프로세스 수 (기본: CPU 수)
+        parallel_min_symbols: 종목 수가 이 값 이상일 때만 프로세스 풀 사용 (적으면 프로세스 띄우는 비용이 더 큼)
+
+    Returns:
+        DataFrame: date 인덱스, symbol + 원본 + 파생 변수 칼럼 (symbol, date 순 정렬)
+    """
+    missing = set(LONG_COLUMNS) - set(df.columns)
+    if missing:
+        raise ValueError(f"필요한 칼럼 없음: {sorted(missing)}")
+
+    workers = workers or os.cpu_count() or 1
+    n_symbols = df['symbol'].nunique()
+
+    if workers > 1 and n_symbols >= parallel_min_symbols:
+        # 종목 묶음 하나 = 작업 하나. 워커 수보다 조금 더 잘게 나눠서, 느린 묶음 하나에 전체가 기다리지 않게 함
+        chunks = _split_symbols(df, min(n_symbols, workers * 4))
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_features_for_symbols, chunks))
+        result = pd.concat(results)
+    else:
+        result = _features_for_symbols(df)
+
+    result = result.rename_axis('date').reset_index()
+    result = result.sort_values(['symbol', 'date'], kind='stable')
+    return result.set_index('date')
+
+
+## 3. 저장 (symbol 파티션 Parquet)
+def save_features(result, output_dir=FEATURES_DIR, compression='snappy'):
+    """
+    symbol 칼럼으로 파티션을 나눠 Parquet 데이터셋 하나로 저장 (pyarrow 필요)
+    이번에 들어온 종목의 파티션만 새로 쓰고(기존 파일 교체), 다른 종목 파티션은 그대로 둔다.
+
+    Returns:
+        str: output_dir
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    result.reset_index().to_parquet(
+        output_dir,
+        engine='pyarrow',
+        partition_cols=['symbol'],
+        compression=compression,
+        index=False,
+        existing_data_behavior='delete_matching', # 같은 종목 파티션을 다시 쓰면 중복 없이 교체
+    )
+    return output_dir
+
+
+def read_features(symbols=None, output_dir=FEATURES_DIR, columns=None):
+    """저장된 파생 변수 읽기. symbols를 주면 그 종목 파티션만 읽음"""
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+
+    # 폴더 이름(symbol=005930)에서 타입을 추론하게 두면 '005930' -> 정수 5930이 되므로, 문자열로 명시
+    partitioning = ds.partitioning(pa.schema([('symbol', pa.string())]), flavor='hive')
+    filters = [('symbol', 'in', list(symbols))] if symbols else None
+
+    df = pd.read_parquet(output_dir, engine='pyarrow', columns=columns, filters=filters, partitioning=partitioning)
+    return df
+
+
+if __name__ == "__main__":
+    # 삼성 CSV 하나로 동작 확인: 한 종목만 넣으면 기존 Transform(add_features)과 결과가 같아야 함
+    input_file = "/opt/airflow/data/samsung_2024-11-28_2025-11-27.csv"
+    long_df = read_long({'005930': input_file})
+
+    result = transform_multi(long_df)
+    print(result.head())
+
+    single = add_features(pd.read_csv(input_file, index_col='Date', parse_dates=True, float_precision='round_trip')[RAW_COLUMNS])
+    same = result.drop(columns='symbol').rename_axis('Date').equals(single)
+    print(f"{'✅' if same else '❌'} 단일 종목 Transform 결과와 {'일치' if same else '불일치'}")
+
+    print(f"✅ 저장: {save_features(result)}")
@@ -7,14 +7,186 @@
 ## <STEP 1: 데이터 불러오기 및 파생변수 생성> ##
 
 # 1. 현재 데이터 확인
+import json
+import os
+import sys
+import tempfile
+import numpy as np
 import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
 
-def transform(input_file):
+import airflow_report as report
+import airflow_storage as storage
+import airflow_validation as validation
 
-    ## CSV 파일 불러오기
-    df = pd.read_csv(input_file, # 하드코딩된 경로 대신 input_file 사용.
-                    index_col= 'Date',
-                    parse_dates= True) # 'parse_dates' -> 내가 기존에 알고 있는 'parsing(나누다.구분하다.)' + '분석하다(분석해서) -> (데이터 타입을)변환하다.'의 의미가 추가된 것. 여기서, 'parse_dates'는 기존의 문자열 형태의 'Dates'를 DateTime 타입으로 변환한다는 의미이다.
+# 결과/상태 파일은 Arrow IPC(.arrow): load task가 CSV를 다시 parse하지 않고 메모리 맵으로 바로 읽음 (airflow_storage.py)
+OUTPUT_FILE = "/opt/airflow/data/samsung_transformed.arrow"
+REPORT_FILE = "/opt/airflow/data/validation_report.txt"
+STATE_FILE = "/opt/airflow/data/samsung_window_state.arrow" # 증분 모드용: 마지막 20일치 원본 데이터 (가장 긴 윈도우 = 20일)
+
+# 레포에 같이 들어 있는 원본 (컨테이너에서는 /opt/airflow/data/..., 로컬에서는 airflow/data/... -> modules 기준 상대 경로로 둘 다 맞음)
+SAMPLE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'data', 'samsung_2024-11-28_2025-11-27.csv')
+
+RAW_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume', 'Change']
+WINDOW_SIZE = 20 # 파생 변수 중 가장 긴 윈도우 (MA_20, Volatility_20)
+
+
+## 윈도우 계산 (pandas rolling 대신)
+# pandas rolling()은 '이전 윈도우 합계 + 새 값 - 빠진 값' 식으로 누적 계산해서, 결과 끝자리가 '어디서부터 계산을 시작했는지'에 따라 달라질 수 있다.
+# 그러면 증분 계산(마지막 20일 + 새 데이터)과 전체 재계산 결과가 비트 단위로 같다는 보장이 없다.
+# 그래서 윈도우마다 독립적으로(그 윈도우 값들만으로) 계산한다. -> 시작 위치와 상관없이 항상 같은 결과.
+def rolling_mean(series, window):
+    values = series.to_numpy(dtype='float64')
+    out = np.full(len(values), np.nan)
+    if len(values) >= window:
+        out[window - 1:] = sliding_window_view(values, window).mean(axis=1)
+    return pd.Series(out, index=series.index)
+
+
+def rolling_std(series, window):
+    values = series.to_numpy(dtype='float64')
+    out = np.full(len(values), np.nan)
+    if len(values) >= window:
+        out[window - 1:] = sliding_window_view(values, window).std(axis=1, ddof=1) # ddof=1: 표본 표준편차 (pandas std()와 같은 기준)
+    return pd.Series(out, index=series.index)
+
+
+def add_features(df):
+    """원본 주가 데이터(Date 인덱스)에 파생 변수 칼럼 추가 (전체 계산/증분 계산이 같은 함수를 씀)"""
+
+    ## 1. 이동 평균(Moving Average): n 크기만큼의 윈도우를 통해서 한칸씩 이동하면서 각 구간의 평균을 내는 방식. 
+    df['MA_5'] = rolling_mean(df['Close'], 5) #5일치
+    df['MA_20'] = rolling_mean(df['Close'], 20) # 20일치
+
+    ## 2. 변동성(최근 20일 종가 변화율의 표준편차) -> 표준편차로 변동성을 확인할 수 있다.
+    df['Volatility_20'] = rolling_std(df['Change'], 20)
+
+    ## 3. 거래량 이동평균
+    df['Volume_MA_5'] = rolling_mean(df['Volume'], 5)
+
+    ## 4. 가격 범위
+    df['Price_Range'] =  df['High'] - df['Low']
+    df['Price_Range_Pct'] = (df['High'] - df['Low'])/df['Close'] * 100  # Percentage로 표현.
+
+    ## 5. 고가/저가 대비 종가 위치 (0~100%)
+    df['Close_Position'] = (df['Close'] - df['Low']) / (df['High'] - df['Low']) * 100 # 'high'-'low'는 그 날의 최종 범위를 의미함. 'close'-'low'가 클수록 높은 가격에 마무리를, 작을수록 낮은 가격에 마무리를 함을 의미함. 그림을 그려서 보면 직관적이고 쉬움.
+
+    return df
+
+
+## 증분 모드용 윈도우 상태 저장/읽기
+# 바이너리(Arrow)로 저장하므로 실수 값이 비트 단위까지 그대로 복원됨 (텍스트 변환 없음)
+def save_window_state(df, state_file=STATE_FILE):
+    storage.write_frame(df[RAW_COLUMNS].tail(WINDOW_SIZE), state_file, storage.RAW_SCHEMA)
+
+
+def load_window_state(state_file=STATE_FILE):
+    return storage.read_frame(state_file)
+
+
+def read_transformed(output_file=OUTPUT_FILE):
+    return storage.read_frame(output_file)
+
+
+def verify_incremental(input_file, output_file=OUTPUT_FILE):
+    """
+    증분 모드로 쌓아 온 output_file이 '처음부터 전체 재계산'한 결과와 비트 단위로 같은지 검증
+
+    Returns:
+        bool: 같으면 True
+    """
+    full = add_features(storage.read_frame(input_file, columns=RAW_COLUMNS))
+    saved = read_transformed(output_file)
+
+    try:
+        pd.testing.assert_frame_equal(saved, full, check_exact=True, check_freq=False)
+        print(f"✅ 증분 결과 = 전체 재계산 결과 ({len(saved)}건 일치)")
+        return True
+    except AssertionError as e:
+        print(f"❌ 증분 결과와 전체 재계산 결과가 다름:\n{e}")
+        return False
+
+
+def check_incremental(input_file=SAMPLE_FILE, new_days=10):
+    """
+    증분 모드 검사: input_file에서 마지막 new_days일을 뺀 데이터로 한 번, 전체로 한 번 transform(incremental=True)를 돌린 뒤
+    (= 하루하루 쌓는 상황) 결과가 전체 재계산과 비트 단위로 같은지, 검증 리포트도 전체 실행과 같은지 확인한다.
+    결과 파일은 임시 폴더에만 쓴다.
+
+    Returns:
+        bool: 둘 다 같으면 True
+    """
+    df = storage.read_frame(input_file, columns=RAW_COLUMNS)
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        files = dict(output_file=f"{work_dir}/incremental{storage.SUFFIX}", report_file=f"{work_dir}/incremental.txt",
+                     state_file=f"{work_dir}/window_state{storage.SUFFIX}")
+
+        head = storage.write_frame(df.iloc[:-new_days], f"{work_dir}/head{storage.SUFFIX}", storage.RAW_SCHEMA)
+        transform(head, incremental=True, **files) # state 없음 -> 전체 계산으로 시작
+        transform(input_file, incremental=True, **files) # 마지막 new_days일만 증분 계산
+
+        transform(input_file, output_file=f"{work_dir}/full{storage.SUFFIX}", report_file=f"{work_dir}/full.txt",
+                  state_file=f"{work_dir}/full_state{storage.SUFFIX}")
+
+        same_rows = verify_incremental(input_file, files['output_file'])
+        with open(f"{work_dir}/incremental.json", encoding='utf-8') as f:
+            incremental_report = json.load(f)
+        with open(f"{work_dir}/full.json", encoding='utf-8') as f:
+            full_report = json.load(f)
+
+    incremental_report.pop('generated_at')
+    full_report.pop('generated_at')
+    same_report = incremental_report == full_report
+    print(f"{'✅' if same_report else '❌'} 증분 검증 리포트 {'=' if same_report else '!='} 전체 실행 검증 리포트")
+
+    return same_rows and same_report
+
+
+def transform_partition(extracted, output_dir):
+    """
+    extract_partition() 결과 하나(종목 + 기간) Transform -> output_dir 아래에 따로 저장
+    (DAG에서 파티션/날짜마다 output_dir을 다르게 줘서, 동시에 여러 개가 돌아도 같은 파일에 쓰지 않게 함)
+
+    Returns:
+        dict: extracted + {'output_file', 'report_file'}
+    """
+    output_file, report_file = transform(
+        extracted['path'],
+        output_file=f"{output_dir}/{extracted['ticker']}{storage.SUFFIX}",
+        report_file=f"{output_dir}/validation_report.txt",
+        state_file=f"{output_dir}/window_state{storage.SUFFIX}",
+        keep_from=extracted['start'], # extract에서 붙여 온 이전 19거래일은 버림
+    )
+    return {**extracted, 'output_file': output_file, 'report_file': report_file}
+
+
+def transform(input_file, incremental=False, output_file=OUTPUT_FILE, report_file=REPORT_FILE, state_file=STATE_FILE,
+              keep_from=None):
+    """
+    incremental=False: 전체 데이터로 파생 변수를 다시 계산해서 output_file을 새로 쓴다. (기존 방식)
+    incremental=True: state_file(마지막 20일치)과 input_file의 '새 날짜'만으로 파생 변수를 계산해서 output_file 뒤에 이어 붙인다.
+                      파생 변수 계산만 증분이고, 검증/리포트(validation_report.*)는 기존 결과 + 새 행 '전체' 기준으로 다시 만든다.
+                      (거래량 폭증 기준인 평균, 이상치 상위 N건 등은 새 날짜 하루치만 보면 의미가 없으므로. state/output이 없으면 전체 계산으로 시작)
+    keep_from: input_file 앞부분이 윈도우 계산용 이전 데이터일 때(extract_partition의 lookback), 파생 변수 계산 후 이 날짜부터만 남김
+    input_file은 extract가 만든 .arrow(메모리 맵으로 읽음) 또는 원본 .csv
+    """
+
+    ## 데이터 불러오기 (하드코딩된 경로 대신 input_file 사용. 원본 칼럼만)
+    df = storage.read_frame(input_file, columns=RAW_COLUMNS)
+
+    incremental = incremental and os.path.exists(state_file) and os.path.exists(output_file)
+    if incremental:
+        state = load_window_state(state_file)
+        new_rows = df[df.index > state.index[-1]]
+        print(f"증분 모드: 마지막 처리일 {state.index[-1].date()}, 새 데이터 {len(new_rows)}건")
+
+        if len(new_rows) == 0:
+            print("✅ 새 데이터 없음 -> Transform 건너뜀")
+            return output_file, report_file
+
+        history = pd.concat([state, new_rows]) # 윈도우 계산에 필요한 이전 20일 + 새 데이터
+        df = new_rows
 
     #print(type(df['Date'])) # 'Date'는 index이므로, 일반적인 열(column)처럼 출력이 불가능함(인덱스는 칼럼이 아니므로).
     print(f"타입은: {type(df.index)}") # 이렇게 df.index를 출력해야함. df.index가 'Datetime'으로 타입 변환되었는지 확인용.
@@ -36,22 +208,16 @@ def transform(input_file):
     print("Transform 시작: 파생 변수 생성")
     print("=" * 50)
 
-    ## 1. 이동 평균(Moving Average): n 크기만큼의 윈도우를 통해서 한칸씩 이동하면서 각 구간의 평균을 내는 방식. 
-    df['MA_5'] = df['Close'].rolling(window=5).mean() #5일치
-    df['MA_20'] = df['Close'].rolling(window=20).mean() # 20일치
-
-    ## 2. 변동성(최근 20일 종가 변화율의 표준편차) -> 표준편차로 변동성을 확인할 수 있다.
-    df['Volatility_20'] = df['Change'].rolling(window=20).std()
-
-    ## 3. 거래량 이동평균
-    df['Volume_MA_5'] = df['Volume'].rolling(window=5).mean()
-
-    ## 4. 가격 범위
-    df['Price_Range'] =  df['High'] - df['Low']
-    df['Price_Range_Pct'] = (df['High'] - df['Low'])/df['Close'] * 100  # Percentage로 표현.
-
-    ## 5. 고가/저가 대비 종가 위치 (0~100%)
-    df['Close_Position'] = (df['Close'] - df['Low']) / (df['High'] - df['Low']) * 100 # 'high'-'low'는 그 날의 최종 범위를 의미함. 'close'-'low'가 클수록 높은 가격에 마무리를, 작을수록 낮은 가격에 마무리를 함을 의미함. 그림을 그려서 보면 직관적이고 쉬움.
+    if incremental:
+        # 이전 20일치와 이어서 계산한 뒤, 새 날짜 행만 남김
+        df = add_features(history).loc[new_rows.index]
+        # 아래 검증/리포트/저장은 전체 데이터 기준: 기존 결과(메모리 맵으로 읽음, parse 없음) + 새 행
+        df = pd.concat([read_transformed(output_file), df])
+    else:
+        df = add_features(df)
+        history = df
+        if keep_from is not None:
+            df = df[df.index >= pd.Timestamp(keep_from)]
 
     print("\n✅ 파생 변수 생성 완료!")
     print(f"새로운 컬럼: MA_5, MA_20, Volatility_20, Volume_MA_5, Price_Range, Price_Range_Pct, Close_Position")
@@ -75,6 +241,9 @@ def transform(input_file):
     print("Step 2: 데이터 검증 로직")
     print("=" * 50)
 
+    # 규칙(airflow_validation.RULES)을 한 번에 평가 -> 아래 출력과 리포트 모두 이 결과 하나를 씀
+    result = validation.validate(df)
+
     # ========================================
     # 1. 논리적 검증
     # ========================================
@@ -82,50 +251,15 @@ def transform(input_file):
     print("\n[1] 논리적 검증") # '\n'으로 한줄 띄어서 '[1] 논리적 검증'을 진행한다는 의미.
     print("-" * 50)
 
-    ## 1-1. High >= Low 체크
-    invalid_high_low = df[df['High'] < df['Low']] # 유효하지 않는(invalid) high/low는 low > high임을 말하는 것. df['High'] < df['Low']인 df안에 있는 행들을 가져온다는 의미(행으로 동작함).
-    if len(invalid_high_low) > 0:
-        print(f"⚠️ High < Low 오류: {len(invalid_high_low)}건")
-        print(invalid_high_low[['High', 'Low']]) # 데이터 타입이 데이터프레임이니 'high,'low' 열의 데이터(행)을 출력한다는 의미.
-
-    else:
-        print("✅ High >= Low: 정상")
-
-
-    ## 1-2. High >= Close >= Low 체크
-    invalid_close = df[(df['Close'] > df['High']) | (df['Close'] < df['Low'])] # '|'는 or 연산자.
-    if(len(invalid_close)) > 0:
-        print(f"⚠️ Close 범위 오류: {len(invalid_close)}건")
-        print(invalid_close[['High', 'Close', 'Low']])
-    else:
-        print("✅ High >= Close >= Low: 정상")
-
-
-    ## 1-3. High >= Open >= Low 체크
-    invalid_open = df[(df['Open'] > df['High']) | (df['Open'] < df['Low'])]
-    if(len(invalid_open)) > 0:
-        print(f"⚠️ Open 범위 오류: {len(invalid_open)}건")
-        print(invalid_open[['High', 'Open', 'Low']])
-    else:
-        print("✅ High >= Open >= Low: 정상")
-
-
-    ## 1-4. Volume > 0 체크
-    invalid_volume = df[df['Volume'] <= 0]
-    if len(invalid_volume) > 0:
-        print(f"⚠️ Volume <= 0 오류: {len(invalid_volume)}건")
-        print(invalid_volume[['Volume']])
-    else:
-        print("✅ Volume > 0: 정상")
-
-
-    ## 1-5. 가격 음수 체크
-    negative_price = df[(df['Open'] < 0) | (df['High'] < 0) | 
-                        (df['Low'] < 0) | (df['Close'] < 0)]
-    if len(negative_price) > 0:
-        print(f"⚠️ 음수 가격: {len(negative_price)}건")
-    else:
-        print("✅ 모든 가격 양수: 정상")
+    for rule in result['rules']:
+        if rule['kind'] != 'logic':
+            continue
+        count = result['counts'][rule['name']]
+        if count > 0:
+            print(f"⚠️ {rule['error']}: {count}건")
+            print(validation.violations(df, result, rule['name']))
+        else:
+            print(f"✅ {rule['ok']}: 정상")
 
 
     # ========================================
@@ -136,34 +270,13 @@ def transform(input_file):
     print("[2] 이상치 탐지")
     print("-" * 50)
 
-    ## 2-1. 급등/급락 탐지 (변화율 ±5% 이상)
-    sharp_up = df[df['Change'] >= 5.0]
-    sharp_down = df[df['Change'] <= -5.0]
-
-    print(f"\n급등 (5% 이상): {len(sharp_up)}건")
-    if len(sharp_up) > 0:
-        print(sharp_up[['Close', 'Change']].sort_values('Change',ascending=False).head(3)) # 'sort_values': 정렬 방법. 'Change'를 기준으로 내림차순 정렬. head(3) 맨 앞 3개를 출력.
-
-    print(f"\n급락 (5% 이하): {len(sharp_down)}건")
-    if len(sharp_down) > 0:
-        print(sharp_down[['Close', 'Change']].sort_values('Change').head(3))
-
-
-    ## 2-2. 거래량 이상치 (평균의 2배 이상)
-    volume_mean = df['Volume'].mean()
-    volume_threshold = volume_mean * 2 # 'threshold': 임계값(어떤 기준을 만족하는지 판단하는 경계값). 이 임계값을 기준으로 이 값 이상이면 A, 아니면 B 이렇게 나누는(분기점이 되는) 기준값임. 머신러닝/딥러닝 용어.
-
-    high_volume = df[df['Volume'] >= volume_threshold]
-    print(f"\n거래량 폭증 (평균의 2배 이상): {len(high_volume)}건")
-    if len(high_volume) > 0:
-        print(high_volume[['Volume', 'Change']].sort_values('Volume', ascending=False).head(3))
-
-
-    ## 2-3. 가격 범위 이상치 (일중 변동폭 5% 이상)
-    high_volatility = df[df['Price_Range_Pct'] >= 5.0]
-    print(f"\n일중 변동폭 큼 (5% 이상): {len(high_volatility)}건")
-    if len(high_volatility) > 0:
-        print(high_volatility[['High', 'Low', 'Price_Range_Pct']].sort_values('Price_Range_Pct', ascending=False).head(3))
+    for rule in result['rules']:
+        if rule['kind'] != 'outlier':
+            continue
+        count = result['counts'][rule['name']]
+        print(f"\n{rule['ok']}: {count}건")
+        if count > 0:
+            print(validation.violations(df, result, rule['name'], n=3)) # 'sort_by' 기준으로 정렬해서 상위 3건.
 
     # ========================================
     # 3. 검증 결과 요약
@@ -172,206 +285,58 @@ def transform(input_file):
     print("검증 결과 요약")
     print("=" * 50)
 
-    validation_summary = { # 딕셔너리 타입.
-        '총 데이터': len(df),
-        '논리적 오류': len(invalid_high_low) + len(invalid_close) +
-                        len(invalid_open) + len(invalid_volume) + len(negative_price),
-        '급등 (5%+)': len(sharp_up),
-        '급락 (5%-)': len(sharp_down),
-        '거래량 폭증': len(high_volume),
-        '일중 변동 큼': len(high_volatility)
-    }
+    validation_summary = validation.summary(result) # 딕셔너리 타입.
 
     for key,value in validation_summary.items(): # items()는 말 그대로 validation_summary안에 있는 key,value들을 의미함. (key,value) 쌍을 튜플로 묶어서 반환.
         print(f"{key}: {value:,}건") # ':,' -> 천단위(세자리마다) 구분 콤마.
 
     # 1. 데이터 품질 점수
-    total_issues = validation_summary['논리적 오류']
-    quality_score = (1- (total_issues/len(df))) * 100
+    quality_score = validation.quality_score(result)
 
     print(f"\n데이터 품질 점수: {quality_score:.1f}/100")
-
-    if quality_score == 100:
-        print("✅ 완벽한 데이터 품질!")
-    elif quality_score >= 95:
-        print("✅ 매우 좋은 데이터 품질")
-    elif quality_score >= 90:
-        print("⚠️ 양호한 데이터 품질 (일부 검토 필요)")
-    else:
-        print("❌ 데이터 품질 검토 필요!")
+    print(validation.quality_grade(quality_score))
 
     print("\n" + "=" * 50)
     print("Step 2: 데이터 검증 완료!")
     print("=" * 50)
 
     ###########################################################################################################
-    ## <STEP 3: 데이터 csv/txt로 저장> ##
+    ## <STEP 3: 데이터 arrow/txt로 저장> ##
     print("\n" + "=" * 50)
     print("Step 3: 데이터 저장")
     print("=" * 50)
 
-    import os
-    from datetime import datetime
-
     # ========================================
-    # 3-1. 변환된 데이터 저장 (CSV)
+    # 3-1. 변환된 데이터 저장 (Arrow IPC, FEATURES_SCHEMA 타입 그대로)
     # ========================================
     print("\n[1] 변환된 데이터 저장")
     print("-" * 50)
 
-    os.makedirs("/opt/airflow/data", exist_ok=True)
+    # 증분 모드도 df = 기존 결과 + 새 행이라 그대로 씀 (Arrow 파일은 끝에 덧붙이기가 안 되므로 파일을 다시 씀. 임시 파일 -> 교체)
+    storage.write_frame(df, output_file, storage.FEATURES_SCHEMA) # 우리가 'step_1: 파생변수 생성'할 때, df에다가 새로운 열을 계속 생성했으므로, 이 파일에는 파생변수 생성한 게 들어간다.
 
-    output_file = "/opt/airflow/data/samsung_transformed.csv" # 이 부분도 airflow Docker에 맞게 경로를 바꿈.
-    df.to_csv(output_file, encoding='utf-8-sig') # 우리가 'step_1: 파생변수 생성'할 때, df에다가 새로운 열을 계속 생성했으므로, 이 csv 파일에는 파생변수 생성한 게 들어간다.
+    # 출력 파일에 반영한 뒤에 윈도우 상태 갱신 (중간에 실패하면 다음 실행이 같은 날짜부터 다시 계산)
+    save_window_state(history, state_file)
 
-    print(f"✅ 파일 저장: {output_file}")
+    print(f"✅ 파일 저장: {output_file}{f' (증분 추가 {len(new_rows)}건)' if incremental else ''}")
     print(f"   - 총 컬럼: {len(df.columns)}개")
     print(f"   - 총 데이터: {len(df)}건")
     print(f"   - 파일 크기: {os.path.getsize(output_file) / 1024:.1f} KB") # getsize는 byte 단위로 반환하는데, 1024로 나눔으로써 KB(킬로바이트)로 변환한다.
 
 
     # ========================================
-    # 3-2. 검증 리포트 저장 (TXT)
+    # 3-2. 검증 리포트 저장 (TXT / JSON / HTML)
     # ========================================
     print("\n[2] 검증 리포트 저장")
     print("-" * 50)
 
-    report_file = "/opt/airflow/data/validation_report.txt" # 이것도 airflow Docker로 경로 변경.
-
-    with open(report_file, 'w', encoding='utf-8') as f: # 'w': 쓰기 모드(write)
-        ## 리포트 헤더
-        f.write("=" * 60 + "\n")
-        f.write("삼성전자 주가 데이터 Transform & 검증 리포트\n")
-        f.write("=" * 60 + "\n")
-        f.write(f"생성 시각: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-        f.write(f"데이터 기간: {df.index[0]} ~ {df.index[-1]}\n")
-        f.write(f"총 데이터: {len(df)}건\n")
-        f.write("\n")
-
-        # ========================================
-        # Step 1: 파생 변수 생성 결과
-        # ========================================
-
-        f.write("=" * 60 + "\n")
-        f.write("Step 1: 파생 변수 생성\n")
-        f.write("=" * 60 + "\n\n")
-
-        f.write("생성된 파생 변수:\n")
-        f.write("-" * 60 + "\n")
-        derived_cols = ['MA_5', 'MA_20', 'Volatility_20', 'Volume_MA_5', 
-                        'Price_Range', 'Price_Range_Pct', 'Close_Position']
-        for i,col in enumerate(derived_cols,1): # 1은 1부터 index(i)가 시작함을 알림. 기본값은 0부터 시작.
-            f.write(f"{i}. {col}\n")
-
-        f.write("\n최근 5일 데이터 샘플:\n")
-        f.write("-" * 60 + "\n")
-        sample_cols = ['Close', 'MA_5', 'MA_20', 'Volatility_20', 'Price_Range_Pct']
-        f.write(df[sample_cols].tail().to_string()) # 'to_string()': 문자열로 변환하라는 의미. 하지만, 단순 문자열로 변환이 아닌, Dataframe을 '표 형태로 유지한 문자열'로 변환하라는 의미이다.
-        f.write("\n\n")
-
-        f.write("결측치 현황:\n")
-        f.write("-" * 60 + "\n")
-        null_counts = df.isnull().sum() # 2차원 형태를 한번의 sum()을 통해 1차원으로 만들고, 이는 각 컬럼별로 결측치 갯수를 세게 만듦.
-        for col, count in null_counts.items():
-            if count > 0:
-                f.write(f"{col}: {count}개\n")
-        f.write("\n")
-
-        # ========================================
-        # Step 2: 데이터 검증 결과
-        # ========================================
-        f.write("=" * 60 + "\n")
-        f.write("Step 2: 데이터 검증 로직\n")
-        f.write("=" * 60 + "\n\n")
-
-        # 논리적 검증
-        f.write("[1] 논리적 검증\n")
-        f.write("-" * 60 + "\n")
-
-        invalid_high_low = df[df['High'] < df['Low']]
-        f.write(f"High >= Low: {'정상' if len(invalid_high_low) == 0 else f'오류 {len(invalid_high_low)}건'}\n") # {}을 2개 쓴 이유는 변수를 넣는 거 뿐만 아니라, if-else 연산 때문이기도 함. f-string {}은 '변수(f"{변수}" )','연산(f"{10 + 20}" )','함수 호출(f"{my_function()}")','삼항 연산자(if-else)(f"{'A' if x > 0 else 'B'}")' 등이 가능함. 내가 전에도 f-string은 모든 것이 가능하다고 기재했음.
-        
-        invalid_close = df[(df['Close'] > df['High']) | (df['Close'] < df['Low'])]
-        f.write(f"High >= Close >= Low: {'정상' if len(invalid_close) == 0 else f'오류 {len(invalid_close)}건'}\n")
-        
-        invalid_open = df[(df['Open'] > df['High']) | (df['Open'] < df['Low'])]
-        f.write(f"High >= Open >= Low: {'정상' if len(invalid_open) == 0 else f'오류 {len(invalid_open)}건'}\n")
-        
-        invalid_volume = df[df['Volume'] <= 0]
-        f.write(f"Volume > 0: {'정상' if len(invalid_volume) == 0 else f'오류 {len(invalid_volume)}건'}\n")
-
-        negative_price = df[(df['Open'] < 0) | (df['High'] < 0) | 
-                            (df['Low'] < 0) | (df['Close'] < 0)]
-        f.write(f"모든 가격 양수: {'정상' if len(negative_price) == 0 else f'오류 {len(negative_price)}건'}\n")
-        f.write("\n")
-
-        # 이상치 탐지
-        f.write("[2] 이상치 탐지\n")
-        f.write("-" * 60 + "\n")
-
-        # 급등/급락
-        sharp_up = df[df['Change'] >= 5.0]
-        sharp_down = df[df['Change'] <= -5.0]
-
-        f.write(f"\n급등 (5% 이상): {len(sharp_up)}건\n")
-        if len(sharp_up) > 0:
-            f.write(sharp_up[['Close', 'Change']].sort_values('Change', ascending=False).head(3).to_string())
-            f.write("\n")
-        
-        f.write(f"\n급락 (5% 이하): {len(sharp_down)}건\n")
-        if len(sharp_down) > 0:
-            f.write(sharp_down[['Close', 'Change']].sort_values('Change').head(3).to_string())
-            f.write("\n")
-
-        # 거래량 폭증
-        volume_mean = df['Volume'].mean()
-        volume_threshold = volume_mean * 2
-        high_volume = df[df['Volume'] >= volume_threshold]
-
-        f.write(f"\n거래량 폭증 (평균 {volume_mean:,.0f}의 2배 이상): {len(high_volume)}건\n")
-        if len(high_volume) > 0:
-            f.write(high_volume[['Volume', 'Change']].sort_values('Volume', ascending=False).head(5).to_string())
-            f.write("\n")
-
-        # 일중 변동폭
-        high_volatility = df[df['Price_Range_Pct'] >= 5.0]
-        f.write(f"\n일중 변동폭 큼 (5% 이상): {len(high_volatility)}건\n")
-        if len(high_volatility) > 0:
-            f.write(high_volatility[['High', 'Low', 'Price_Range_Pct']].sort_values('Price_Range_Pct', ascending=False).head(5).to_string())
-            f.write("\n")
-
-        
-        # 검증 결과 요약
-        f.write("\n" + "=" * 60 + "\n")
-        f.write("검증 결과 요약\n")
-        f.write("=" * 60 + "\n")
-
-        total_issues = len(invalid_high_low) + len(invalid_close) + len(invalid_open) + len(invalid_volume) + len(negative_price)
-        quality_score = (1 - (total_issues / len(df))) * 100
-
-        f.write(f"총 데이터: {len(df):,}건\n")
-        f.write(f"논리적 오류: {total_issues}건\n")
-        f.write(f"급등 (5%+): {len(sharp_up)}건\n")
-        f.write(f"급락 (5%-): {len(sharp_down)}건\n")
-        f.write(f"거래량 폭증: {len(high_volume)}건\n")
-        f.write(f"일중 변동 큼: {len(high_volatility)}건\n")
-        f.write(f"\n데이터 품질 점수: {quality_score:.1f}/100\n")
-        
-        if quality_score == 100:
-            f.write("✅ 완벽한 데이터 품질!\n")
-        elif quality_score >= 95:
-            f.write("✅ 매우 좋은 데이터 품질\n")
-        elif quality_score >= 90:
-            f.write("⚠️ 양호한 데이터 품질 (일부 검토 필요)\n")
-        else:
-            f.write("❌ 데이터 품질 검토 필요!\n")
-        
-        f.write("\n" + "=" * 60 + "\n")
-        f.write("리포트 생성 완료\n")
-        f.write("=" * 60 + "\n")
+    # 리포트용 통계는 한 번만 계산하고, 같은 stats로 txt / json(대시보드용) / html 세 형식을 만든다.
+    stats = report.compute_stats(df, result)
+    report_paths = report.save_reports(stats, report_file)
 
-    print(f"✅ 검증 리포트 저장: {report_file}")
-    print(f"   - 파일 크기: {os.path.getsize(report_file) / 1024:.1f} KB")
+    for path in report_paths.values():
+        print(f"✅ 검증 리포트 저장: {path}")
+        print(f"   - 파일 크기: {os.path.getsize(path) / 1024:.1f} KB")
 
     # ========================================
     # 3-3. 최종 요약
@@ -398,7 +363,11 @@ def transform(input_file):
     print("Phase 2-3 Transform 전체 완료!")
     print("=" * 50)
 
-    return output_file, report_file # 튜플로 csv,txt 둘 다 반환.
+    return output_file, report_file # 튜플로 arrow,txt 둘 다 반환.
 
 if __name__ == "__main__":
-    csv_path, txt_path = transform("/opt/airflow/data/samsung_2024-11-28_2025-11-27.csv") # 'airflow_extract_samsung.py'에서 생성된 삼성 csv 파일을 input_file로 넣고, 위에서 정의한 transform 함수를 통해, csv_path(output_file), txt_path(report_file) 둘 다를 반환받는다.
+    arrow_path, txt_path = transform("/opt/airflow/data/samsung_2024-11-28_2025-11-27.csv") # 'airflow_extract_samsung.py'에서 생성된 삼성 csv 파일을 input_file로 넣고, 위에서 정의한 transform 함수를 통해, arrow_path(output_file), txt_path(report_file) 둘 다를 반환받는다.
+
+    # 증분 모드 검증: 증분으로 쌓은 결과(+ 검증 리포트)가 전체 재계산과 같은지 확인 (임시 폴더에서. 다르면 종료 코드 1)
+    if not check_incremental():
+        sys.exit(1)
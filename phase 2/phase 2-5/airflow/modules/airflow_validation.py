@@ -0,0 +1,145 @@
+# 데이터 검증 엔진 (Transform의 논리적 검증 + 이상치 탐지)
+#
+# 기존 transform()은 같은 검증(invalid_high_low, invalid_close, ...)을 '콘솔 출력용'과 '리포트 작성용'으로 두 번 계산했고,
+# 검증마다 df[조건]으로 걸러낸 DataFrame 사본을 하나씩 만들었다.
+#
+# 여기서는:
+#   1. 규칙(rule)을 '벡터화된 boolean 조건식'으로 선언만 해 두고 (RULES)
+#   2. validate()가 한 번에 전부 평가해서 '위반 비트마스크 배열' 하나로 합친다. (행마다 정수 1개, 규칙 i 위반이면 i번째 비트 = 1)
+#   3. 건수 / 위반 행 샘플 / 품질 점수는 전부 그 결과 하나에서 꺼내 쓴다. (규칙마다 사본 X -> 마스크 1개)
+# 규칙은 칼럼 이름만 맞으면 다른 종목/다른 데이터셋에도 그대로 쓸 수 있다.
+
+import numpy as np
+
+## 1. 규칙 정의
+# check: df -> boolean 배열 (True = 위반)
+# kind: 'logic' (논리적 오류, 품질 점수에 반영) / 'outlier' (이상치, 참고용)
+# ok/error: 출력 문구, columns: 위반 행 샘플로 보여줄 칼럼, sort_by/ascending: 샘플 정렬 기준
+# top_n: 리포트에 보여줄 위반 행 샘플 수 (기존 리포트와 같게 급등/급락 3건, 거래량/변동폭 5건)
+# label: (선택) df -> 리포트 제목. 데이터에서 계산한 기준값을 제목에 넣을 때 (없으면 ok 문구 그대로)
+RULES = [
+    {'name': 'invalid_high_low', 'kind': 'logic',
+     'check': lambda df: df['High'] < df['Low'],
+     'ok': 'High >= Low', 'error': 'High < Low 오류', 'columns': ['High', 'Low']},
+
+    {'name': 'invalid_close', 'kind': 'logic',
+     'check': lambda df: (df['Close'] > df['High']) | (df['Close'] < df['Low']),
+     'ok': 'High >= Close >= Low', 'error': 'Close 범위 오류', 'columns': ['High', 'Close', 'Low']},
+
+    {'name': 'invalid_open', 'kind': 'logic',
+     'check': lambda df: (df['Open'] > df['High']) | (df['Open'] < df['Low']),
+     'ok': 'High >= Open >= Low', 'error': 'Open 범위 오류', 'columns': ['High', 'Open', 'Low']},
+
+    {'name': 'invalid_volume', 'kind': 'logic',
+     'check': lambda df: df['Volume'] <= 0,
+     'ok': 'Volume > 0', 'error': 'Volume <= 0 오류', 'columns': ['Volume']},
+
+    {'name': 'negative_price', 'kind': 'logic',
+     'check': lambda df: (df['Open'] < 0) | (df['High'] < 0) | (df['Low'] < 0) | (df['Close'] < 0),
+     'ok': '모든 가격 양수', 'error': '음수 가격', 'columns': ['Open', 'High', 'Low', 'Close']},
+
+    {'name': 'sharp_up', 'kind': 'outlier',
+     'check': lambda df: df['Change'] >= 5.0,
+     'ok': '급등 (5% 이상)', 'summary': '급등 (5%+)',
+     'columns': ['Close', 'Change'], 'sort_by': 'Change', 'ascending': False, 'top_n': 3},
+
+    {'name': 'sharp_down', 'kind': 'outlier',
+     'check': lambda df: df['Change'] <= -5.0,
+     'ok': '급락 (5% 이하)', 'summary': '급락 (5%-)',
+     'columns': ['Close', 'Change'], 'sort_by': 'Change', 'ascending': True, 'top_n': 3},
+
+    {'name': 'high_volume', 'kind': 'outlier',
+     'check': lambda df: df['Volume'] >= df['Volume'].mean() * 2, # 평균의 2배 이상 (임계값)
+     'ok': '거래량 폭증 (평균의 2배 이상)', 'summary': '거래량 폭증',
+     'label': lambda df: f"거래량 폭증 (평균 {df['Volume'].mean():,.0f}의 2배 이상)",
+     'columns': ['Volume', 'Change'], 'sort_by': 'Volume', 'ascending': False, 'top_n': 5},
+
+    {'name': 'high_volatility', 'kind': 'outlier',
+     'check': lambda df: df['Price_Range_Pct'] >= 5.0,
+     'ok': '일중 변동폭 큼 (5% 이상)', 'summary': '일중 변동 큼',
+     'columns': ['High', 'Low', 'Price_Range_Pct'], 'sort_by': 'Price_Range_Pct', 'ascending': False, 'top_n': 5},
+]
+
+
+## 2. 한 번에 평가
+def validate(df, rules=RULES):
+    """
+    모든 규칙을 평가해서 위반 비트마스크 하나로 합침
+
+    Returns:
+        dict: {
+            'mask': np.ndarray (행마다 위반한 규칙들의 비트 OR),
+            'rules': 규칙 목록 (비트 순서 = 목록 순서),
+            'counts': {규칙 이름: 위반 건수},
+            'total': 전체 행 수,
+        }
+    """
+    if len(rules) > 64:
+        raise ValueError("규칙은 최대 64개까지 (uint64 비트마스크)")
+
+    mask = np.zeros(len(df), dtype=np.uint64)
+    counts = {}
+
+    for bit, rule in enumerate(rules):
+        violated = np.asarray(rule['check'](df), dtype=bool)
+        mask |= violated.astype(np.uint64) << np.uint64(bit)
+        counts[rule['name']] = int(np.count_nonzero(violated))
+
+    return {'mask': mask, 'rules': rules, 'counts': counts, 'total': len(df)}
+
+
+## 3. 결과 꺼내 쓰기
+def rule_mask(result, name):
+    """규칙 하나의 위반 여부 (boolean 배열)"""
+    bit = next(i for i, r in enumerate(result['rules']) if r['name'] == name)
+    return (result['mask'] & np.uint64(1 << bit)) != 0
+
+
+def violations(df, result, name, n=None):
+    """
+    규칙 하나를 위반한 행 (규칙의 columns만). n이 있으면 sort_by 기준 상위 n건만
+    (전체 정렬 대신 nlargest/nsmallest -> 위반 행이 많아도 상위 n건만 골라냄)
+    """
+    rule = next(r for r in result['rules'] if r['name'] == name)
+    rows = df.loc[rule_mask(result, name), rule['columns']]
+
+    if n is not None:
+        if 'sort_by' not in rule:
+            rows = rows.head(n)
+        elif rule['ascending']:
+            rows = rows.nsmallest(n, rule['sort_by'])
+        else:
+            rows = rows.nlargest(n, rule['sort_by'])
+    return rows
+
+
+def logic_issues(result):
+    """논리적 오류 건수 합계 (규칙별 건수의 합. 한 행이 여러 규칙을 위반하면 여러 번 셈)"""
+    return sum(result['counts'][r['name']] for r in result['rules'] if r['kind'] == 'logic')
+
+
+def quality_score(result):
+    """데이터 품질 점수 = (1 - 논리적 오류 건수 / 전체 건수) * 100"""
+    if result['total'] == 0:
+        return 100.0
+    return (1 - logic_issues(result) / result['total']) * 100
+
+
+def quality_grade(score):
+    if score == 100:
+        return "✅ 완벽한 데이터 품질!"
+    elif score >= 95:
+        return "✅ 매우 좋은 데이터 품질"
+    elif score >= 90:
+        return "⚠️ 양호한 데이터 품질 (일부 검토 필요)"
+    else:
+        return "❌ 데이터 품질 검토 필요!"
+
+
+def summary(result):
+    """검증 결과 요약 (기존 validation_summary와 같은 항목)"""
+    out = {'총 데이터': result['total'], '논리적 오류': logic_issues(result)}
+    for r in result['rules']:
+        if r['kind'] == 'outlier':
+            out[r['summary']] = result['counts'][r['name']]
+    return out